@@ -16,3 +16,4 @@
 # along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
 
 from .src.main import PCloud
+from .src.aio import AsyncPCloud
@@ -0,0 +1,369 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import asyncio
+import functools
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .main import PCloud
+
+def _coroutine(name):
+    method = getattr(PCloud, name)
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwArgs):
+        return await self._run(getattr(self._pCloud, name), *args, **kwArgs)
+    return wrapper
+
+
+def _generator(name):
+    method = getattr(PCloud, name)
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwArgs):
+        gen = getattr(self._pCloud, name)(*args, **kwArgs)
+        # The generator is closed by a worker when it is left early (the files it opened are then closed
+        # without blocking the event loop), once the step which may still be running is done
+        lock = threading.Lock()
+        def step(fun, *args):
+            with lock:
+                return fun(*args)
+        end = object()
+        o = None
+        try:
+            while True:
+                o = await self._run(step, next, gen, end)
+                if o is end:
+                    return
+                yield o
+        finally:
+            if o is not end:
+                await self._run(step, gen.close)
+    return wrapper
+
+
+class AsyncPCloudFile:
+    """
+    Asynchronous counterpart of :class:`~.file.PCloudFile`.
+
+    *PCloud* asynchronous file objects are obtained and used as follows::
+
+        async with await pCloud.openFile(1) as pCloudFile:
+            print(await pCloudFile.read(1024))
+
+    :param pCloud: :class:`AsyncPCloud` instance
+    :param pCloudFile: The wrapped :class:`~.file.PCloudFile`.
+    """
+
+    def __init__(self, pCloud, pCloudFile):
+        self.__pCloud = pCloud
+        self.__file = pCloudFile
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.__pCloud._run(self.__file.__exit__, *args)
+
+    async def read(self, count, offset=None):
+        """
+        See :meth:`PCloudFile.read() <.file.PCloudFile.read()>`.
+        """
+        return await self.__pCloud._run(self.__file.read, count, offset=offset)
+
+    async def readinto(self, buffer, offset=None):
+        """
+        See :meth:`PCloudFile.readinto() <.file.PCloudFile.readinto()>`.
+        """
+        return await self.__pCloud._run(self.__file.readinto, buffer, offset=offset)
+
+    async def write(self, data, offset=None):
+        """
+        See :meth:`PCloudFile.write() <.file.PCloudFile.write()>`.
+        """
+        return await self.__pCloud._run(self.__file.write, data, offset=offset)
+
+    async def flush(self):
+        """
+        See :meth:`PCloudFile.flush() <.file.PCloudFile.flush()>`.
+        """
+        return await self.__pCloud._run(self.__file.flush)
+
+    async def truncate(self, length):
+        """
+        See :meth:`PCloudFile.truncate() <.file.PCloudFile.truncate()>`.
+        """
+        return await self.__pCloud._run(self.__file.truncate, length)
+
+    async def seek(self, offset, origin=0):
+        """
+        See :meth:`PCloudFile.seek() <.file.PCloudFile.seek()>`.
+        """
+        return await self.__pCloud._run(self.__file.seek, offset, origin)
+
+    @property
+    def size(self):
+        """
+        An awaitable integer representing the size of the file in bytes.
+        """
+        return self.__pCloud._run(getattr, self.__file, 'size')
+
+    @property
+    def offset(self):
+        """
+        An awaitable integer representing the file pointer position (from the start of the file).
+        """
+        return self.__pCloud._run(getattr, self.__file, 'offset')
+
+    async def close(self):
+        """
+        Closes the file.
+        """
+        await self.__pCloud._run(self.__file.close)
+
+
+class AsyncPCloudStream:
+    """
+    Asynchronous counterpart of the file objects returned by :meth:`PCloud.open() <pcloud.PCloud.open()>`.
+
+    The lines of the file can be iterated through asynchronously::
+
+        async with await pCloud.open('/Documents/notes.txt', 'rt', encoding='utf-8') as notes:
+            async for line in notes:
+                print(line)
+
+    :param pCloud: :class:`AsyncPCloud` instance
+    :param stream: The wrapped file object.
+    """
+
+    def __init__(self, pCloud, stream):
+        self.__pCloud = pCloud
+        self.__stream = stream
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.__pCloud._run(self.__stream.__exit__, *args)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        line = await self.readline()
+        if not line:
+            raise StopAsyncIteration
+        return line
+
+    @property
+    def stream(self):
+        """
+        The wrapped (blocking) file object.
+        """
+        return self.__stream
+
+    async def read(self, size=-1):
+        """
+        See :meth:`io.BufferedIOBase.read` or :meth:`io.TextIOBase.read`.
+        """
+        return await self.__pCloud._run(self.__stream.read, size)
+
+    async def readline(self, size=-1):
+        """
+        See :meth:`io.IOBase.readline`.
+        """
+        return await self.__pCloud._run(self.__stream.readline, size)
+
+    async def write(self, data):
+        """
+        See :meth:`io.BufferedIOBase.write` or :meth:`io.TextIOBase.write`.
+        """
+        return await self.__pCloud._run(self.__stream.write, data)
+
+    async def seek(self, offset, whence=0):
+        """
+        See :meth:`io.IOBase.seek`.
+        """
+        return await self.__pCloud._run(self.__stream.seek, offset, whence)
+
+    async def tell(self):
+        """
+        See :meth:`io.IOBase.tell`.
+        """
+        return await self.__pCloud._run(self.__stream.tell)
+
+    async def truncate(self, size=None):
+        """
+        See :meth:`io.IOBase.truncate`.
+        """
+        return await self.__pCloud._run(self.__stream.truncate, size)
+
+    async def flush(self):
+        """
+        See :meth:`io.IOBase.flush`.
+        """
+        return await self.__pCloud._run(self.__stream.flush)
+
+    async def close(self):
+        """
+        Closes the file.
+        """
+        await self.__pCloud._run(self.__stream.close)
+
+
+class AsyncPCloud:
+    """
+    Asynchronous counterpart of :class:`~pcloud.PCloud`.
+
+    All the methods of :class:`~pcloud.PCloud` are available as coroutines
+    (:meth:`upload()` and :meth:`download()` are asynchronous generators).
+    They return the same :class:`~.info.PCloudInfo` and raise the same :class:`~.error.PCloudError`.
+
+    It should be used as follows::
+
+        async with AsyncPCloud(username="username", password="password") as pCloud:
+            await pCloud.userInfo()
+
+    .. note::
+        This class is a thread-pool adapter, not a native asynchronous client: the requests are sent
+        by a :class:`~pcloud.PCloud` instance in a pool of **workers** threads, so that the event loop is never blocked.
+        Each call in progress (and each transfer, for the whole time it runs) still holds one of the threads,
+        so that at most **workers** calls run concurrently (the other calls wait for a thread to be available).
+        By default, the pool has as many threads as the connections kept alive (see **maxConnections**).
+        When several calls are sent before the user is authenticated, only the first one logs in
+        and the others wait for it.
+
+    .. note::
+        Lazy-loading of :class:`~.info.PCloudFolderInfo` contents is blocking. Use :meth:`listFolder()`
+        with recursion enabled to avoid it.
+
+    The parameters are passed to :class:`~pcloud.PCloud`, except:
+
+    :param workers: An optional integer giving the maximum number of requests executed concurrently
+                    (**maxConnections** by default, or the default of :class:`~concurrent.futures.ThreadPoolExecutor` without it).
+    """
+
+    def __init__(self, *args, workers=None, **kwArgs):
+        self._pCloud = PCloud(*args, **kwArgs)
+        if workers is None:
+            workers = kwArgs.get('maxConnections', args[3] if (len(args) > 3) else None)
+        self.__executor = ThreadPoolExecutor(workers)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        try:
+            return await self._run(self._pCloud.__exit__, *args)
+        finally:
+            self.__executor.shutdown(wait=False)
+
+    async def _run(self, fun, *args, **kwArgs):
+        return await asyncio.get_running_loop().run_in_executor(self.__executor, functools.partial(fun, *args, **kwArgs))
+
+    @property
+    def username(self):
+        """
+        The user name.
+        """
+        return self._pCloud.username
+
+    @username.setter
+    def username(self, username):
+        self._pCloud.username = username
+
+    @property
+    def password(self):
+        """
+        The password.
+        """
+        return self._pCloud.password
+
+    @password.setter
+    def password(self, password):
+        self._pCloud.password = password
+
+    @property
+    def authenticated(self):
+        """
+        Indicates whether the user is authenticated to the *PCloud* API.
+        """
+        return self._pCloud.authenticated
+
+    currentServer      = _coroutine('currentServer')
+    getApiServer       = _coroutine('getApiServer')
+    getIp              = _coroutine('getIp')
+    getDigest          = _coroutine('getDigest')
+    userInfo           = _coroutine('userInfo')
+    logout             = _coroutine('logout')
+    supportedLanguages = _coroutine('supportedLanguages')
+    setLanguage        = _coroutine('setLanguage')
+    listFolder         = _coroutine('listFolder')
+    walk               = _generator('walk')
+    refresh            = _coroutine('refresh')
+    createFolder       = _coroutine('createFolder')
+    renameFolder       = _coroutine('renameFolder')
+    moveFolder         = _coroutine('moveFolder')
+    copyFolder         = _coroutine('copyFolder')
+    deleteFolder       = _coroutine('deleteFolder')
+    readFile           = _coroutine('readFile')
+    readFileInto       = _coroutine('readFileInto')
+    writeFile          = _coroutine('writeFile')
+    truncateFile       = _coroutine('truncateFile')
+    sizeFile           = _coroutine('sizeFile')
+    offsetFile         = _coroutine('offsetFile')
+    seekFile           = _coroutine('seekFile')
+    closeFile          = _coroutine('closeFile')
+    uploadFiles        = _coroutine('uploadFiles')
+    statFile           = _coroutine('statFile')
+    checksumFile       = _coroutine('checksumFile')
+    renameFile         = _coroutine('renameFile')
+    moveFile           = _coroutine('moveFile')
+    copyFile           = _coroutine('copyFile')
+    deleteFile         = _coroutine('deleteFile')
+    check              = _coroutine('check')
+    checkFiles         = _coroutine('checkFiles')
+    upload             = _generator('upload')
+    download           = _generator('download')
+    sync               = _coroutine('sync')
+    mirror             = _coroutine('mirror')
+
+    async def open(self, file, mode='r', buffering=-1, encoding=None, errors=None, newline=None, readAhead=0, writeBuffer=0, writeBehind=0):
+        """
+        See :meth:`PCloud.open() <pcloud.PCloud.open()>`.
+
+        :return: :class:`AsyncPCloudStream` wrapping the file object.
+        """
+        return AsyncPCloudStream(self, await self._run(self._pCloud.open, file, mode, buffering, encoding, errors, newline, readAhead, writeBuffer, writeBehind))
+
+    async def openFile(self, file, flags=0, readAhead=0, writeBuffer=0, writeBehind=0):
+        """
+        See :meth:`PCloud.openFile() <pcloud.PCloud.openFile()>`.
+
+        :return: :class:`AsyncPCloudFile` respesenting the opened file.
+        """
+        return AsyncPCloudFile(self, await self._run(self._pCloud.openFile, file, flags, readAhead, writeBuffer, writeBehind))
+
+    async def createFile(self, folder, name, flags=0, readAhead=0, writeBuffer=0, writeBehind=0):
+        """
+        See :meth:`PCloud.createFile() <pcloud.PCloud.createFile()>`.
+
+        :return: :class:`AsyncPCloudFile` respesenting the opened file.
+        """
+        return AsyncPCloudFile(self, await self._run(self._pCloud.createFile, folder, name, flags, readAhead, writeBuffer, writeBehind))
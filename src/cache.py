@@ -0,0 +1,99 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import time
+
+from collections import OrderedDict
+from threading import Lock
+
+class PCloudCache:
+    """
+    Cache for the metadata returned by *PCloud* API methods.
+
+    The entries expire after :attr:`ttl` seconds and, once the cache holds :attr:`maxSize` entries,
+    the least recently used entries are evicted. Each entry is associated with a set of *tags*
+    (e.g. ``('fileid', 1)``), so that all the entries related to an item can be invalidated at once.
+
+    .. note::
+        This class is meant to be used internally by :class:`~pcloud.PCloud`, which invalidates the entries
+        affected by the changes it makes. Changes made by other clients are only seen once the entries expire.
+
+    :param maxSize: An optional integer giving the maximum number of entries.
+    :param ttl: An optional number of seconds after which entries expire.
+    """
+
+    def __init__(self, maxSize=1024, ttl=60):
+        if (maxSize < 1):
+            raise ValueError(f"Invalid maximum cache size: {maxSize}")
+        self.maxSize = maxSize
+        self.ttl = ttl
+
+        self.__entries = OrderedDict()
+        self.__lock = Lock()
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries)
+
+    def get(self, key):
+        """
+        Gets the value of an entry.
+
+        :param key: A hashable object identifying the entry.
+        :return: The value of the entry or ``None`` if there is no such entry or if it has expired.
+        """
+        with self.__lock:
+            try:
+                expires, value, _ = self.__entries[key]
+            except KeyError:
+                return None
+            if (time.monotonic() >= expires):
+                del self.__entries[key]
+                return None
+            self.__entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, tags=()):
+        """
+        Adds or replaces an entry.
+
+        :param key: A hashable object identifying the entry.
+        :param value: The value of the entry (must not be ``None``).
+        :param tags: An optional iterable of hashable objects used to invalidate the entry (see :meth:`invalidate()`).
+        """
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + self.ttl, value, frozenset(tags))
+            self.__entries.move_to_end(key)
+            while (len(self.__entries) > self.maxSize):
+                self.__entries.popitem(last=False)
+
+    def invalidate(self, *tags):
+        """
+        Removes the entries associated with any of the given tags.
+
+        :param tags: Hashable objects given as tags to :meth:`set()`.
+        """
+        with self.__lock:
+            for key in [k for k, (_, _, t) in self.__entries.items() if not t.isdisjoint(tags)]:
+                del self.__entries[key]
+
+    def clear(self):
+        """
+        Removes all the entries.
+        """
+        with self.__lock:
+            self.__entries.clear()
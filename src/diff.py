@@ -0,0 +1,83 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+class PCloudTreeDiff:
+    """
+    Differences between two versions of a *PCloud* folder tree, as returned by :meth:`PCloud.refresh() <pcloud.PCloud.refresh()>`.
+
+    The differences are given by the following attributes:
+      - ``added`` A list of the :class:`~.info.PCloudInfo` of the new files and folders (including the contents of new folders).
+      - ``removed`` A list of the :class:`~.info.PCloudInfo` of the files and folders which are not in the tree anymore
+        (including the contents of removed folders).
+      - ``modified`` A list of tuples ``(old, new)`` giving the information about the files whose contents changed
+        (their ``hash``, ``size`` or ``modified`` fields changed).
+      - ``moved`` A list of tuples ``(old, new)`` giving the information about the files and folders which have been
+        renamed or moved to another folder of the tree.
+
+    The number of differences is obtained with :func:`len`.
+    """
+
+    def __init__(self):
+        self.added = []
+        self.removed = []
+        self.modified = []
+        self.moved = []
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.modified) + len(self.moved)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(added={len(self.added)}, removed={len(self.removed)}, modified={len(self.modified)}, moved={len(self.moved)})"
+
+    @staticmethod
+    def items(folder):
+        """
+        Lists the items of a tree, without loading the contents of the folders whose contents are not known.
+
+        :param folder: A :class:`~.info.PCloudFolderInfo`.
+        :return: A list of the :class:`~.info.PCloudInfo` in the tree (**folder** first).
+        """
+        items = []
+        folders = [folder]
+        while (len(folders) != 0):
+            f = folders.pop()
+            items.append(f)
+            if f.isFolder and f.contentsLoaded:
+                folders.extend(reversed(list(f)))
+        return items
+
+    @staticmethod
+    def key(item):
+        """
+        Gets the key identifying an item in a tree.
+
+        :param item: A :class:`~.info.PCloudInfo`.
+        :return: A tuple ``(isFolder, id)``.
+        """
+        return (item.isFolder, item.id)
+
+    @staticmethod
+    def changed(old, new, fields):
+        """
+        Tells whether the given fields differ between two versions of an item.
+
+        :param old: A :class:`~.info.PCloudInfo`.
+        :param new: A :class:`~.info.PCloudInfo`.
+        :param fields: A list of attribute names.
+        :return: A boolean value indicating whether any of the fields differ (or is missing in only one of the versions).
+        """
+        return any([getattr(old, f, None) != getattr(new, f, None) for f in fields])
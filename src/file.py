@@ -15,10 +15,69 @@
 # You should have received a copy of the GNU General Public License
 # along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
 
+import collections
+import mmap
+import os
+import queue
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
 from warnings import warn as warning
 
 from .error import PCloudError
 
+def _pread(srcFile, count, offset, lock):
+    if hasattr(os, 'pread'):
+        return os.pread(srcFile.fileno(), count, offset)
+    else: #pragma: no cover
+        with lock:
+            srcFile.seek(offset)
+            return srcFile.read(count)
+
+def _pwrite(destFile, data, offset, lock):
+    if hasattr(os, 'pwrite'):
+        view = memoryview(data)
+        while (len(view) > 0):
+            n = os.pwrite(destFile.fileno(), view, offset)
+            view = view[n:]
+            offset += n
+    else: #pragma: no cover
+        with lock:
+            destFile.seek(offset)
+            destFile.write(data)
+
+def _map(srcFile):
+    try:
+        fd = srcFile.fileno()
+        # Only map actual files (not objects wrapping something else)
+        if not isinstance(fd, int) or (os.fstat(fd).st_size == 0):
+            return None
+        return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        return None
+
+def _unmap(mapping):
+    try:
+        mapping.close()
+    except BufferError: #pragma: no cover
+        # A view is still referenced (e.g. by a pending request): the mapping is closed when it is released
+        pass
+
+class PCloudTransferEvent(int):
+    """
+    Progress of a transfer, as yielded by :meth:`PCloudFile.uploadFile()` and :meth:`PCloudFile.downloadFile()`.
+
+    It is an integer giving the current file pointer position, which also provides the size of the blocks being transferred.
+
+    :param offset: An integer giving the current file pointer position.
+    :param blockSize: An integer giving the size of the data blocks being transferred.
+    """
+    def __new__(cls, offset, blockSize):
+        obj = super().__new__(cls, offset)
+        obj.blockSize = blockSize
+        return obj
+
 class PCloudFile:
     """
     Class representation for *PCloud* API file objects (a.k.a file descriptors).
@@ -32,24 +91,70 @@ class PCloudFile:
         with pCloud.createFile(0, 'test.txt') as pCloudFile:
             print(pCloudFile.write('Hello world!'))
 
+    When a read-ahead size is given, the file pointer position is tracked locally and the data is read with ``file_pread``.
+    Once two consecutive calls to :meth:`read()` are sequential, the next blocks (up to the read-ahead size) are read
+    in the background and the following calls to :meth:`read()` are served from memory.
+    The requests on the file descriptor are then sent by a single background thread, so that they remain sequential.
+    The prefetched data is discarded when the file is written, truncated or when the file pointer is moved.
+
+    When a write buffer size is given, consecutive calls to :meth:`write()` are coalesced and the data is sent
+    once the buffer is full, or when :meth:`flush()` or any other method is called. When a number of background writes
+    is also given, full buffers are sent in the background, while the next writes are buffered.
+    The errors of the background writes are raised by the first call which waits for them:
+    :meth:`write()` when all the background writes are pending, or any other method (including :meth:`close()`).
+
     :param pCloud: :class:`~pcloud.PCloud` instance
     :param fd: An integer file descriptor.
     :param fileId: An integer file id.
+    :param readAhead: An optional integer giving the number of bytes to be read ahead (read-ahead is disabled by default).
+    :param writeBuffer: An optional integer giving the size of the write buffer (writes are not buffered by default).
+    :param writeBehind: An optional integer giving the maximum number of buffers being written in the background (none by default).
     """
 
     blockSize = 524288
     """ Default size for the data blocks read by :meth:`downloadFile()` or written by :meth:`uploadFile()` """
 
-    def __init__(self, pCloud, fd, fileId):
+    minBlockSize = 65536
+    """ Minimum size for the data blocks when the block size is adapted to the link """
+
+    maxBlockSize = 16777216
+    """ Maximum size for the data blocks when the block size is adapted to the link """
+
+    blockDuration = 1
+    """ Duration (in seconds) of the requests targeted when the block size is adapted to the link """
+
+    def __init__(self, pCloud, fd, fileId, readAhead=0, writeBuffer=0, writeBehind=0):
         self.__pCloud = pCloud
         self.__fd = fd
         self.__fileId = fileId
         self.__isOpen = True
+        self.__readAhead = readAhead
+        self.__executor = None
+        self.__blocks = collections.deque()
+        self.__position = None
+        self.__synced = True
+        self.__lastEnd = None
+        self.__end = None
+        self.__writeBuffer = writeBuffer
+        self.__writeBehind = writeBehind
+        self.__buffer = bytearray()
+        self.__bufferOffset = None
+        self.__writes = collections.deque()
 
     def __enter__(self):
         return self
 
     def __exit__(self, *args):
+        try:
+            self.flush()
+        except BaseException as e:
+            if args[0] is None:
+                raise
+            warning(f"Could not flush file {self.__fd} due to exception:\n {e.__class__.__name__ }: {e}")
+        finally:
+            self.__close()
+
+    def __close(self):
         attempts = 0
         while (self.__isOpen):
             attempts += 1
@@ -74,17 +179,111 @@ class PCloudFile:
         :param offset: An optional integer giving the position where to read data in the file.
         :return: A byte array containing the data that has been read in the file
         """
-        return self.__pCloud.readFile(self.__fd, count, offset=offset)
+        self.flush()
+        if not self.__readAhead:
+            return self.__pCloud.readFile(self.__fd, count, offset=offset)
+
+        if offset is None:
+            if self.__position is None:
+                self.__position = self.__call(self.__pCloud.offsetFile, self.__fd)
+            position = self.__position
+        else:
+            position = offset
+
+        if (position != self.__lastEnd):
+            self.__dropReadAhead()
+            data = self.__call(self.__pCloud.readFile, self.__fd, count, offset=position)
+        else:
+            self.__prefetch(position)
+            chunks = []
+            end = position
+            while (end - position < count):
+                if (len(self.__blocks) == 0) and ((self.__end is None) or (end < self.__end)):
+                    # Reads larger than the read-ahead size need more blocks
+                    self.__prefetch(end)
+                if (len(self.__blocks) == 0):
+                    break
+                blockOffset, blockSize, future = self.__blocks[0]
+                block = future.result()
+                chunk = block[end - blockOffset:end - blockOffset + count - (end - position)]
+                chunks.append(chunk)
+                end += len(chunk)
+                if (end < blockOffset + len(block)):
+                    break
+                self.__blocks.popleft()
+                if (len(block) < blockSize):
+                    # End of file: the next blocks are empty
+                    self.__end = blockOffset + len(block)
+                    while (len(self.__blocks) != 0):
+                        self.__blocks.popleft()[2].cancel()
+                    break
+            data = b''.join(chunks)
+            self.__prefetch(end)
+
+        self.__lastEnd = position + len(data)
+        if offset is None:
+            self.__position = position + len(data)
+            self.__synced = False
+        return data
+
+    def readinto(self, buffer, offset=None):
+        """
+        Reads data at the current pointer position from the file into the given buffer.
+
+        The data is received directly into **buffer**, instead of being returned as a new byte array.
+
+        :param buffer: A writable bytes-like object (``bytearray``, ``memoryview``, ``mmap``). At most ``len(buffer)`` bytes are read.
+        :param offset: An optional integer giving the position where to read data in the file.
+        :return: An integer giving the number of bytes that have been read in the file.
+        """
+        if self.__readAhead:
+            # The data has already been received in the read-ahead blocks
+            view = memoryview(buffer).cast('B')
+            data = self.read(len(view), offset)
+            view[:len(data)] = data
+            return len(data)
+        self.flush()
+        return self.__pCloud.readFileInto(self.__fd, buffer, offset=offset)
 
     def write(self, data, offset=None):
         """
         Writes the given data to the file at the current pointer position.
 
-        :param data: A byte array containing the data to be written in the file.
+        :param data: A bytes-like object (``bytes``, ``bytearray``, ``memoryview``, ``mmap``) containing the data to be written in the file.
         :param offset: An optional integer giving the position where to write the data in the file.
-        :return: A byte array containing the data that has been read in the file
+        :return: An integer giving the number of bytes written (or buffered) in the file.
+        """
+        self.__dropReadAhead()
+        if offset is None:
+            self.__syncPosition()
+            # The file pointer may be moved to the end of the file (when opened with O_APPEND)
+            self.__position = None
+        if not self.__writeBuffer:
+            return self.__call(self.__pCloud.writeFile, self.__fd, data, offset=offset)
+
+        if (len(self.__buffer) != 0):
+            if (offset is None) != (self.__bufferOffset is None):
+                self.__sendBuffer()
+            elif (offset is not None) and (offset != self.__bufferOffset + len(self.__buffer)):
+                self.__sendBuffer()
+        if (len(self.__buffer) == 0):
+            self.__bufferOffset = offset
+        data = memoryview(data).cast('B')
+        self.__buffer += data
+        if (len(self.__buffer) >= self.__writeBuffer):
+            self.__sendBuffer()
+        return len(data)
+
+    def flush(self):
         """
-        return self.__pCloud.writeFile(self.__fd, data, offset=offset)
+        Sends the buffered data and waits for the writes running in the background.
+
+        The error raised by the first failing write (if any) is raised once all the background writes are finished.
+        """
+        if (len(self.__buffer) != 0):
+            self.__sendBuffer()
+        while (len(self.__writes) != 0):
+            self.__waitWrite()
 
     def truncate(self, length):
         """
@@ -92,7 +291,9 @@ class PCloudFile:
 
         :param length: An integer giving the length at which to truncate the file.
         """
-        self.__pCloud.truncateFile(self.__fd, length)
+        self.flush()
+        self.__dropReadAhead()
+        self.__call(self.__pCloud.truncateFile, self.__fd, length)
 
     def seek(self, offset, origin=0):
         """
@@ -102,76 +303,301 @@ class PCloudFile:
         :param origin: Optional :class:`PCloud.OffsetOrigin <pcloud.PCloud.OffsetOrigin>`.
         :return: An integer giving the new file pointer position (from the start of the file).
         """
-        return self.__pCloud.seekFile(self.__fd, offset, origin)
+        self.flush()
+        self.__dropReadAhead()
+        self.__syncPosition()
+        self.__position = self.__call(self.__pCloud.seekFile, self.__fd, offset, origin)
+        return self.__position
 
-    def uploadFile(self, srcFile, offset):
+    def uploadFile(self, srcFile, offset, adaptive=False, hashes=()):
         """
         Uploads the given file the the *PCloud* file by blocks of size :attr:`~PCloudFile.blockSize`.
 
+        When **adaptive** is set, the duration of each request is measured and the size of the next block is adapted
+        so that a request lasts about :attr:`~PCloudFile.blockDuration` (the size of the blocks at most doubles
+        or halves after each request and stays between :attr:`~PCloudFile.minBlockSize` and :attr:`~PCloudFile.maxBlockSize`).
+
         .. note::
             This method is meant to be used internally by :meth:`PCloud.upload() <pcloud.PCloud.upload()>`
 
+        When the file can be memory-mapped (a regular, non-empty file), the blocks are sent as views
+        over the mapping, without being copied. Otherwise they are read with ``srcFile.read()``.
+
+        The blocks which are sent are also fed to the given **hashes** (objects from :mod:`hashlib`), so that the checksum
+        of the uploaded data is computed without reading the file again.
+
         :param srcFile: A ``file`` from wich to read data.
         :param offset: The offset at which to start reading data.
-        :yield: The current file pointer position.
+        :param adaptive: An optional boolean value indicating whether the size of the blocks should be adapted to the link.
+        :param hashes: An optional list of hash objects to be updated with the uploaded data.
+        :yield: A :class:`PCloudTransferEvent` giving the current file pointer position and the size of the next block.
         """
+        blockSize = self.__class__.blockSize
         srcFile.seek(offset)
-        yield offset
-
-        while True:
-            data = srcFile.read(self.__class__.blockSize)
-            #print(f'data: "{data}"')
-            if (len(data) == 0):
-                return
-
-            offset += self.write(data, offset)
-            yield offset
-
-    def downloadFile(self, destFile, offset):
+        mapping = _map(srcFile)
+        try:
+            yield PCloudTransferEvent(offset, blockSize)
+
+            while True:
+                if (mapping is not None) and (offset >= len(mapping)):
+                    return
+                elif mapping is not None:
+                    data = memoryview(mapping)[offset:offset + blockSize]
+                else:
+                    data = srcFile.read(blockSize)
+                #print(f'data: "{data}"')
+                if (len(data) == 0):
+                    return
+
+                start = time.perf_counter()
+                count = self.write(data, offset)
+                offset += count
+                if adaptive:
+                    blockSize = self.__adaptBlockSize(blockSize, len(data), time.perf_counter() - start)
+                for h in hashes:
+                    h.update(data[:count])
+                if mapping is not None:
+                    data.release()
+                yield PCloudTransferEvent(offset, blockSize)
+        finally:
+            if mapping is not None:
+                _unmap(mapping)
+
+    def downloadFile(self, destFile, offset, adaptive=False):
         """
         Downloads the *PCloud* file to the given file by blocks of size :attr:`~PCloudFile.blockSize`.
 
+        When **adaptive** is set, the size of the blocks is adapted as in :meth:`uploadFile()`.
+
         .. note::
             This method is meant to be used internally by :meth:`PCloud.download() <pcloud.PCloud.download()>`
 
         :param srcFile: A ``file`` to which to write data.
         :param offset: The offset at which to start writing data.
-        :yield: The current file pointer position.
+        :param adaptive: An optional boolean value indicating whether the size of the blocks should be adapted to the link.
+        :yield: A :class:`PCloudTransferEvent` giving the current file pointer position and the size of the next block.
         """
+        blockSize = self.__class__.blockSize
+        buffer = bytearray(blockSize)
         destFile.seek(offset)
-        yield offset
+        yield PCloudTransferEvent(offset, blockSize)
 
         while True:
-            data = self.read(self.__class__.blockSize, offset)
-            #print(f'data: "{data}"')
-            if (len(data) == 0):
+            if (len(buffer) < blockSize):
+                buffer = bytearray(blockSize)
+            start = time.perf_counter()
+            count = self.readinto(memoryview(buffer)[:blockSize], offset)
+            if (count == 0):
                 return
+            if adaptive:
+                blockSize = self.__adaptBlockSize(blockSize, count, time.perf_counter() - start)
+
+            destFile.write(memoryview(buffer)[:count])
+            offset += count
+            yield PCloudTransferEvent(offset, blockSize)
+
+    @classmethod
+    def __adaptBlockSize(cls, blockSize, count, duration):
+        if (count < blockSize):
+            return blockSize
+        if (duration <= 0):
+            target = 2 * blockSize
+        else:
+            target = int(count * cls.blockDuration / duration)
+        target = max(blockSize // 2, min(2 * blockSize, target))
+        return max(cls.minBlockSize, min(cls.maxBlockSize, target))
+
+    @classmethod
+    def __transferRanges(cls, pCloudFiles, ranges, transfer):
+        blocks = queue.SimpleQueue()
+        for b, e in ranges:
+            for o in range(b, e, cls.blockSize):
+                blocks.put((o, min(o + cls.blockSize, e)))
+        results = queue.SimpleQueue()
+        stop = threading.Event()
+        lock = threading.Lock()
+
+        def work(pCloudFile):
+            try:
+                while not stop.is_set():
+                    try:
+                        begin, end = blocks.get_nowait()
+                    except queue.Empty:
+                        break
+                    while (begin < end) and not stop.is_set():
+                        n = transfer(pCloudFile, begin, end, lock)
+                        if (n == 0):
+                            raise EOFError(f"Unexpected end of file at offset {begin}")
+                        results.put((begin, begin + n))
+                        begin += n
+            except BaseException as e:
+                stop.set()
+                results.put(e)
+            finally:
+                results.put(None)
+
+        workers = [threading.Thread(target=work, args=(f,), daemon=True) for f in pCloudFiles]
+        for w in workers:
+            w.start()
+        try:
+            running = len(workers)
+            while (running > 0):
+                r = results.get()
+                if r is None:
+                    running -= 1
+                elif isinstance(r, BaseException):
+                    raise r
+                else:
+                    yield r
+        finally:
+            stop.set()
+            for w in workers:
+                w.join()
+
+    @classmethod
+    def uploadRanges(cls, pCloudFiles, srcFile, ranges):
+        """
+        Uploads the given byte ranges of the given file to a *PCloud* file by blocks of size :attr:`~PCloudFile.blockSize`.
 
-            destFile.write(data)
-            offset += len(data)
-            yield offset
+        One worker thread is started for each of the given *PCloud* files, which must all be opened on the same *PCloud* file.
+        The workers read disjoint blocks of the source file concurrently and write them at their position in the *PCloud* file.
+
+        .. note::
+            This method is meant to be used internally by :meth:`PCloud.upload() <pcloud.PCloud.upload()>`
+
+        :param pCloudFiles: A list of :class:`PCloudFile` opened on the *PCloud* file to upload to.
+        :param srcFile: A ``file`` from which to read data. It must be opened in binary mode.
+        :param ranges: A list of tuples ``(begin, end)`` giving the byte ranges to upload.
+        :yield: A tuple ``(begin, end)`` for each byte range which has been uploaded.
+        """
+        def transfer(pCloudFile, begin, end, lock):
+            data = _pread(srcFile, end - begin, begin, lock)
+            if (len(data) == 0):
+                return 0
+            return pCloudFile.write(data, begin)
+
+        return cls.__transferRanges(pCloudFiles, ranges, transfer)
+
+    @classmethod
+    def downloadRanges(cls, pCloudFiles, destFile, ranges):
+        """
+        Downloads the given byte ranges of a *PCloud* file to the given file by blocks of size :attr:`~PCloudFile.blockSize`.
+
+        One worker thread is started for each of the given *PCloud* files, which must all be opened on the same *PCloud* file.
+        The workers read disjoint blocks concurrently and write them at their position in the destination file.
+
+        .. note::
+            This method is meant to be used internally by :meth:`PCloud.download() <pcloud.PCloud.download()>`
+
+        :param pCloudFiles: A list of :class:`PCloudFile` opened on the *PCloud* file to download.
+        :param destFile: A ``file`` to which to write data. It must be opened in binary mode and already have its final size.
+        :param ranges: A list of tuples ``(begin, end)`` giving the byte ranges to download.
+        :yield: A tuple ``(begin, end)`` for each byte range which has been downloaded.
+        """
+        def transfer(pCloudFile, begin, end, lock):
+            data = pCloudFile.read(end - begin, begin)
+            _pwrite(destFile, data, begin, lock)
+            return len(data)
+
+        return cls.__transferRanges(pCloudFiles, ranges, transfer)
+
+    @property
+    def fileId(self):
+        """
+        An integer representing the id of the file.
+        """
+        return self.__fileId
 
     @property
     def size(self):
         """
         An integer representing the size of the file in bytes.
         """
-        return self.__pCloud.sizeFile(self.__fd)
+        self.flush()
+        return self.__call(self.__pCloud.sizeFile, self.__fd)
 
     @property
     def offset(self):
         """
         An integer representing the file pointer position (from the start of the file).
         """
-        return self.__pCloud.offsetFile(self.__fd)
+        self.flush()
+        if not self.__synced:
+            return self.__position
+        return self.__call(self.__pCloud.offsetFile, self.__fd)
 
     @offset.setter
     def offset(self, offset):
-        self.__pCloud.seekFile(self.__fd, offset)
+        self.seek(offset)
 
     def close(self):
         """
-        Closes the file.
+        Closes the file (after flushing the buffered data).
         """
+        self.flush()
+        self.__dropReadAhead()
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
         self.__pCloud.closeFile(self.__fd)
         self.__isOpen = False
+
+    def __call(self, fun, *args, **kwArgs):
+        if self.__executor is None:
+            return fun(*args, **kwArgs)
+        return self.__executor.submit(fun, *args, **kwArgs).result()
+
+    def __sendBuffer(self):
+        data = bytes(self.__buffer)
+        offset = self.__bufferOffset
+        self.__buffer = bytearray()
+        self.__bufferOffset = None
+        if not self.__writeBehind:
+            self.__call(self.__writeAll, data, offset)
+        else:
+            if (len(self.__writes) >= self.__writeBehind):
+                self.__waitWrite()
+            self.__writes.append(self.__getExecutor().submit(self.__writeAll, data, offset))
+
+    def __writeAll(self, data, offset):
+        written = self.__pCloud.writeFile(self.__fd, data, offset=offset)
+        if (written != len(data)):
+            raise IOError(f"Short write: {written} bytes written out of {len(data)}")
+
+    def __waitWrite(self):
+        try:
+            self.__writes.popleft().result()
+        except BaseException:
+            while (len(self.__writes) != 0):
+                try:
+                    self.__writes.popleft().result()
+                except BaseException:
+                    pass
+            raise
+
+    def __getExecutor(self):
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=1)
+        return self.__executor
+
+    def __syncPosition(self):
+        if not self.__synced:
+            self.__call(self.__pCloud.seekFile, self.__fd, self.__position)
+            self.__synced = True
+
+    def __prefetch(self, position):
+        executor = self.__getExecutor()
+        blockSize = min(self.__class__.blockSize, self.__readAhead)
+        if (len(self.__blocks) != 0):
+            offset = self.__blocks[-1][0] + self.__blocks[-1][1]
+        else:
+            offset = position
+        while (offset - position < self.__readAhead) and ((self.__end is None) or (offset < self.__end)):
+            self.__blocks.append((offset, blockSize, executor.submit(self.__pCloud.readFile, self.__fd, blockSize, offset=offset)))
+            offset += blockSize
+
+    def __dropReadAhead(self):
+        while (len(self.__blocks) != 0):
+            self.__blocks.popleft()[2].cancel()
+        self.__lastEnd = None
+        self.__end = None
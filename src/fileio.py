@@ -0,0 +1,203 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import io
+
+from .file import PCloudFile
+
+class PCloudFileIO(io.RawIOBase):
+    """
+    Raw binary stream (see :class:`io.RawIOBase`) reading and writing a *PCloud* file.
+
+    The stream position is tracked locally: data is read with ``file_pread`` and written with ``file_pwrite``
+    at the stream position, so that :meth:`tell()` does not send any request. It can be wrapped into :class:`io.BufferedReader`,
+    :class:`io.BufferedWriter`, :class:`io.TextIOWrapper` or used by standard library modules
+    (e.g. :mod:`gzip`, :mod:`tarfile`, :mod:`zipfile`) to stream remote files without a local copy.
+    It is usually obtained with :meth:`PCloud.open() <pcloud.PCloud.open()>`.
+
+    Closing the stream closes the underlying :class:`~.file.PCloudFile`.
+
+    :param pCloudFile: The :class:`~.file.PCloudFile` to read or write.
+    :param mode: An optional string giving the mode of the stream (``'r'``, ``'w'``, ``'x'`` or ``'a'``, optionally followed by ``'+'``).
+    """
+
+    def __init__(self, pCloudFile, mode='r'):
+        super().__init__()
+        if (mode.rstrip('+') not in ('r', 'w', 'x', 'a')) or (mode.count('+') > 1):
+            raise ValueError(f"Invalid mode: '{mode}'")
+        self.__file = pCloudFile
+        self.__readable = mode.startswith('r') or ('+' in mode)
+        self.__writable = not mode.startswith('r') or ('+' in mode)
+        self.mode = mode
+        self.name = pCloudFile.fileId
+        if mode.startswith('a'):
+            self.__end = pCloudFile.size
+            self.__position = self.__end
+        else:
+            self.__end = None
+            self.__position = 0
+
+    @property
+    def file(self):
+        """
+        The underlying :class:`~.file.PCloudFile`.
+        """
+        return self.__file
+
+    def readable(self):
+        """
+        Tells whether the stream can be read.
+
+        :return: A boolean value indicating whether the stream was opened for reading.
+        """
+        self._checkClosed()
+        return self.__readable
+
+    def writable(self):
+        """
+        Tells whether the stream can be written.
+
+        :return: A boolean value indicating whether the stream was opened for writing.
+        """
+        self._checkClosed()
+        return self.__writable
+
+    def seekable(self):
+        """
+        Tells whether the stream supports random access.
+
+        :return: ``True``
+        """
+        self._checkClosed()
+        return True
+
+    def readinto(self, buffer):
+        """
+        Reads data at the stream position into the given buffer.
+
+        :param buffer: A writable bytes-like object.
+        :return: An integer giving the number of bytes read (``0`` at the end of the file).
+        """
+        self._checkClosed()
+        if not self.__readable:
+            raise io.UnsupportedOperation("File not open for reading")
+        view = memoryview(buffer).cast('B')
+        if (len(view) == 0):
+            return 0
+        count = self.__file.readinto(view, self.__position)
+        self.__position += count
+        return count
+
+    def readall(self):
+        """
+        Reads data from the stream position until the end of the file.
+
+        :return: A byte string containing the data.
+        """
+        self._checkClosed()
+        if not self.__readable:
+            raise io.UnsupportedOperation("File not open for reading")
+        chunks = []
+        while True:
+            data = self.__file.read(PCloudFile.blockSize, self.__position)
+            if (len(data) == 0):
+                return b''.join(chunks)
+            chunks.append(data)
+            self.__position += len(data)
+
+    def write(self, data):
+        """
+        Writes data at the stream position.
+
+        :param data: A bytes-like object.
+        :return: An integer giving the number of bytes written.
+        """
+        self._checkClosed()
+        if not self.__writable:
+            raise io.UnsupportedOperation("File not open for writing")
+        if self.__end is not None:
+            self.__position = self.__end
+        written = self.__file.write(bytes(data), self.__position)
+        self.__position += written
+        if self.__end is not None:
+            self.__end = self.__position
+        return written
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """
+        Moves the stream position (no request is sent, unless **whence** is :data:`io.SEEK_END`).
+
+        :param offset: An integer giving the new position, relative to **whence**.
+        :param whence: An optional integer (:data:`io.SEEK_SET`, :data:`io.SEEK_CUR` or :data:`io.SEEK_END`).
+        :return: An integer giving the new stream position.
+        """
+        self._checkClosed()
+        if (whence == io.SEEK_SET):
+            position = offset
+        elif (whence == io.SEEK_CUR):
+            position = self.__position + offset
+        elif (whence == io.SEEK_END):
+            position = self.__file.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if (position < 0):
+            raise ValueError(f"Negative seek position: {position}")
+        self.__position = position
+        return position
+
+    def tell(self):
+        """
+        Gives the stream position (no request is sent).
+
+        :return: An integer giving the stream position.
+        """
+        self._checkClosed()
+        return self.__position
+
+    def truncate(self, size=None):
+        """
+        Truncates the file (the stream position is not changed).
+
+        :param size: An optional integer giving the new size of the file (defaults to the stream position).
+        :return: An integer giving the new size of the file.
+        """
+        self._checkClosed()
+        if not self.__writable:
+            raise io.UnsupportedOperation("File not open for writing")
+        if size is None:
+            size = self.__position
+        self.__file.truncate(size)
+        if self.__end is not None:
+            self.__end = size
+        return size
+
+    def flush(self):
+        """
+        Flushes the data buffered by the underlying :class:`~.file.PCloudFile`.
+        """
+        super().flush()
+        self.__file.flush()
+
+    def close(self):
+        """
+        Closes the stream and the underlying :class:`~.file.PCloudFile`.
+        """
+        if not self.closed:
+            try:
+                super().close()
+            finally:
+                self.__file.__exit__(None, None, None)
@@ -0,0 +1,220 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import posixpath
+
+from threading import Lock
+
+class PCloudPathIndex:
+    """
+    Client-side index mapping *PCloud* paths to file and folder ids.
+
+    The index is populated with the metadata returned by *PCloud* API methods (see :meth:`add()`).
+    Items are identified by tuples ``('fileid', id)`` or ``('folderid', id)``. The path of an item
+    is taken from its metadata or derived from the path of its parent folder, when it is known.
+    When all the contents of a folder have been listed, the index also knows which paths do not exist in it
+    (see :meth:`exists()`).
+
+    .. note::
+        This class is meant to be used internally by :class:`~pcloud.PCloud`, which keeps it up to date
+        with the changes it makes. Changes made by other clients are not seen until the folders are listed again.
+    """
+
+    def __init__(self):
+        self.__paths = {}
+        self.__items = {}
+        self.__children = {}
+        self.__complete = set()
+        self.__lock = Lock()
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__paths)
+
+    @staticmethod
+    def normalize(path):
+        """
+        Normalizes a *PCloud* path (removes duplicate and trailing slashes).
+
+        :param path: A string containing an absolute path.
+        :return: A string containing the normalized path.
+        """
+        return posixpath.normpath('/' + path.lstrip('/'))
+
+    def lookup(self, path):
+        """
+        Looks up a path in the index.
+
+        :param path: A string containing an absolute path.
+        :return: A tuple ``('fileid', id)`` or ``('folderid', id)``, or ``None`` if the path is not in the index.
+        """
+        with self.__lock:
+            return self.__paths.get(self.normalize(path))
+
+    def path(self, item):
+        """
+        Gets the path of an item.
+
+        :param item: A tuple ``('fileid', id)`` or ``('folderid', id)``.
+        :return: A string containing the path of the item, or ``None`` if the item is not in the index.
+        """
+        with self.__lock:
+            return self.__items.get(item)
+
+    def exists(self, path):
+        """
+        Tells whether a path exists, without sending any request.
+
+        :param path: A string containing an absolute path.
+        :return: ``True`` if the path is in the index, ``False`` if it is not in its parent folder
+            (whose contents have been listed) or ``None`` if it is not known.
+        """
+        path = self.normalize(path)
+        with self.__lock:
+            if path in self.__paths:
+                return True
+            parent = self.__paths.get(posixpath.dirname(path))
+            if parent in self.__complete:
+                return False
+            return None
+
+    def add(self, metadata, path=None, complete=False):
+        """
+        Adds an item (and its contents, if any) to the index.
+
+        When the item is already in the index with another path (it has been renamed or moved),
+        the paths of its contents are updated.
+
+        :param metadata: A dictionary containing folder or file information returned by *PCloud* API methods.
+        :param path: An optional string giving the path of the item (when it is not in the metadata).
+        :param complete: An optional boolean value indicating whether the contents in the metadata are all the contents of the folder(s).
+        """
+        with self.__lock:
+            self.__add(metadata, path, complete)
+
+    def __add(self, metadata, path, complete):
+        item = self.__item(metadata)
+        if item is None:
+            return
+        if 'path' in metadata:
+            path = metadata['path']
+        elif (item == ('folderid', 0)):
+            path = '/'
+        elif (path is None) and ('parentfolderid' in metadata) and ('name' in metadata):
+            parent = self.__items.get(('folderid', metadata['parentfolderid']))
+            if parent is not None:
+                path = posixpath.join(parent, metadata['name'])
+        if (path is None) or metadata.get('isdeleted', False):
+            self.__remove(item)
+            return
+        path = self.normalize(path)
+
+        oldPath = self.__items.get(item)
+        if (oldPath is not None) and (oldPath != path):
+            self.__move(oldPath, path)
+        elif (self.__paths.get(path, item) != item):
+            self.__remove(self.__paths[path])
+        self.__setPath(path, item)
+
+        if 'contents' in metadata:
+            children = {}
+            for child in metadata['contents']:
+                childItem = self.__item(child)
+                if (childItem is not None) and ('name' in child) and not child.get('isdeleted', False):
+                    children[posixpath.join(path, child['name'])] = childItem
+            if complete:
+                # Remove the items which are not in the folder anymore:
+                for p in list(self.__children.get(path, ())):
+                    i = self.__paths.get(p)
+                    if (i is not None) and (children.get(p) != i):
+                        self.__remove(i)
+                self.__complete.add(item)
+            for child in metadata['contents']:
+                self.__add(child, posixpath.join(path, child['name']) if 'name' in child else None, complete)
+
+    def remove(self, item):
+        """
+        Removes an item (and its contents) from the index.
+
+        :param item: A tuple ``('fileid', id)`` or ``('folderid', id)``.
+        """
+        with self.__lock:
+            self.__remove(item)
+
+    def __remove(self, item):
+        path = self.__items.pop(item, None)
+        self.__complete.discard(item)
+        if path is None:
+            return
+        contents = self.__contents(path)
+        self.__popPath(path)
+        for p in contents:
+            i = self.__popPath(p)
+            del self.__items[i]
+            self.__complete.discard(i)
+
+    def __move(self, oldPath, newPath):
+        if (self.__paths.get(newPath) is not None):
+            self.__remove(self.__paths[newPath])
+        if oldPath not in self.__paths: #pragma: no cover
+            return
+        moved = [(p, self.__popPath(p)) for p in [oldPath] + self.__contents(oldPath)]
+        for p, i in moved:
+            self.__setPath(newPath + p[len(oldPath):], i)
+
+    def __setPath(self, path, item):
+        self.__paths[path] = item
+        self.__items[item] = path
+        if (path != '/'):
+            self.__children.setdefault(posixpath.dirname(path), set()).add(path)
+
+    def __popPath(self, path):
+        item = self.__paths.pop(path)
+        if (path != '/'):
+            parent = posixpath.dirname(path)
+            children = self.__children[parent]
+            children.discard(path)
+            if not children:
+                del self.__children[parent]
+        return item
+
+    def __contents(self, path):
+        # The paths of all the contents of a folder (using the direct children of each folder, so that the whole index is not scanned)
+        contents = []
+        folders = [path]
+        while folders:
+            for p in self.__children.get(folders.pop(), ()):
+                contents.append(p)
+                folders.append(p)
+        return contents
+
+    @staticmethod
+    def __item(metadata):
+        for k in ('fileid', 'folderid'):
+            if k in metadata:
+                return (k, metadata[k])
+        return None
+
+    def clear(self):
+        """
+        Removes all the items from the index.
+        """
+        with self.__lock:
+            self.__paths.clear()
+            self.__items.clear()
+            self.__children.clear()
+            self.__complete.clear()
@@ -20,19 +20,47 @@ class PCloudInfoMeta(type):
     This metaclass allows to select the right :class:`PCloudInfo` subClass
     depending on the metadata.
 
+    Each class keeps a dispatch table mapping the metadata identifiers (``classId``) of its direct subclasses
+    to these subclasses, which is filled in when the subclasses are defined.
+
     :param pc: :class:`~pcloud.PCloud` instance
     :param metadata: A dictionary containing folder or file information returned by *PCloud* API methods.
     """
+    def __init__(cls, name, bases, attrs):
+        super().__init__(name, bases, attrs)
+        cls.__dispatch = ()
+        for base in bases:
+            if isinstance(base, PCloudInfoMeta) and ('classId' in attrs):
+                base.__dispatch += ((attrs['classId'], cls),)
+
+    def __select(cls, metadata):
+        dispatch = cls.__dispatch
+        while len(dispatch) != 0:
+            for classId, subClass in dispatch:
+                if classId in metadata:
+                    cls = subClass
+                    dispatch = subClass.__dispatch
+                    break
+            else:
+                break
+        return cls
+
     def __call__(cls, pc, metadata):
-        for subClass in cls.__subclasses__():
-            try:
-                subClassId = subClass.classId
-            except AttributeError: #pragma: no cover
-                continue
-            if subClassId in metadata:
-                return subClass.__call__(pc, metadata)
+        return type.__call__(cls.__select(metadata), pc, metadata)
+
+    def fromList(cls, pc, metadata):
+        """
+        Creates the information objects for a list of metadata dictionaries.
 
-        return super().__call__(pc, metadata)
+        This is equivalent to ``[PCloudInfo(pc, m) for m in metadata]``, but faster.
+
+        :param pc: :class:`~pcloud.PCloud` instance
+        :param metadata: A list of dictionaries containing folder or file information returned by *PCloud* API methods.
+        :return: A list of :class:`PCloudInfo`.
+        """
+        select = cls.__select
+        new = type.__call__
+        return [new(select(m), pc, m) for m in metadata]
 
 
 class PCloudInfo(metaclass=PCloudInfoMeta):
@@ -57,35 +85,43 @@ class PCloudInfo(metaclass=PCloudInfoMeta):
 
     The instances of this class can be iterated through to get the contents of the item.
     Lazy-loading is implemented if the metadata has not been obtained with :meth:`PCloud.listFolder() <pcloud.PCloud.listFolder()>`
-    with recursion enabled.
+    with recursion enabled. The contents of child folders can be listed in the background (see **prefetch** in :class:`~pcloud.PCloud`).
 
     :param pc: :class:`~pcloud.PCloud` instance
     :param metadata: A dictionary containing folder or file information returned by *PCloud* API methods.
+
+    .. note::
+        The attributes are stored in slots, so that the instances do not carry a dictionary.
+        Attributes for which the metadata has no value are not set (accessing them raises an :class:`AttributeError`).
     """
 
+    attrMap = {
+        'category'      : 'category',
+        'contenttype'   : 'contentType',
+        'comments'      : 'comments',
+        'created'       : 'created',
+        'hash'          : 'hash',
+        'icon'          : 'icon',
+        'ismine'        : 'isMine',
+        'isshared'      : 'isShared',
+        'modified'      : 'modified',
+        'name'          : 'name',
+        'parentfolderid': 'parentFolderId',
+        'path'          : 'path',
+        'size'          : 'size',
+        'thumb'         : 'hasThumb',
+    }
+    """ Metadata fields copied into the instances (and the corresponding attributes) """
+
+    __slots__ = ('_pCloud', 'id') + tuple(attrMap.values())
+
     def __init__(self, pCloud, metadata):
         self._pCloud = pCloud
         try:
             self.id = metadata[self.__class__.classId]
         except AttributeError: #pragma: no cover
             self.id = None
-        attrMap = {
-            'category'      : 'category',
-            'contenttype'   : 'contentType',
-            'comments'      : 'comments',
-            'created'       : 'created',
-            'hash'          : 'hash',
-            'icon'          : 'icon',
-            'ismine'        : 'isMine',
-            'isshared'      : 'isShared',
-            'modified'      : 'modified',
-            'name'          : 'name',
-            'parentfolderid': 'parentFolderId',
-            'path'          : 'path',
-            'size'          : 'size',
-            'thumb'         : 'hasThumb',
-        }
-        for k, v in attrMap.items():
+        for k, v in self.attrMap.items():
             if k in metadata:
                 setattr(self, v, metadata[k])
 
@@ -107,6 +143,8 @@ class PCloudFileInfo(PCloudInfo):
     classId = 'fileid'
     """ Metadata identifier supported by this classs """
 
+    __slots__ = ()
+
     @property
     def isFolder(self):
         return False
@@ -120,10 +158,17 @@ class PCloudFolderInfo(PCloudInfo):
     classId = 'folderid'
     """ Metadata identifier supported by this classs """
 
+    __slots__ = ('__contents',)
+
     def __init__(self, pCloud, metadata):
         super().__init__(pCloud, metadata)
         if 'contents' in metadata:
-            self.__contents = [PCloudInfo(self._pCloud, o) for o in metadata['contents']]
+            contents = metadata['contents']
+            if (len(contents) != 0) and isinstance(contents[0], PCloudInfo):
+                # Already built while the response was decoded (see PCloud.listFolder())
+                self.__contents = contents
+            else:
+                self.__contents = PCloudInfo.fromList(self._pCloud, contents)
         else:
             self.__contents = None
 
@@ -148,3 +193,11 @@ class PCloudFolderInfo(PCloudInfo):
     @property
     def isFolder(self):
         return True
+
+    @property
+    def contentsLoaded(self):
+        """
+        A boolean value indicating whether the contents of the folder are known
+        (so that iterating through the folder does not send any request).
+        """
+        return self.__contents is not None
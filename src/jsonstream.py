@@ -0,0 +1,214 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import codecs
+import json
+import re
+
+from json.decoder import scanstring
+
+class PCloudJsonDecoder:
+    """
+    Incremental JSON decoder, used to parse big responses (e.g. recursive listings) while they are received.
+
+    The data is given to the decoder with :meth:`feed()` as it arrives and the decoded value
+    is obtained with :meth:`close()`. Only the text which has not been decoded yet is kept in memory.
+    Like ``object_hook`` of :func:`json.loads`, **hook** is called with each object (from the innermost ones)
+    as soon as it has been decoded and its return value replaces the object. It is used as follows::
+
+        decoder = PCloudJsonDecoder(hook)
+        for chunk in chunks:
+            decoder.feed(chunk)
+        value = decoder.close()
+
+    Objects which are completely contained in the received text (and smaller than :attr:`chunkSize`)
+    are decoded at once with :mod:`json`, bigger ones are decoded token by token.
+    **hook** is called exactly once for each object.
+
+    .. note::
+        This class is meant to be used internally by :class:`~.transport.PCloudHttpTransport`.
+
+    :param hook: An optional function called with each decoded object.
+    """
+
+    chunkSize = 65536
+    """ The size of the text above which objects are decoded token by token """
+
+    __ws = re.compile(r'[ \t\n\r]*')
+    __number = re.compile(r'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?')
+    __numberChars = re.compile(r'[-+0-9.eE]*')
+    __constants = {'true': True, 'false': False, 'null': None}
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.__decoder = json.JSONDecoder()
+        self.__hookDecoder = json.JSONDecoder(object_hook=hook)
+        self.__text = codecs.getincrementaldecoder('utf-8')()
+        self.__buf = ''
+        self.__pos = 0
+        self.__stack = []
+        self.__expect = 'value'
+        self.__value = None
+
+    def feed(self, data):
+        """
+        Decodes the given data.
+
+        :param data: A bytes-like object containing the next part of the JSON text.
+        """
+        self.__buf = self.__buf[self.__pos:] + self.__text.decode(data)
+        self.__pos = 0
+        self.__decode(False)
+
+    def close(self):
+        """
+        Decodes the end of the JSON text.
+
+        :return: The decoded value.
+        :raise json.JSONDecodeError: If the JSON text is invalid or incomplete.
+        """
+        self.__buf = self.__buf[self.__pos:] + self.__text.decode(b'', True)
+        self.__pos = 0
+        self.__decode(True)
+        if self.__expect != 'end':
+            raise json.JSONDecodeError("Unexpected end of JSON text", self.__buf, len(self.__buf))
+        return self.__value
+
+    @classmethod
+    def apply(cls, value, hook):
+        """
+        Calls **hook** on the objects of an already decoded value, as :class:`PCloudJsonDecoder` would have done.
+
+        The containers of **value** are modified in place.
+
+        :param value: A decoded value (containing dictionaries and lists).
+        :param hook: A function called with each object.
+        :return: The value with the objects replaced by the values returned by **hook**.
+        """
+        if type(value) is dict:
+            for k, v in value.items():
+                if (type(v) is dict) or (type(v) is list):
+                    value[k] = cls.apply(v, hook)
+            return hook(value)
+        if type(value) is list:
+            for i, v in enumerate(value):
+                if (type(v) is dict) or (type(v) is list):
+                    value[i] = cls.apply(v, hook)
+        return value
+
+    def __error(self, msg, pos):
+        raise json.JSONDecodeError(msg, self.__buf, pos)
+
+    def __decode(self, final):
+        buf = self.__buf
+        pos = self.__pos
+        while True:
+            pos = self.__ws.match(buf, pos).end()
+            if pos == len(buf):
+                break
+            c = buf[pos]
+            expect = self.__expect
+
+            if (expect == 'end'):
+                self.__error("Extra data", pos)
+            elif (expect in ('value', 'first')):
+                if (expect == 'first') and (c == ']'):
+                    pos = self.__close(pos)
+                elif (c == '{') or (c == '['):
+                    try:
+                        value, end = self.__decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        # Wait for the end of small objects, decode the big ones token by token
+                        if not final and (len(buf) - pos < self.chunkSize):
+                            break
+                        self.__stack.append([{} if c == '{' else [], None])
+                        self.__expect = 'key' if c == '{' else 'first'
+                        pos += 1
+                        continue
+                    if self.hook is not None:
+                        # Decoded again with the hook, which must not be called on the objects of incomplete values
+                        value, end = self.__hookDecoder.raw_decode(buf, pos)
+                    pos = self.__add(value, end)
+                elif (c == '"'):
+                    try:
+                        value, end = scanstring(buf, pos + 1)
+                    except json.JSONDecodeError:
+                        if not final:
+                            break
+                        raise
+                    pos = self.__add(value, end)
+                else:
+                    m = self.__number.match(buf, pos)
+                    if m is not None:
+                        if (self.__numberChars.match(buf, pos).end() == len(buf)) and not final:
+                            break
+                        value = float(m.group()) if (m.group(1) or m.group(2)) else int(m.group())
+                        pos = self.__add(value, m.end())
+                    elif buf.startswith(tuple(self.__constants), pos):
+                        word = next(w for w in self.__constants if buf.startswith(w, pos))
+                        pos = self.__add(self.__constants[word], pos + len(word))
+                    elif not final and (len(buf) - pos < 5):
+                        break
+                    else:
+                        self.__error("Expecting value", pos)
+            elif (expect == 'key'):
+                if (c == '}') and (len(self.__stack[-1][0]) == 0):
+                    pos = self.__close(pos)
+                elif (c == '"'):
+                    try:
+                        self.__stack[-1][1], pos = scanstring(buf, pos + 1)
+                    except json.JSONDecodeError:
+                        if not final:
+                            break
+                        raise
+                    self.__expect = 'colon'
+                else:
+                    self.__error("Expecting property name enclosed in double quotes", pos)
+            elif (expect == 'colon'):
+                if (c != ':'):
+                    self.__error("Expecting ':' delimiter", pos)
+                self.__expect = 'value'
+                pos += 1
+            else:
+                container = self.__stack[-1][0]
+                if (c == ','):
+                    self.__expect = 'key' if type(container) is dict else 'value'
+                    pos += 1
+                elif (c == ('}' if type(container) is dict else ']')):
+                    pos = self.__close(pos)
+                else:
+                    self.__error("Expecting ',' delimiter", pos)
+        self.__pos = pos
+
+    def __add(self, value, pos):
+        if len(self.__stack) == 0:
+            self.__value = value
+            self.__expect = 'end'
+            return pos
+        container, key = self.__stack[-1]
+        if type(container) is dict:
+            container[key] = value
+        else:
+            container.append(value)
+        self.__expect = 'comma'
+        return pos
+
+    def __close(self, pos):
+        value, _ = self.__stack.pop()
+        if (type(value) is dict) and (self.hook is not None):
+            value = self.hook(value)
+        return self.__add(value, pos + 1)
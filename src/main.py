@@ -15,18 +15,32 @@
 # You should have received a copy of the GNU General Public License
 # along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
 
+import io
 import os
 import time
+import hashlib
 import requests
 
 from warnings import warn as warning
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
 from enum import Enum, IntFlag
 from hashlib import sha1
+from threading import Lock
 
 from .error import PCloudError
 from .response import PCloudResponse
-from .info import PCloudInfo
-from .file import PCloudFile
+from .cache import PCloudCache
+from .diff import PCloudTreeDiff
+from .index import PCloudPathIndex
+from .info import PCloudInfo, PCloudFileInfo, PCloudFolderInfo
+from .file import PCloudFile, PCloudTransferEvent
+from .fileio import PCloudFileIO
+from .pool import PCloudSessionPool
+from .progress import PCloudProgress
+from .sync import PCloudSync, PCloudMirror, _hashFile
+from .transport import PCloudHttpTransport
 
 class PCloud:
     """
@@ -38,12 +52,46 @@ class PCloud:
     :param hostname: Optional user-provided URL to a *PCloud* server
     :param username: Optional user name
     :param password: Optional password
+    :param maxConnections: Optional maximum number of connections kept alive per host for requests which are not bound to a file descriptor.
+    :param idleTimeout: Optional number of seconds after which idle kept-alive connections are dropped.
+    :param keepAlive: Optional boolean value indicating whether connections should be kept alive between requests.
+    :param transport: Optional :class:`~.transport.PCloudTransport` used to send requests (defaults to :class:`~.transport.PCloudHttpTransport`).
+    :param cacheSize: Optional maximum number of responses of :meth:`statFile()`, :meth:`listFolder()` and :meth:`checksumFile()` to be cached.
+    :param cacheTtl: Optional number of seconds after which cached responses expire.
+    :param pathIndex: Optional boolean value indicating whether paths should be resolved to ids using a :class:`~.index.PCloudPathIndex`.
+    :param prefetch: Optional number of threads listing the child folders of the listed folders in the background.
 
     .. note::
         User name and password must be available when using methods requiring authentication.
 
         They can either be provided to the constructor or later, before calling a method requiring authentication.
 
+    .. note::
+        When **maxConnections** is provided, the requests which are not bound to a file descriptor
+        share a :class:`~.pool.PCloudSessionPool`, which is closed when leaving the context manager.
+        Otherwise, a new connection is opened for each of them.
+        These parameters are used only when **transport** is not provided.
+
+    .. note::
+        When **cacheSize** is provided, the responses of :meth:`statFile()`, :meth:`listFolder()` and :meth:`checksumFile()`
+        are kept in a :class:`~.cache.PCloudCache`. The cached responses affected by the changes made through this instance
+        (renaming, moving, copying, deleting, uploading or writing files and folders) are invalidated,
+        but the changes made by other clients are only seen once the cached responses expire.
+
+    .. note::
+        When **pathIndex** is set, the paths of the files and folders are recorded from the metadata returned
+        by listings (especially recursive ones) and by the methods changing files and folders.
+        The paths given to the methods are then replaced by the corresponding ids when they are known,
+        so that the server does not have to resolve them. The changes made by other clients are only seen
+        once the folders are listed again.
+
+    .. note::
+        When **prefetch** is provided, the child folders of the folders listed (non recursively) by id
+        are listed in the background by **prefetch** threads, so that their contents are usually available
+        when they are iterated through (see :class:`~.info.PCloudFolderInfo`). At most :attr:`maxPrefetched`
+        listings are kept and they are dropped when files or folders are created, renamed, moved or deleted
+        through this instance (the sizes of the files written meanwhile may not be up to date in them).
+
     It should be used as follows::
 
         with PCloud() as pCloud:
@@ -155,18 +203,44 @@ class PCloud:
     defaultServer = 'https://eapi.pcloud.com/'
     """ Default *PCloud* API server, which will be used if the user does not provide one and none can be obtained using :meth:`getApiServer()` """
 
-    def __init__(self, hostname=None, username=None, password=None):
-        self.__hostnames = [hostname, PCloud.defaultServer] if (hostname is not None) else []
+    defaultBinaryServer = 'https://binapi.pcloud.com/'
+    """ Default *PCloud* binary API server, which is used instead of :attr:`defaultServer` by binary transports """
+
+    maxPrefetched = 1024
+    """ Maximum number of folder listings obtained in the background (see **prefetch**) which are kept until they are used """
+
+    def __init__(self, hostname=None, username=None, password=None, maxConnections=None, idleTimeout=None, keepAlive=True, transport=None, cacheSize=None, cacheTtl=60, pathIndex=False, prefetch=0):
+        if transport is None:
+            if maxConnections is not None:
+                transport = PCloudHttpTransport(PCloudSessionPool(maxConnections, idleTimeout=idleTimeout, keepAlive=keepAlive))
+            else:
+                transport = PCloudHttpTransport()
+        self.__transport = transport
+        self.__defaultServer = PCloud.defaultBinaryServer if transport.binary else PCloud.defaultServer
+
+        self.__hostnames = [hostname, self.__defaultServer] if (hostname is not None) else []
         self.__authtoken = None
+        self.__authLock = Lock()
         self.username = username
         self.password = password
 
         self.__sessions = {}
+        self.__fileIds = {}
+        self.__written = set()
+        self.__cache = PCloudCache(cacheSize, cacheTtl) if (cacheSize is not None) else None
+        self.__pathIndex = PCloudPathIndex() if pathIndex else None
+        self.__prefetcher = ThreadPoolExecutor(prefetch) if (prefetch > 0) else None
+        self.__prefetched = OrderedDict()
+        self.__prefetchGeneration = 0
+        self.__prefetchLock = Lock()
 
     def __enter__(self):
         return self
 
     def __exit__(self, *args):
+        if self.__prefetcher is not None:
+            self.__prefetcher.shutdown(cancel_futures=True)
+            self.__dropPrefetched()
         attempts = 0
         while (attempts < 3):
             attempts += 1
@@ -180,8 +254,23 @@ class PCloud:
                     break
         else:
             warning("Could not logout")
+        self.__transport.close()
         return False
 
+    @property
+    def cache(self):
+        """
+        The :class:`~.cache.PCloudCache` holding the cached responses (``None`` when caching is disabled).
+        """
+        return self.__cache
+
+    @property
+    def pathIndex(self):
+        """
+        The :class:`~.index.PCloudPathIndex` mapping paths to ids (``None`` when the index is disabled).
+        """
+        return self.__pathIndex
+
     @property
     def authenticated(self):
         """
@@ -288,10 +377,16 @@ class PCloud:
         """
         self.__sendAuthRequest('GET', 'setlanguage', params={'language': lang})
 
-    def listFolder(self, folder, recursive=False, showDeleted=False, noFiles=False, noShares=False):
+    def listFolder(self, folder, recursive=False, showDeleted=False, noFiles=False, noShares=False, stream=False):
         """
         Lists the contents of a given folder.
 
+        When **stream** is enabled, the response is decoded while it is received and the folder and file information
+        is built as soon as each item has been decoded (see :class:`~.jsonstream.PCloudJsonDecoder`), so that
+        the whole response is never held in memory together with the tree. This is meant for recursive listings
+        of big trees. Streamed listings are neither cached nor added to the path index.
+        With :class:`~.transport.PCloudBinaryTransport` the response is decoded at once.
+
         .. note::
             This method requires the user to be authenticated.
 
@@ -300,6 +395,7 @@ class PCloud:
         :param showDeleted: An optional boolean value indicating whether deleted files (in the trash) should be listed.
         :param noFiles: An optional boolean value indicating whether files should not be listed.
         :param noShares: An optional boolean value indicating whether shared folders or files should not be listed.
+        :param stream: An optional boolean value indicating whether the response should be decoded incrementally.
         :return: A :class:`~.info.PCloudInfo` containing the information about the given folder.
         """
         params = {}
@@ -310,8 +406,150 @@ class PCloud:
         params['nofiles'] = noFiles
         params['noshares'] = noShares
 
-        r = self.__sendAuthRequest('GET', 'listfolder', params=params)
-        return PCloudInfo(self, r['metadata'])
+        if stream:
+            return self.__sendAuthRequest('GET', 'listfolder', params=params, hook=self.__infoHook)['metadata']
+
+        return PCloudInfo(self, self.__listFolderMetadata(params))
+
+    def walk(self, folder, workers=1, showDeleted=False, noShares=False):
+        """
+        Walks the tree of a given folder (like :func:`os.walk`), listing one folder at a time.
+
+        For each folder of the tree, a tuple ``(folder, subfolders, files)`` is yielded, where ``folder``
+        is the :class:`~.info.PCloudFolderInfo` of the folder and ``subfolders`` and ``files`` are lists
+        of the :class:`~.info.PCloudFolderInfo` and :class:`~.info.PCloudFileInfo` it contains.
+        The folders are yielded before their subfolders (in the order of **subfolders**), which are only listed
+        once the caller resumes the iteration. As with :func:`os.walk`, the caller can remove items from **subfolders**
+        so that their trees are not listed (and can sort them to choose the order in which they are walked)::
+
+            for folder, subfolders, files in pCloud.walk('/', workers=4):
+                subfolders[:] = [f for f in subfolders if f.name != 'Backups']
+
+        When more than one worker is requested, the listings of the next **workers** folders to be walked
+        (usually the siblings of the current folder) are requested concurrently.
+
+        .. note::
+            This method requires the user to be authenticated.
+
+        :param folder: An integer representing the id of the folder to be walked, a string giving its path or a :class:`~.info.PCloudFolderInfo`.
+        :param workers: An optional integer giving the maximum number of folders listed concurrently.
+        :param showDeleted: An optional boolean value indicating whether deleted files (in the trash) should be listed.
+        :param noShares: An optional boolean value indicating whether shared folders or files should not be listed.
+        :yield: A tuple ``(folder, subfolders, files)`` for each folder of the tree.
+        """
+        def listFolder(f):
+            return self.listFolder(f, showDeleted=showDeleted, noShares=noShares)
+
+        executor = ThreadPoolExecutor(workers) if (workers > 1) else None
+        try:
+            # The stack contains the folders to be walked (the next one last), or the futures of their listings
+            stack = [folder]
+            while (len(stack) != 0):
+                if executor is not None:
+                    for i in range(max(0, len(stack) - workers), len(stack)):
+                        if not isinstance(stack[i], Future):
+                            stack[i] = executor.submit(listFolder, stack[i])
+                current = stack.pop()
+                current = current.result() if isinstance(current, Future) else listFolder(current)
+                subfolders = [o for o in current if o.isFolder]
+                files = [o for o in current if not o.isFolder]
+                yield current, subfolders, files
+                stack.extend(reversed(subfolders))
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def refresh(self, folder, showDeleted=False, noFiles=False, noShares=False, changedOnly=False):
+        """
+        Refreshes a previously listed folder tree and lists the differences with the new tree.
+
+        By default, the tree is listed again recursively, in a single request, and compared locally with **folder**.
+        All the changes are seen, but the response contains the whole tree (including the folders whose contents
+        were not listed in **folder**, whose contents are not reported as new).
+
+        When **changedOnly** is true, the folders whose ``hash`` or ``modified`` fields differ from the ones in **folder**
+        are listed again (one request per folder, in the background when **prefetch** is enabled) and the (already listed)
+        trees of the other folders are reused as is. Hence the number of requests depends on the number of changed folders,
+        not on the size of the tree. New folders are listed recursively (in a single request) and the folders whose contents
+        were not listed in **folder** are not listed either.
+
+        When the cache is enabled, changes which have not been made through this instance are seen once the cached listings have expired.
+
+        .. warning::
+            *PCloud* only updates the modification time of the folder whose direct contents change
+            (not the ones of its parent folders). Hence, when **changedOnly** is true, changes in a folder
+            whose parent folder did not change are not seen.
+
+        .. note::
+            This method requires the user to be authenticated.
+
+        :param folder: A :class:`~.info.PCloudFolderInfo` giving the previous version of the tree.
+        :param showDeleted: An optional boolean value indicating whether deleted files (in the trash) should be listed.
+        :param noFiles: An optional boolean value indicating whether files should not be listed.
+        :param noShares: An optional boolean value indicating whether shared folders or files should not be listed.
+        :param changedOnly: An optional boolean value indicating whether only the folders whose metadata changed should be listed again
+                            (instead of listing the whole tree).
+        :return: A tuple ``(folder, diff)`` where ``folder`` is the :class:`~.info.PCloudFolderInfo` of the new tree
+                 and ``diff`` is a :class:`~.diff.PCloudTreeDiff` listing the differences with **folder**.
+        """
+        old = {PCloudTreeDiff.key(o): o for o in PCloudTreeDiff.items(folder)}
+        diff = PCloudTreeDiff()
+
+        def compare(item):
+            prev = old.get(PCloudTreeDiff.key(item))
+            if prev is None:
+                diff.added.append(item)
+                return
+            if PCloudTreeDiff.changed(prev, item, ('name', 'parentFolderId')):
+                diff.moved.append((prev, item))
+            if not item.isFolder and PCloudTreeDiff.changed(prev, item, ('hash', 'size', 'modified')):
+                diff.modified.append((prev, item))
+
+        def listFolder(folderId, recursive=False):
+            params = {'folderid': folderId, 'recursive': recursive, 'showdeleted': showDeleted, 'nofiles': noFiles, 'noshares': noShares}
+            return params, self.__listFolderMetadata(params, prefetch=False)
+
+        def refreshFolder(folderId):
+            params, metadata = listFolder(folderId)
+            contents = []
+            relisted = []
+            for m in metadata.get('contents', []):
+                item = PCloudInfo(self, m)
+                prev = old.get(PCloudTreeDiff.key(item))
+                if item.isFolder and (prev is None):
+                    item = PCloudInfo(self, listFolder(item.id, recursive=True)[1])
+                    # The contents of new folders are new as well
+                    diff.added.extend(PCloudTreeDiff.items(item)[1:])
+                elif item.isFolder and prev.contentsLoaded:
+                    if PCloudTreeDiff.changed(prev, item, ('hash', 'modified')):
+                        relisted.append((len(contents), m))
+                    else:
+                        item = PCloudInfo(self, dict(m, contents=list(prev)))
+                contents.append(item)
+            # Only the folders which are listed again are listed in the background
+            self.__prefetch({'contents': [m for _, m in relisted]}, params)
+            for i, m in relisted:
+                contents[i] = refreshFolder(m['folderid'])
+            for item in contents:
+                compare(item)
+            return PCloudInfo(self, dict(metadata, contents=contents))
+
+        if changedOnly:
+            tree = refreshFolder(folder.id)
+            compare(tree)
+        else:
+            tree = PCloudInfo(self, listFolder(folder.id, recursive=True)[1])
+            # The items in the folders whose contents were not known are not new (unless these folders are new)
+            known = set([k for k, o in old.items() if o.isFolder and o.contentsLoaded])
+            for item in PCloudTreeDiff.items(tree):
+                key = PCloudTreeDiff.key(item)
+                if (key in old) or ((True, getattr(item, 'parentFolderId', None)) in known):
+                    compare(item)
+                    if item.isFolder and (key not in old):
+                        known.add(key)
+        new = set([PCloudTreeDiff.key(o) for o in PCloudTreeDiff.items(tree)])
+        diff.removed = [o for k, o in old.items() if k not in new]
+        return tree, diff
 
     def createFolder(self, folder, name, exists=False):
         """
@@ -339,6 +577,8 @@ class PCloud:
             r = self.__sendAuthRequest('GET', 'createfolder', params=params)
         else:
             r = self.__sendAuthRequest('GET', 'createfolderifnotexists', params=params)
+        self.__invalidateFiles()
+        self.__indexItem(r['metadata'], params.get('path'))
         return PCloudInfo(self, r['metadata'])
 
     def renameFolder(self, folder, name):
@@ -362,6 +602,8 @@ class PCloud:
             params['toname'] = name
 
         r = self.__sendAuthRequest('GET', 'renamefolder', params=params)
+        self.__invalidateAll()
+        self.__indexItem(r['metadata'], params.get('topath'))
         return PCloudInfo(self, r['metadata'])
 
     def moveFolder(self, src, dest):
@@ -383,6 +625,8 @@ class PCloud:
             if not params['topath'].endswith('/'):
                 params['topath'] += '/'
         r = self.__sendAuthRequest('GET', 'renamefolder', params=params)
+        self.__invalidateAll()
+        self.__indexItem(r['metadata'])
         return PCloudInfo(self, r['metadata'])
 
     def copyFolder(self, src, dest, overwrite=False, exist=False):
@@ -409,6 +653,8 @@ class PCloud:
         params['skipexisting'] = not exist
 
         r = self.__sendAuthRequest('GET', 'copyfolder', params=params)
+        self.__invalidateAll()
+        self.__indexItem(r['metadata'])
         return PCloudInfo(self, r['metadata'])
 
     def deleteFolder(self, folder):
@@ -425,9 +671,16 @@ class PCloud:
         self.__setFolder(params, folder)
 
         r = self.__sendAuthRequest('GET', 'deletefolder', params=params)
+        self.__invalidateAll()
+        self.__unindexItem(r['metadata'])
         return PCloudInfo(self, r['metadata'])
 
     def __setFolder(self, params, folder, prefix=''):
+        if (type(folder) is str) and (self.__pathIndex is not None):
+            item = self.__pathIndex.lookup(folder)
+            if (item is not None) and (item[0] == 'folderid'):
+                folder = item[1]
+
         if type(folder) is int:
             params[prefix + 'folderid'] = folder
         elif type(folder) is str:
@@ -437,7 +690,7 @@ class PCloud:
         else: #pragma: no cover
             raise TypeError(f"Invalid folder type: {type(folder)}")
 
-    def openFile(self, file, flags=0):
+    def openFile(self, file, flags=0, readAhead=0, writeBuffer=0, writeBehind=0):
         """
         Opens the given file.
 
@@ -447,6 +700,9 @@ class PCloud:
 
         :param file: An integer representing the id of the file to be opened or a string giving its path.
         :param flags: Optional :class:`FileOpenFlags`.
+        :param readAhead: An optional integer giving the number of bytes to be read ahead when the file is read sequentially (see :class:`~.file.PCloudFile`).
+        :param writeBuffer: An optional integer giving the size of the buffer used to coalesce writes (see :class:`~.file.PCloudFile`).
+        :param writeBehind: An optional integer giving the maximum number of buffers being written in the background (see :class:`~.file.PCloudFile`).
         :return: :class:`~.file.PCloudFile` respesenting the opened file.
 
         .. seealso:: :meth:`createFile()`, :meth:`closeFile()`
@@ -459,15 +715,22 @@ class PCloud:
         else:
             params['flags'] = int(flags | PCloud.FileOpenFlags.O_WRITE)
 
-        self.__sessions[0] = requests.Session()
+        session = self.__transport.session()
         try:
-            r = self.__sendAuthRequest('GET', 'file_open', params=params)
-            self.__sessions[r['fd']] = self.__sessions[0]
-        finally:
-            del self.__sessions[0]
-        return PCloudFile(self, r['fd'], r['fileid'])
+            r = self.__sendAuthRequest('GET', 'file_open', params=params, session=session)
+        except BaseException:
+            self.__transport.closeSession(session)
+            raise
+        self.__sessions[r['fd']] = session
+        self.__fileIds[r['fd']] = r['fileid']
+        if (params['flags'] & (PCloud.FileOpenFlags.O_CREAT | PCloud.FileOpenFlags.O_TRUNC)):
+            self.__invalidateFiles(r['fileid'], namespace=bool(params['flags'] & PCloud.FileOpenFlags.O_CREAT))
+        if 'path' in params:
+            # The file may have been created (with O_CREAT)
+            self.__indexItem({'fileid': r['fileid']}, params['path'])
+        return PCloudFile(self, r['fd'], r['fileid'], readAhead, writeBuffer, writeBehind)
 
-    def createFile(self, folder, name, flags=0):
+    def createFile(self, folder, name, flags=0, readAhead=0, writeBuffer=0, writeBehind=0):
         """
         Creates a new file in the given folder.
 
@@ -477,6 +740,9 @@ class PCloud:
         :param file: An integer representing the id of the folder where to create a new file or a string giving its path.
         :param name: A string giving the name of the file to be created.
         :param flags: Optional :class:`FileOpenFlags`.
+        :param readAhead: An optional integer giving the number of bytes to be read ahead when the file is read sequentially (see :class:`~.file.PCloudFile`).
+        :param writeBuffer: An optional integer giving the size of the buffer used to coalesce writes (see :class:`~.file.PCloudFile`).
+        :param writeBehind: An optional integer giving the maximum number of buffers being written in the background (see :class:`~.file.PCloudFile`).
         :return: :class:`~.file.PCloudFile` representing the opened file.
 
         .. seealso:: :meth:`openFile()`, :meth:`closeFile()`
@@ -493,13 +759,90 @@ class PCloud:
 
         params['flags'] = int(flags | PCloud.FileOpenFlags.O_CREAT | PCloud.FileOpenFlags.O_EXCL | PCloud.FileOpenFlags.O_WRITE)
 
-        self.__sessions[0] = requests.Session()
+        session = self.__transport.session()
         try:
-            r = self.__sendAuthRequest('GET', 'file_open', params=params)
-            self.__sessions[r['fd']] = self.__sessions[0]
-        finally:
-            del self.__sessions[0]
-        return PCloudFile(self, r['fd'], r['fileid'])
+            r = self.__sendAuthRequest('GET', 'file_open', params=params, session=session)
+        except BaseException:
+            self.__transport.closeSession(session)
+            raise
+        self.__sessions[r['fd']] = session
+        self.__fileIds[r['fd']] = r['fileid']
+        if (params['flags'] & (PCloud.FileOpenFlags.O_CREAT | PCloud.FileOpenFlags.O_TRUNC)):
+            self.__invalidateFiles(r['fileid'], namespace=bool(params['flags'] & PCloud.FileOpenFlags.O_CREAT))
+        if 'folderid' in params:
+            self.__indexItem({'fileid': r['fileid'], 'name': name, 'parentfolderid': params['folderid']})
+        else:
+            self.__indexItem({'fileid': r['fileid']}, params['path'])
+        return PCloudFile(self, r['fd'], r['fileid'], readAhead, writeBuffer, writeBehind)
+
+    def open(self, file, mode='r', buffering=-1, encoding=None, errors=None, newline=None, readAhead=0, writeBuffer=0, writeBehind=0):
+        """
+        Opens the given file as a file object, like the built-in :func:`open`.
+
+        The file is opened with :meth:`openFile()` (and created unless the mode starts with ``'r'``)
+        and wrapped into a :class:`~.fileio.PCloudFileIO` raw stream, which is buffered (unless **buffering** is ``0``)
+        with a buffer of :attr:`PCloudFile.blockSize <.file.PCloudFile.blockSize>` bytes by default
+        and decoded in text mode. It can be used as follows::
+
+            with pCloud.open('/Documents/notes.txt', 'rt', encoding='utf-8') as notes:
+                for line in notes:
+                    print(line)
+
+        .. note::
+            This method requires the user to be authenticated.
+
+        :param file: An integer representing the id of the file to be opened or a string giving its path.
+        :param mode: An optional string giving the mode (``'r'``, ``'w'``, ``'x'`` or ``'a'``, optionally followed by ``'+'`` and ``'b'`` or ``'t'``).
+        :param buffering: An optional integer giving the size of the buffer (``0`` disables buffering in binary mode, ``1`` selects line buffering in text mode).
+        :param encoding: An optional string giving the encoding used in text mode.
+        :param errors: An optional string specifying how encoding errors are handled in text mode.
+        :param newline: An optional string specifying how line endings are handled in text mode.
+        :param readAhead: An optional integer giving the number of bytes to be read ahead (see :meth:`openFile()`).
+        :param writeBuffer: An optional integer giving the size of the buffer used to coalesce writes (see :meth:`openFile()`).
+        :param writeBehind: An optional integer giving the maximum number of buffers being written in the background (see :meth:`openFile()`).
+        :return: A :class:`io.TextIOWrapper` in text mode, a :class:`io.BufferedReader`, :class:`io.BufferedWriter` or :class:`io.BufferedRandom` in binary mode
+            or a :class:`~.fileio.PCloudFileIO` when buffering is disabled.
+
+        .. seealso:: :meth:`openFile()`
+        """
+        rawMode = mode.replace('b', '').replace('t', '')
+        if (('b' in mode) and ('t' in mode)) or (len(mode) - len(rawMode) > 1):
+            raise ValueError(f"Invalid mode: '{mode}'")
+        if (rawMode.rstrip('+') not in ('r', 'w', 'x', 'a')) or (rawMode.count('+') > 1):
+            raise ValueError(f"Invalid mode: '{mode}'")
+        if (buffering == 0) and ('b' not in mode):
+            raise ValueError("Text mode requires buffering")
+
+        flags = {
+            'r': 0,
+            'w': PCloud.FileOpenFlags.O_CREAT | PCloud.FileOpenFlags.O_TRUNC,
+            'x': PCloud.FileOpenFlags.O_CREAT | PCloud.FileOpenFlags.O_EXCL | PCloud.FileOpenFlags.O_WRITE,
+            'a': PCloud.FileOpenFlags.O_CREAT | PCloud.FileOpenFlags.O_WRITE,
+        }[rawMode[0]]
+        if (rawMode == 'r+'):
+            flags |= PCloud.FileOpenFlags.O_WRITE
+
+        pCloudFile = self.openFile(file, flags, readAhead, writeBuffer, writeBehind)
+        try:
+            stream = PCloudFileIO(pCloudFile, rawMode)
+        except BaseException:
+            pCloudFile.__exit__(None, None, None)
+            raise
+        if (buffering == 0):
+            return stream
+
+        lineBuffering = (buffering == 1) and ('b' not in mode)
+        if (buffering < 0) or lineBuffering:
+            buffering = PCloudFile.blockSize
+        if stream.readable() and stream.writable():
+            stream = io.BufferedRandom(stream, buffering)
+        elif stream.writable():
+            stream = io.BufferedWriter(stream, buffering)
+        else:
+            stream = io.BufferedReader(stream, buffering)
+        if ('b' in mode):
+            return stream
+        return io.TextIOWrapper(stream, encoding, errors, newline, lineBuffering)
 
     def readFile(self, fd, count, offset=None):
         """
@@ -518,6 +861,31 @@ class PCloud:
         else:
             return self.__sendAuthRequest('GET', 'file_pread', params={'fd': fd, 'count': count, 'offset': offset})
 
+    def readFileInto(self, fd, buffer, offset=None):
+        """
+        Read data from the given file descriptor directly into the given buffer.
+
+        Unlike :meth:`readFile()`, the data is not returned as a new byte array:
+        the response body is streamed into **buffer** as it is received.
+
+        .. note::
+            This method is intended to be used internally by :meth:`PCloudFile.readinto() <.file.PCloudFile.readinto()>`.
+
+        :param fd: An integer file descriptor.
+        :param buffer: A writable bytes-like object (``bytearray``, ``memoryview``, ``mmap``). At most ``len(buffer)`` bytes are read.
+        :param offset: An optional integer giving the position where to read data in the file.
+        :return: An integer giving the number of bytes that have been read in the file.
+        """
+        view = memoryview(buffer).cast('B')
+        if offset is None:
+            r = self.__sendAuthRequest('GET', 'file_read', params={'fd': fd, 'count': len(view)}, into=view)
+        else:
+            r = self.__sendAuthRequest('GET', 'file_pread', params={'fd': fd, 'count': len(view), 'offset': offset}, into=view)
+        if not isinstance(r, int): #pragma: no cover
+            view[:len(r)] = r
+            return len(r)
+        return r
+
     def writeFile(self, fd, data, offset=None):
         """
         Write data to the given file descriptor.
@@ -526,14 +894,19 @@ class PCloud:
             This method is intended to be used internally by :meth:`PCloudFile.write() <.file.PCloudFile.write()>`.
 
         :param fd: An integer file descriptor.
-        :param data: A byte array containing the data to be written in the file.
+        :param data: A bytes-like object (``bytes``, ``bytearray``, ``memoryview``, ``mmap``) containing the data to be written in the file.
+            It is sent without being copied.
         :param offset: An optional integer giving the position where to write the data in the file.
-        :return: A byte array containing the data that has been read in the file
+        :return: An integer giving the number of bytes written in the file.
         """
         if offset is None:
             r = self.__sendAuthRequest('PUT', 'file_write', params={'fd': fd}, data=data)
         else:
             r = self.__sendAuthRequest('PUT', 'file_pwrite', params={'fd': fd, 'offset': offset}, data=data)
+        # The cached responses are invalidated by the first write and again when the file is closed (not for each block)
+        if fd not in self.__written:
+            self.__written.add(fd)
+            self.__invalidateFiles(self.__fileIds.get(fd), namespace=False)
         return r['bytes']
 
     def truncateFile(self, fd, length):
@@ -548,6 +921,7 @@ class PCloud:
         """
 
         self.__sendAuthRequest('GET', 'file_truncate', params={'fd': fd, 'length': length})
+        self.__invalidateFiles(self.__fileIds.get(fd), namespace=False)
 
     def sizeFile(self, fd):
         """
@@ -597,7 +971,11 @@ class PCloud:
         :param fd: An integer file descriptor.
         """
         self.__sendAuthRequest('GET', 'file_close', params={'fd': fd})
-        del self.__sessions[fd]
+        fileId = self.__fileIds.pop(fd, None)
+        if fd in self.__written:
+            self.__written.discard(fd)
+            self.__invalidateFiles(fileId, namespace=False)
+        self.__transport.closeSession(self.__sessions.pop(fd))
 
     def uploadFiles(self, folder, files, progressId=None, partial=True, overwrite=False):
         """
@@ -620,7 +998,10 @@ class PCloud:
 
         if (len(files) != 0):
             r = self.__sendAuthRequest('POST', 'uploadfile', params=params, files={k: (k, v) for k, v in files.items()})
-            return [PCloudInfo(self, o) for o in r['metadata']]
+            self.__invalidateFiles(*[o.get('fileid') for o in r['metadata']])
+            for o in r['metadata']:
+                self.__indexItem(o)
+            return PCloudInfo.fromList(self, r['metadata'])
         else:
             return []
 
@@ -637,7 +1018,8 @@ class PCloud:
         params = {}
         self.__setFile(params, file)
 
-        r = self.__sendAuthRequest('GET', 'stat', params=params)
+        r = self.__sendCachedRequest('stat', params)
+        self.__indexItem(r['metadata'], params.get('path'))
         return PCloudInfo(self, r['metadata'])
 
     def checksumFile(self, file, algorithm=None):
@@ -657,7 +1039,7 @@ class PCloud:
         params = {}
         self.__setFile(params, file)
 
-        r = self.__sendAuthRequest('GET', 'checksumfile', params=params)
+        r = self.__sendCachedRequest('checksumfile', params)
 
         # All hashing algorithms:
         if algorithm is PCloud.HashAlgorithm.ALL:
@@ -699,6 +1081,8 @@ class PCloud:
             params['toname'] = name
 
         r = self.__sendAuthRequest('GET', 'renamefile', params=params)
+        self.__invalidateFiles(r['metadata'].get('fileid'))
+        self.__indexItem(r['metadata'], params.get('topath'))
         return PCloudInfo(self, r['metadata'])
 
     def moveFile(self, src, dest):
@@ -720,6 +1104,8 @@ class PCloud:
             if not params['topath'].endswith('/'):
                 params['topath'] += '/'
         r = self.__sendAuthRequest('GET', 'renamefile', params=params)
+        self.__invalidateFiles(r['metadata'].get('fileid'))
+        self.__indexItem(r['metadata'])
         return PCloudInfo(self, r['metadata'])
 
     def copyFile(self, src, dest, overwrite=False):
@@ -744,6 +1130,8 @@ class PCloud:
         params['noover'] = not overwrite
 
         r = self.__sendAuthRequest('GET', 'copyfile', params=params)
+        self.__invalidateFiles(r['metadata'].get('fileid'))
+        self.__indexItem(r['metadata'])
         return PCloudInfo(self, r['metadata'])
 
     def deleteFile(self, file):
@@ -760,9 +1148,16 @@ class PCloud:
         self.__setFile(params, file)
 
         r = self.__sendAuthRequest('GET', 'deletefile', params=params)
+        self.__invalidateFiles(r['metadata'].get('fileid'))
+        self.__unindexItem(r['metadata'])
         return PCloudInfo(self, r['metadata'])
 
     def __setFile(self, params, file, prefix=''):
+        if (type(file) is str) and (self.__pathIndex is not None):
+            item = self.__pathIndex.lookup(file)
+            if (item is not None) and (item[0] == 'fileid'):
+                file = item[1]
+
         if type(file) is int:
             params[prefix + 'fileid'] = file
         elif type(file) is str:
@@ -806,81 +1201,397 @@ class PCloud:
                 else:
                     time.sleep(5)
 
-    def upload(self, srcFilePath, fileOrFolder, destFileName=None):
+    def checkFiles(self, files, workers=1, hashWorkers=None):
+        """
+        Check that many local files have the same contents as the corresponding remote files.
+
+        The (SHA-1) checksums of the local files are computed concurrently by a pool of **hashWorkers** processes,
+        while the checksums of the remote files are requested by **workers** threads.
+
+        .. note::
+            This method requires the user to be authenticated.
+
+        :param files: A list of tuples ``(localPath, file)`` where ``localPath`` is a string giving the path to a local file
+                      and ``file`` is an integer representing the id of the remote file or a string giving its path.
+        :param workers: An optional integer giving the number of checksums requested concurrently.
+        :param hashWorkers: An optional integer giving the number of processes computing the checksums of the local files
+                            (the number of processors by default, ``0`` to compute them in the current thread).
+        :return: A list of boolean values indicating whether the checksums of the files match.
+        """
+        if (len(files) == 0):
+            return []
+
+        algo = PCloud.HashAlgorithm.SHA1
+        hashExecutor = ProcessPoolExecutor(hashWorkers) if (hashWorkers != 0) else None
+        try:
+            with ThreadPoolExecutor(workers) as executor:
+                remoteChecksums = [executor.submit(self.checksumFile, f, algo) for _, f in files]
+                if hashExecutor is None:
+                    localChecksums = [_hashFile(p, algo.value, PCloudFile.blockSize) for p, _ in files]
+                else:
+                    localChecksums = [c.result() for c in [hashExecutor.submit(_hashFile, p, algo.value, PCloudFile.blockSize) for p, _ in files]]
+                return [l == r.result() for l, r in zip(localChecksums, remoteChecksums)]
+        finally:
+            if hashExecutor is not None:
+                hashExecutor.shutdown(cancel_futures=True)
+
+    def upload(self, srcFilePath, fileOrFolder, destFileName=None, workers=1, verify=False, adaptive=False):
         """
         Upload a file.
 
+        The byte ranges which have been uploaded are recorded in a progress file (see :class:`~pcloud.src.progress.PCloudProgress`),
+        together with the id of the remote file and the size and modification time of the source file,
+        so that an interrupted upload can be resumed (the upload restarts from the beginning when the source file has changed).
+
+        When more than one worker is requested, the blocks are uploaded concurrently using one file descriptor per worker.
+        The size of the uploaded file is then verified once all the blocks have been uploaded.
+
         :param srcFilePath: A string representing the path to the file to upload.
         :param fileOrFolder: An integer representing the id of the folder where to upload the file or the file itself or a string giving its path.
         :param destFileName: An optional string giving the name of the new file.
-        :yield: The current file pointer position.
+        :param workers: An optional integer giving the number of blocks to be uploaded concurrently.
+        :param verify: An optional boolean value indicating whether the (SHA-1) checksum of the uploaded file should be verified (with a single worker, the local checksum is computed from the uploaded blocks, without reading the file again).
+        :param adaptive: An optional boolean value indicating whether the size of the blocks should be adapted to the link (see :meth:`PCloudFile.uploadFile() <pcloud.src.file.PCloudFile.uploadFile()>`, ignored when using several workers).
+        :yield: A :class:`~pcloud.src.file.PCloudTransferEvent` giving the current file pointer position (the number of bytes uploaded when using several workers) and the size of the blocks.
         """
-        progPath = srcFilePath + '.prog'
+        progress = PCloudProgress(srcFilePath + '.prog')
 
         if destFileName is not None:
             print(f'Upload {srcFilePath} to pCloud://{fileOrFolder}/{destFileName}')
         else:
             print(f'Upload {srcFilePath} to pCloud://{fileOrFolder}')
 
-        if os.path.isfile(progPath) or (destFileName is None):
-            if os.path.isfile(progPath):
-                with open(progPath, 'rt') as progFile:
-                    offset = int(progFile.read())
-            else:
-                offset = 0
+        if (workers > 1):
+            yield from self.__uploadParallel(srcFilePath, fileOrFolder, destFileName, progress, workers, verify)
+            return
 
-            if type(fileOrFolder) is str:
-                if destFileName is None:
-                    file = fileOrFolder
-                else:
-                    file = fileOrFolder + destFileName
-            else:
-                file = fileOrFolder
-            with open(srcFilePath, 'rb') as srcFile, self.openFile(file) as pCloudFile:
-                for o in pCloudFile.uploadFile(srcFile, offset):
-                    with open(progPath, 'wt') as progFile:
-                        progFile.write(str(o))
-                    yield o
-        else:
-            with open(srcFilePath, 'rb') as srcFile, self.createFile(fileOrFolder, destFileName) as pCloudFile:
-                for o in pCloudFile.uploadFile(srcFile, 0):
-                    with open(progPath, 'wt') as progFile:
-                        progFile.write(str(o))
+        stat = os.stat(srcFilePath)
+        with open(srcFilePath, 'rb') as srcFile, self.__openUploadTarget(fileOrFolder, destFileName, progress) as pCloudFile:
+            resumed = progress.done
+            progress.open(pCloudFile.fileId, stat.st_size, stat.st_mtime_ns)
+            try:
+                # When the source file changed, the data uploaded previously may extend beyond its new size
+                if (resumed != 0) and (progress.done == 0):
+                    pCloudFile.truncate(stat.st_size)
+                offset = progress.offset
+                # The checksum is computed from the uploaded blocks (only the data uploaded before resuming is read again)
+                hashes = [hashlib.sha1()] if verify else []
+                if verify:
+                    srcFile.seek(0)
+                    while (srcFile.tell() < offset):
+                        hashes[0].update(srcFile.read(min(PCloudFile.blockSize, offset - srcFile.tell())))
+                for o in pCloudFile.uploadFile(srcFile, offset, adaptive, hashes):
+                    progress.add(offset, o)
+                    offset = o
                     yield o
+                if verify:
+                    self.__verifyChecksum(pCloudFile.fileId, hashes[0])
+            except BaseException:
+                progress.close()
+                raise
 
-        print(f'remove("{progPath}")')
-        os.remove(progPath)
+        print(f'remove("{progress.path}")')
+        progress.remove()
 
-    def download(self, destFilePath, file):
+    def download(self, destFilePath, file, workers=1, adaptive=False):
         """
         Donwload a file.
 
+        The byte ranges which have been downloaded are recorded in a progress file (see :class:`~pcloud.src.progress.PCloudProgress`),
+        together with the id of the remote file and its size, modification time and hash, so that an interrupted download can be resumed
+        (the download restarts from the beginning when the remote file has changed or when the destination file is missing).
+
+        When more than one worker is requested, the blocks are downloaded concurrently using one file descriptor per worker,
+        and written at their position in the destination file.
+
         :param destFilePath: A string representing the path where to donwload the file.
         :param fileOrFolder: An integer representing the id of the file to download or a string giving its path.
-        :yield: The current file pointer position.
+        :param workers: An optional integer giving the number of blocks to be downloaded concurrently.
+        :param adaptive: An optional boolean value indicating whether the size of the blocks should be adapted to the link (see :meth:`PCloudFile.downloadFile() <pcloud.src.file.PCloudFile.downloadFile()>`, ignored when using several workers).
+        :yield: A :class:`~pcloud.src.file.PCloudTransferEvent` giving the current file pointer position (the number of bytes downloaded when using several workers) and the size of the blocks.
         """
-        progPath = destFilePath + '.prog'
+        progress = PCloudProgress(destFilePath + '.prog')
 
         print(f'Download pCloud://{file} to {destFilePath}')
 
-        offset = 0
-        if os.path.isfile(progPath):
-            with open(progPath, 'rt') as progFile:
-                offset = int(progFile.read())
-            mode = 'ab'
+        if (workers > 1):
+            yield from self.__downloadParallel(destFilePath, file, progress, workers)
+            return
+
+        # Without the destination file, the recorded progress is useless
+        resume = progress.exists() and os.path.isfile(destFilePath)
+        if resume:
+            progress.load()
+
+        with self.openFile(file) as pCloudFile, open(destFilePath, 'r+b' if resume else 'xb') as destFile:
+            progress.open(pCloudFile.fileId, sync=destFile.flush, **self.__remoteVersion(pCloudFile.fileId))
+            try:
+                offset = progress.offset
+                if resume:
+                    destFile.truncate(offset)
+                for o in pCloudFile.downloadFile(destFile, offset, adaptive):
+                    progress.add(offset, o)
+                    offset = o
+                    yield o
+            except BaseException:
+                progress.close()
+                raise
+
+        print(f'remove("{progress.path}")')
+        progress.remove()
+
+    def sync(self, srcPath, folder, delete=False, checksum=False, workers=1):
+        """
+        Synchronizes a local folder tree to a *PCloud* folder tree.
+
+        The files which are missing or out of date are uploaded, the missing folders are created and, when **delete** is set,
+        the remote items which do not exist locally are deleted (see :class:`~pcloud.src.sync.PCloudSync` for details).
+
+        .. note::
+            This method requires the user to be authenticated.
+
+        :param srcPath: A string representing the path to the local folder.
+        :param folder: An integer representing the id of the remote folder, a string giving its path or a :class:`~.info.PCloudFolderInfo`.
+        :param delete: An optional boolean value indicating whether the remote items which do not exist locally should be deleted.
+        :param checksum: An optional boolean value indicating whether the checksums should be compared before updating files.
+        :param workers: An optional integer giving the number of files transferred concurrently.
+        :return: A :class:`~pcloud.src.sync.PCloudSyncReport` giving the statistics about the synchronization.
+        """
+        sync = PCloudSync(self, srcPath, folder, delete, checksum, workers)
+        return sync.execute(sync.plan())
+
+    def mirror(self, folder, destPath, delete=False, workers=1, hashWorkers=None):
+        """
+        Mirrors a *PCloud* folder tree to a local folder tree.
+
+        The missing local folders are created and the files which are missing or differ from the remote files are downloaded
+        (the files whose size did not change are compared using their checksums). When **delete** is set, the local items
+        which do not exist remotely are deleted (see :class:`~pcloud.src.sync.PCloudMirror` for details).
+
+        .. note::
+            This method requires the user to be authenticated.
+
+        :param folder: An integer representing the id of the remote folder, a string giving its path or a :class:`~.info.PCloudFolderInfo`.
+        :param destPath: A string representing the path to the local folder.
+        :param delete: An optional boolean value indicating whether the local items which do not exist remotely should be deleted.
+        :param workers: An optional integer giving the number of files transferred concurrently.
+        :param hashWorkers: An optional integer giving the number of processes computing the checksums of the local files.
+        :return: A :class:`~pcloud.src.sync.PCloudSyncReport` giving the statistics about the synchronization.
+        """
+        mirror = PCloudMirror(self, folder, destPath, delete, workers, hashWorkers)
+        return mirror.execute(mirror.plan())
+
+    def __openUploadTarget(self, fileOrFolder, destFileName, progress):
+        if progress.exists():
+            progress.load()
+        elif destFileName is not None:
+            return self.createFile(fileOrFolder, destFileName)
+
+        if progress.fileId is not None:
+            return self.openFile(progress.fileId)
+        elif type(fileOrFolder) is str:
+            if destFileName is None:
+                return self.openFile(fileOrFolder)
+            else:
+                return self.openFile(fileOrFolder + destFileName)
         else:
-            mode = 'xb'
+            return self.openFile(fileOrFolder)
 
-        with open(destFilePath, mode) as destFile, self.openFile(file) as pCloudFile:
-            for o in pCloudFile.downloadFile(destFile, offset):
-                with open(progPath, 'wt') as progFile:
-                    progFile.write(str(o))
-                yield o
+    def __uploadParallel(self, srcFilePath, fileOrFolder, destFileName, progress, workers, verify):
+        stat = os.stat(srcFilePath)
+        size = stat.st_size
+        with open(srcFilePath, 'rb') as srcFile, self.__openUploadTarget(fileOrFolder, destFileName, progress) as pCloudFile:
+            progress.open(pCloudFile.fileId, size, stat.st_mtime_ns)
+            try:
+                if (progress.done == 0):
+                    pCloudFile.truncate(size)
+                yield PCloudTransferEvent(progress.done, PCloudFile.blockSize)
 
-        print(f'remove("{progPath}")')
-        os.remove(progPath)
+                ranges = progress.missing(size)
+                blocks = sum([(e - b + PCloudFile.blockSize - 1) // PCloudFile.blockSize for b, e in ranges])
+                pCloudFiles = [pCloudFile]
+                try:
+                    for w in range(1, min(workers, blocks)):
+                        pCloudFiles.append(self.openFile(pCloudFile.fileId))
+                    for b, e in PCloudFile.uploadRanges(pCloudFiles, srcFile, ranges):
+                        progress.add(b, e)
+                        yield PCloudTransferEvent(progress.done, PCloudFile.blockSize)
+                finally:
+                    for f in pCloudFiles[1:]:
+                        f.__exit__(None, None, None)
+
+                remoteSize = pCloudFile.size
+                if (remoteSize != size):
+                    raise IOError(f"Size mismatch:\n  - Local file size:  {size}\n  - Remote file size: {remoteSize}")
+
+                if verify:
+                    # The blocks are uploaded out of order, hence the file is read again
+                    localHash = hashlib.sha1()
+                    srcFile.seek(0)
+                    for data in iter(lambda: srcFile.read(PCloudFile.blockSize), b''):
+                        localHash.update(data)
+                    self.__verifyChecksum(pCloudFile.fileId, localHash)
+            except BaseException:
+                progress.close()
+                raise
+
+        print(f'remove("{progress.path}")')
+        progress.remove()
+
+    def __verifyChecksum(self, fileId, localHash):
+        remoteChecksum = self.checksumFile(fileId, PCloud.HashAlgorithm.ALL).get(localHash.name)
+        if remoteChecksum is None: #pragma: no cover
+            raise ValueError(f"No {localHash.name} checksum available")
+        if (localHash.hexdigest() != remoteChecksum):
+            raise IOError(f"Checksum mismatch:\n  - Local file checksum:  {localHash.hexdigest()}\n  - Remote file checksum: {remoteChecksum}")
+
+    def __downloadParallel(self, destFilePath, file, progress, workers):
+        resume = progress.exists() and os.path.isfile(destFilePath)
+        if resume:
+            progress.load()
+
+        with self.openFile(file) as pCloudFile:
+            size = pCloudFile.size
+            version = dict(self.__remoteVersion(pCloudFile.fileId), size=size)
+            with open(destFilePath, 'r+b' if resume else 'xb') as destFile:
+                progress.open(pCloudFile.fileId, sync=destFile.flush, **version)
+                try:
+                    destFile.truncate(size)
+                    yield PCloudTransferEvent(progress.done, PCloudFile.blockSize)
+
+                    ranges = progress.missing(size)
+                    blocks = sum([(e - b + PCloudFile.blockSize - 1) // PCloudFile.blockSize for b, e in ranges])
+                    pCloudFiles = [pCloudFile]
+                    try:
+                        for w in range(1, min(workers, blocks)):
+                            pCloudFiles.append(self.openFile(pCloudFile.fileId))
+                        for b, e in PCloudFile.downloadRanges(pCloudFiles, destFile, ranges):
+                            progress.add(b, e)
+                            yield PCloudTransferEvent(progress.done, PCloudFile.blockSize)
+                    finally:
+                        for f in pCloudFiles[1:]:
+                            f.__exit__(None, None, None)
+                except BaseException:
+                    progress.close()
+                    raise
+
+        print(f'remove("{progress.path}")')
+        progress.remove()
+
+    def __remoteVersion(self, fileId):
+        # Not cached, so that a file modified since the download was interrupted is detected
+        metadata = self.__sendAuthRequest('GET', 'stat', params={'fileid': fileId})['metadata']
+        try:
+            mtime = int(parsedate_to_datetime(metadata['modified']).timestamp()) * 1000000000
+        except (KeyError, TypeError, ValueError):
+            mtime = None
+        return {'size': metadata.get('size'), 'mtime': mtime, 'hash': metadata.get('hash')}
+
+    def __sendCachedRequest(self, endPoint, params, generation=None):
+        if self.__cache is None:
+            return self.__sendAuthRequest('GET', endPoint, params=params)
+
+        key = (endPoint, tuple(sorted(params.items())))
+        r = self.__cache.get(key)
+        if r is None:
+            r = self.__sendAuthRequest('GET', endPoint, params=dict(params))
+            # Tag the response with the ids of the items (so that it can be invalidated when they change)
+            tags = {endPoint}
+            tags.update([(k, v) for k, v in params.items() if k in ('fileid', 'folderid')])
+            tags.update([(k, v) for k, v in r['metadata'].items() if k in ('fileid', 'folderid')])
+            if 'path' in params:
+                tags.add('path')
+            with self.__prefetchLock:
+                # A prefetched response is not cached when the cache has been invalidated since the prefetch was submitted
+                if (generation is None) or (generation == self.__prefetchGeneration):
+                    self.__cache.set(key, r, tags)
+        return r
 
-    def __sendAuthRequest(self, method, endPoint, params=None, data=None, files=None):
+    def __infoHook(self, metadata):
+        if ('fileid' in metadata) or ('folderid' in metadata):
+            return PCloudInfo(self, metadata)
+        return metadata
+
+    @staticmethod
+    def __prefetchKey(params):
+        return (params['folderid'], params['showdeleted'], params['nofiles'], params['noshares'])
+
+    def __listFolderMetadata(self, params, prefetch=True):
+        r = self.__takePrefetched(params)
+        if r is None:
+            r = self.__sendCachedRequest('listfolder', params)
+        self.__indexItem(r['metadata'], params.get('path'), complete=not (params['nofiles'] or params['noshares']))
+        if prefetch and not params['recursive']:
+            self.__prefetch(r['metadata'], params)
+        return r['metadata']
+
+    def __prefetch(self, metadata, params):
+        if self.__prefetcher is None:
+            return
+        with self.__prefetchLock:
+            for child in metadata.get('contents', []):
+                if 'folderid' not in child:
+                    continue
+                childParams = {'folderid': child['folderid'], 'recursive': False, 'showdeleted': params['showdeleted'], 'nofiles': params['nofiles'], 'noshares': params['noshares']}
+                key = self.__prefetchKey(childParams)
+                if key not in self.__prefetched:
+                    self.__prefetched[key] = self.__prefetcher.submit(self.__sendCachedRequest, 'listfolder', childParams, self.__prefetchGeneration)
+            while (len(self.__prefetched) > self.maxPrefetched):
+                self.__prefetched.popitem(last=False)[1].cancel()
+
+    def __takePrefetched(self, params):
+        if (self.__prefetcher is None) or params['recursive'] or ('folderid' not in params):
+            return None
+        with self.__prefetchLock:
+            future = self.__prefetched.pop(self.__prefetchKey(params), None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception:
+            # The folder is listed again (so that the error is raised if it persists)
+            return None
+
+    def __dropPrefetched(self, cancel=True):
+        with self.__prefetchLock:
+            self.__prefetchGeneration += 1
+            if cancel:
+                for future in self.__prefetched.values():
+                    future.cancel()
+                self.__prefetched.clear()
+
+    def __indexItem(self, metadata, path=None, complete=False):
+        if self.__pathIndex is not None:
+            self.__pathIndex.add(metadata, path, complete)
+
+    def __unindexItem(self, metadata):
+        if self.__pathIndex is not None:
+            for k in ('fileid', 'folderid'):
+                if k in metadata:
+                    self.__pathIndex.remove((k, metadata[k]))
+
+    def __invalidateFiles(self, *fileIds, namespace=True):
+        # The prefetched listings are only dropped when files are added, removed or renamed (not when their contents change)
+        self.__dropPrefetched(namespace)
+        # Listings and responses obtained by path may include the files (or have been obtained for missing files)
+        if self.__cache is not None:
+            self.__cache.invalidate('listfolder', 'path', *[('fileid', f) for f in fileIds if f is not None])
+
+    def __invalidateAll(self):
+        self.__dropPrefetched()
+        # The files and folders in a folder are also affected when the folder is changed
+        if self.__cache is not None:
+            self.__cache.clear()
+
+    def __sendAuthRequest(self, method, endPoint, params=None, data=None, files=None, session=None, into=None, hook=None):
+        if self.__authtoken is None:
+            # Concurrent requests wait for the first one to log in, so that a single token is obtained
+            with self.__authLock:
+                if self.__authtoken is None:
+                    return self.__sendAuthenticatedRequest(method, endPoint, params, data, files, session, into, hook)
+        return self.__sendAuthenticatedRequest(method, endPoint, params, data, files, session, into, hook)
+
+    def __sendAuthenticatedRequest(self, method, endPoint, params, data, files, session, into, hook):
         if params is None:
             params = {}
         if self.__authtoken is not None:
@@ -891,7 +1602,7 @@ class PCloud:
             if self.password is None:
                 raise ValueError("PCloud password is not set")
 
-            digest = self.getDigest()
+            digest = self.__sendNoAuthRequest('GET', 'getdigest', session=session)['digest']
 
             usernameSha1Hash = sha1()
             usernameSha1Hash.update(self.username.lower().encode())
@@ -907,7 +1618,7 @@ class PCloud:
             params['getauth']        = 1
             params['logout']         = 1
 
-        r = self.__sendRequest(method, endPoint, params=params, data=data, files=files)
+        r = self.__sendRequest(method, endPoint, params=params, data=data, files=files, session=session, into=into, hook=hook)
         try:
             self.__authtoken = r['auth']
             del r['auth']
@@ -918,48 +1629,24 @@ class PCloud:
         r.raise_for_status()
         return r
 
-    def __sendNoAuthRequest(self, method, endPoint, params=None, data=None, files=None):
-        r = self.__sendRequest(method, endPoint, params=params, data=data, files=files)
+    def __sendNoAuthRequest(self, method, endPoint, params=None, data=None, files=None, session=None):
+        r = self.__sendRequest(method, endPoint, params=params, data=data, files=files, session=session)
         r.raise_for_status()
         return r
 
-    def __sendRequest(self, method, endPoint, params=None, data=None, files=None):
-        kwArgs = {}
-        if params is not None:
-            kwArgs['params'] = params
-        if type(data) is bytes:
-            kwArgs['data'] = data
-        if type(files) is dict:
-            kwArgs['files'] = files
-
+    def __sendRequest(self, method, endPoint, params=None, data=None, files=None, session=None, into=None, hook=None):
         # Initialize PCloud server list
         if (len(self.__hostnames) == 0):
-            self.__hostnames = [PCloud.defaultServer]
+            self.__hostnames = [self.__defaultServer]
             try:
-                self.__hostnames = self.getApiServer() + [PCloud.defaultServer]
+                self.__hostnames = self.getApiServer(binary=self.__transport.binary) + [self.__defaultServer]
             except:
                 pass
 
         # Get session if any
-        if (params is not None) and ('fd' in params):
-            s = self.__sessions[params['fd']]
-        else:
-            try:
-                s = self.__sessions[0]
-            except KeyError:
-                s = requests
+        if (session is None) and (params is not None) and ('fd' in params):
+            session = self.__sessions[params['fd']]
 
         # TODO try other servers if it fails
         h = 0
-        #print(f"{self.__hostnames[h] + endPoint} {kwArgs}")
-        r = s.request(method, self.__hostnames[h] + endPoint, **kwArgs)
-
-        r.raise_for_status()
-        if r.headers['Content-Type'].startswith('application/json'):
-            #print(r.json())
-            return PCloudResponse(r.json())
-        elif (r.headers['Content-Type'] == 'application/octet-stream'):
-            #print(r.content)
-            return r.content
-        else: #pragma: no cover
-            raise ValueError(f"Unhandled content type: {r.headers['Content-Type']}")
+        return self.__transport.request(session, method, self.__hostnames[h], endPoint, params=params, data=data, files=files, into=into, hook=hook)
@@ -0,0 +1,103 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import time
+import requests
+
+from threading import Lock
+
+class PCloudSessionPool:
+    """
+    Pool of kept-alive connections to *PCloud* API servers.
+
+    The pool is shared by all the requests which are not bound to a file descriptor,
+    so that they do not pay for a new TCP and TLS handshake every time.
+
+    .. note::
+        This class is meant to be used internally by :class:`~pcloud.PCloud`.
+
+    :param maxConnections: An integer giving the maximum number of connections kept alive per host.
+    :param idleTimeout: An optional number of seconds after which idle connections are dropped.
+    :param keepAlive: An optional boolean value indicating whether the connections should be kept alive between requests.
+    :param block: An optional boolean value indicating whether to wait for a free connection when all of them are in use.
+    """
+
+    def __init__(self, maxConnections=10, idleTimeout=None, keepAlive=True, block=False):
+        if (maxConnections < 1):
+            raise ValueError(f"Invalid maximum number of connections: {maxConnections}")
+        self.maxConnections = maxConnections
+        self.idleTimeout = idleTimeout
+        self.keepAlive = keepAlive
+        self.block = block
+
+        self.__session = None
+        self.__lastUse = None
+        self.__lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def __createSession(self):
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.maxConnections, pool_block=self.block)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not self.keepAlive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    @property
+    def session(self):
+        """
+        The ``requests.Session`` holding the pooled connections.
+
+        The session is created on first use and recreated when it has been idle for more than :attr:`idleTimeout`.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            if (self.__session is not None) and (self.idleTimeout is not None) and (now - self.__lastUse > self.idleTimeout):
+                self.__session.close()
+                self.__session = None
+            if self.__session is None:
+                self.__session = self.__createSession()
+            self.__lastUse = now
+            return self.__session
+
+    def request(self, method, url, **kwArgs):
+        """
+        Sends a request using one of the pooled connections.
+
+        :param method: A string containing the HTTP method.
+        :param url: A string containing the URL.
+        :return: A ``requests.Response``.
+        """
+        return self.session.request(method, url, **kwArgs)
+
+    def close(self):
+        """
+        Closes all the pooled connections.
+
+        The pool can still be used afterwards: new connections are then opened on demand.
+        """
+        with self.__lock:
+            if self.__session is not None:
+                self.__session.close()
+                self.__session = None
@@ -0,0 +1,217 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import os
+import time
+
+class PCloudProgress:
+    """
+    Progress of a transfer, recorded as the list of the byte ranges which have been transferred.
+
+    The progress is saved in an append-only journal. The first line is a header giving the id of the remote file
+    together with the size, the modification time and the hash of the source file (when they are known)::
+
+        #pcloud-progress fileid=1 size=1048576 mtime=1650000000000000000 hash=1234567890
+
+    and each following line records a range which has been transferred (``+begin end``).
+    Completed ranges are not written immediately, but in batches, once :attr:`flushSize` bytes have been transferred
+    or :attr:`flushInterval` seconds have elapsed since the last write.
+    Files written by previous versions are still understood: a single integer means that all the bytes
+    before this offset have been transferred and lines without prefix (``begin end``) are ranges.
+
+    .. note::
+        This class is meant to be used internally by :meth:`PCloud.upload() <pcloud.PCloud.upload()>`
+        and :meth:`PCloud.download() <pcloud.PCloud.download()>`.
+
+    :param path: A string containing the path to the progress file.
+    """
+
+    flushInterval = 5
+    flushSize = 8388608
+
+    def __init__(self, path):
+        self.path = path
+        self.ranges = []
+        self.fileId = None
+        self.size = None
+        self.mtime = None
+        self.hash = None
+        self.__file = None
+        self.__sync = None
+        self.__pending = []
+        self.__pendingSize = 0
+        self.__flushTime = 0
+
+    @property
+    def done(self):
+        """
+        An integer representing the number of bytes which have been transferred.
+        """
+        return sum([e - b for b, e in self.ranges])
+
+    @property
+    def offset(self):
+        """
+        An integer representing the number of bytes which have been transferred from the beginning without any gap.
+        """
+        if (len(self.ranges) == 0) or (self.ranges[0][0] != 0):
+            return 0
+        return self.ranges[0][1]
+
+    def exists(self):
+        """
+        Tells whether the progress file exists.
+
+        :return: A boolean value indicating whether the progress file exists.
+        """
+        return os.path.isfile(self.path)
+
+    def load(self):
+        """
+        Loads the header and the ranges from the progress file.
+        """
+        self.ranges = []
+        self.fileId = None
+        self.size = None
+        self.mtime = None
+        self.hash = None
+        with open(self.path, 'rt') as progFile:
+            lines = progFile.read().split('\n')
+        if (len(lines) == 1) and (len(lines[0].split()) == 1):
+            self.add(0, int(lines[0]))
+            return
+        for line in lines:
+            if line.startswith('#'):
+                for field in line.split()[1:]:
+                    key, value = field.split('=')
+                    setattr(self, {'fileid': 'fileId'}.get(key, key), int(value))
+            elif (len(line.strip()) != 0):
+                self.add(*[int(o) for o in line.lstrip('+').split()])
+
+    def open(self, fileId=None, size=None, mtime=None, sync=None, hash=None):
+        """
+        Starts recording the progress.
+
+        The recorded ranges are discarded when the given file id, size, modification time or hash
+        do not match the ones read by :meth:`load`. The progress file is then rewritten with
+        the header and the remaining ranges, and kept open to append the next ranges.
+
+        :param fileId: An optional integer giving the id of the remote file.
+        :param size: An optional integer giving the size of the source file.
+        :param mtime: An optional integer giving the modification time of the source file (in nanoseconds).
+        :param sync: An optional function to be called before ranges are written (to flush the destination file).
+        :param hash: An optional integer giving the hash of the source file.
+        """
+        for name, value in [('fileId', fileId), ('size', size), ('mtime', mtime), ('hash', hash)]:
+            if (value is not None) and (getattr(self, name) is not None) and (getattr(self, name) != value):
+                self.ranges = []
+        self.fileId = fileId
+        self.size = size
+        self.mtime = mtime
+        self.hash = hash
+        self.__sync = sync
+
+        header = '#pcloud-progress' + ''.join([f' {k}={v}' for k, v in [('fileid', fileId), ('size', size), ('mtime', mtime), ('hash', hash)] if v is not None])
+        self.__file = open(self.path, 'wt')
+        self.__file.write(header + '\n' + ''.join([f'+{b} {e}\n' for b, e in self.ranges]))
+        self.__file.flush()
+        self.__pending = []
+        self.__pendingSize = 0
+        self.__flushTime = time.monotonic()
+
+    def flush(self):
+        """
+        Appends the ranges which have not been written yet to the progress file.
+        """
+        if (self.__file is None) or (len(self.__pending) == 0):
+            return
+        if self.__sync is not None:
+            self.__sync()
+        self.__file.write(''.join([f'+{b} {e}\n' for b, e in self.__pending]))
+        self.__file.flush()
+        self.__pending = []
+        self.__pendingSize = 0
+        self.__flushTime = time.monotonic()
+
+    def close(self):
+        """
+        Writes the pending ranges and closes the progress file.
+        """
+        if self.__file is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self.__file.close()
+            self.__file = None
+
+    def remove(self):
+        """
+        Closes (without writing the pending ranges) and removes the progress file.
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+        self.__pending = []
+        self.__pendingSize = 0
+        os.remove(self.path)
+
+    def add(self, begin, end):
+        """
+        Records that the bytes between **begin** (included) and **end** (excluded) have been transferred.
+
+        When the progress file is open, the range is appended to it once the flush budget is exhausted.
+
+        :param begin: An integer giving the start of the range.
+        :param end: An integer giving the end of the range.
+        """
+        if (begin >= end):
+            return
+        if self.__file is not None:
+            if (len(self.__pending) != 0) and (self.__pending[-1][1] == begin):
+                self.__pending[-1] = (self.__pending[-1][0], end)
+            else:
+                self.__pending.append((begin, end))
+            self.__pendingSize += end - begin
+            if (self.__pendingSize >= self.flushSize) or (time.monotonic() - self.__flushTime >= self.flushInterval):
+                self.flush()
+        ranges = []
+        for b, e in self.ranges:
+            if (e < begin) or (b > end):
+                ranges.append((b, e))
+            else:
+                begin = min(begin, b)
+                end = max(end, e)
+        ranges.append((begin, end))
+        self.ranges = sorted(ranges)
+
+    def missing(self, size):
+        """
+        Lists the byte ranges which have not been transferred yet.
+
+        :param size: An integer giving the total number of bytes to be transferred.
+        :return: A list of tuples ``(begin, end)``.
+        """
+        missing = []
+        offset = 0
+        for b, e in self.ranges:
+            if (b > offset):
+                missing.append((offset, min(b, size)))
+            offset = max(offset, e)
+        if (offset < size):
+            missing.append((offset, size))
+        return [(b, e) for b, e in missing if (b < e)]
@@ -0,0 +1,191 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import sqlite3
+
+from .info import PCloudInfo
+
+class PCloudSnapshot:
+    """
+    Snapshot of a *PCloud* folder tree saved in a local SQLite database.
+
+    The snapshot stores the metadata of the files and folders (one row per item), so that the tree
+    can be reloaded without listing the folders again (see :meth:`load()`). It is used as follows::
+
+        with PCloudSnapshot('pcloud.db') as snapshot:
+            root = snapshot.refresh(pCloud)
+
+    By default, :meth:`refresh()` lists the folder tree recursively (in a single request) and replaces its snapshot.
+    With **changedOnly**, it only lists the folders whose ``hash`` or ``modified`` fields changed
+    since the snapshot was taken (the folders which are not in the snapshot are listed recursively),
+    as :meth:`PCloud.refresh() <pcloud.PCloud.refresh()>` does.
+
+    .. warning::
+        *PCloud* only updates the modification time of a folder when its direct contents change.
+        With **changedOnly**, changes deeper in the tree of a folder whose metadata did not change are not seen by :meth:`refresh()`.
+
+    :param path: A string containing the path to the database file.
+    """
+
+    columns = {
+        'category'      : 'category',
+        'contenttype'   : 'contentType',
+        'comments'      : 'comments',
+        'created'       : 'created',
+        'hash'          : 'hash',
+        'icon'          : 'icon',
+        'ismine'        : 'isMine',
+        'isshared'      : 'isShared',
+        'modified'      : 'modified',
+        'name'          : 'name',
+        'parentfolderid': 'parentFolderId',
+        'size'          : 'size',
+        'thumb'         : 'hasThumb',
+    }
+    """ Metadata fields stored in the snapshot (and the corresponding :class:`~.info.PCloudInfo` attributes) """
+
+    def __init__(self, path):
+        self.path = path
+        self.__db = sqlite3.connect(path)
+        self.__db.execute(f"CREATE TABLE IF NOT EXISTS items (isfolder INTEGER NOT NULL, id INTEGER NOT NULL, {', '.join(self.columns)}, PRIMARY KEY (isfolder, id))")
+        self.__db.execute("CREATE INDEX IF NOT EXISTS items_parent ON items (parentfolderid)")
+        self.__db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self.__db.close()
+
+    def __len__(self):
+        return self.__db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def save(self, info):
+        """
+        Saves a folder tree (replacing the previous snapshot of this folder).
+
+        :param info: A :class:`~.info.PCloudFolderInfo` obtained with :meth:`PCloud.listFolder() <pcloud.PCloud.listFolder()>` with recursion enabled.
+        """
+        with self.__db:
+            self.__delete(info.id, True)
+            self.__insert(info, True, None)
+
+    def load(self, pCloud, folder=0):
+        """
+        Loads a folder tree from the snapshot.
+
+        :param pCloud: :class:`~pcloud.PCloud` instance (used by the returned objects).
+        :param folder: An optional integer giving the id of the folder to be loaded (the root folder by default).
+        :return: A :class:`~.info.PCloudFolderInfo` or ``None`` if the folder is not in the snapshot.
+        """
+        rows = self.__db.execute(f"SELECT isfolder, id, {', '.join(self.columns)} FROM items").fetchall()
+        names = ['isfolder', 'id'] + list(self.columns)
+        items = {}
+        children = {}
+        for row in rows:
+            metadata = {k: v for k, v in zip(names, row) if v is not None}
+            metadata['folderid' if metadata.pop('isfolder') else 'fileid'] = metadata.pop('id')
+            if 'hash' in metadata:
+                metadata['hash'] = int(metadata['hash'])
+            for k in ('ismine', 'isshared', 'thumb'):
+                if k in metadata:
+                    metadata[k] = bool(metadata[k])
+            if 'folderid' in metadata:
+                items[metadata['folderid']] = metadata
+                metadata['contents'] = []
+            children.setdefault(metadata.get('parentfolderid'), []).append(metadata)
+        if folder not in items:
+            return None
+        for folderId, metadata in items.items():
+            metadata['contents'] = sorted(children.get(folderId, []), key=lambda m: m['name'])
+        return PCloudInfo(pCloud, items[folder])
+
+    def refresh(self, pCloud, folder=0, changedOnly=False):
+        """
+        Updates the snapshot of a folder tree and loads it.
+
+        By default, the folder is listed recursively (in a single request) and its snapshot is replaced.
+        When **changedOnly** is true, the folder is listed, and then the folders in it whose ``hash`` or ``modified`` fields differ
+        from the snapshot are refreshed recursively (one request per changed folder, but the changes in the folders
+        whose parent folder did not change are not seen).
+
+        :param pCloud: :class:`~pcloud.PCloud` instance.
+        :param folder: An optional integer giving the id of the folder to be refreshed (the root folder by default).
+        :param changedOnly: An optional boolean value indicating whether only the folders whose metadata changed should be listed again.
+        :return: A :class:`~.info.PCloudFolderInfo` loaded from the updated snapshot.
+        """
+        with self.__db:
+            row = self.__db.execute("SELECT parentfolderid FROM items WHERE isfolder = 1 AND id = ?", (folder,)).fetchone()
+            if row is None:
+                self.__insert(pCloud.listFolder(folder, recursive=True), True, None)
+            elif changedOnly:
+                self.__refresh(pCloud, folder, row[0])
+            else:
+                info = pCloud.listFolder(folder, recursive=True)
+                self.__delete(folder, True)
+                self.__insert(info, True, row[0])
+        return self.load(pCloud, folder)
+
+    def __refresh(self, pCloud, folder, parent):
+        info = pCloud.listFolder(folder)
+        self.__insert(info, False, parent)
+        stored = self.__db.execute("SELECT isfolder, id FROM items WHERE parentfolderid = ?", (info.id,)).fetchall()
+        listed = set()
+        for child in info:
+            listed.add((int(child.isFolder), child.id))
+            if not child.isFolder:
+                self.__insert(child, False, info.id)
+                continue
+            row = self.__db.execute("SELECT hash, modified FROM items WHERE isfolder = 1 AND id = ?", (child.id,)).fetchone()
+            if row is None:
+                self.__insert(pCloud.listFolder(child.id, recursive=True), True, info.id)
+            elif (row != (self.__hash(child), getattr(child, 'modified', None))):
+                self.__refresh(pCloud, child.id, info.id)
+            else:
+                self.__insert(child, False, info.id)
+        for isFolder, itemId in stored:
+            if (isFolder, itemId) not in listed:
+                self.__delete(itemId, isFolder)
+
+    @staticmethod
+    def __hash(info):
+        # Hashes do not fit in SQLite integers
+        h = getattr(info, 'hash', None)
+        return str(h) if h is not None else None
+
+    def __insert(self, info, recursive, parent):
+        values = {c: getattr(info, a, None) for c, a in self.columns.items()}
+        values['hash'] = self.__hash(info)
+        if values['parentfolderid'] is None:
+            values['parentfolderid'] = parent
+        self.__db.execute(f"INSERT OR REPLACE INTO items VALUES ({', '.join(['?'] * (2 + len(values)))})", [int(info.isFolder), info.id] + list(values.values()))
+        if recursive and info.isFolder:
+            for child in info:
+                self.__insert(child, True, info.id)
+
+    def __delete(self, itemId, isFolder):
+        if isFolder:
+            for childIsFolder, childId in self.__db.execute("SELECT isfolder, id FROM items WHERE parentfolderid = ?", (itemId,)).fetchall():
+                self.__delete(childId, childIsFolder)
+        self.__db.execute("DELETE FROM items WHERE isfolder = ? AND id = ?", (int(isFolder), itemId))
@@ -0,0 +1,507 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import hashlib
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from threading import Lock
+
+def _hashFile(path, algorithm, blockSize):
+    h = hashlib.new(algorithm)
+    with open(path, 'rb') as srcFile:
+        for data in iter(lambda: srcFile.read(blockSize), b''):
+            h.update(data)
+    return h.hexdigest()
+
+class PCloudSyncAction:
+    """
+    An operation planned by :class:`PCloudSync` or :class:`PCloudMirror`. The instances of this class have the following attributes:
+      - ``operation`` A :class:`PCloudSync.Operation`
+      - ``localPath`` A string giving the path to the local file or folder (``None`` for deletions of remote items)
+      - ``remote`` A :class:`~.info.PCloudInfo` containing the information about the remote item
+        (``None`` until the item has been created and for deletions of local items)
+      - ``parent`` The :class:`~.info.PCloudFolderInfo` of the remote parent folder, or the :class:`PCloudSyncAction` creating it
+        (``None`` for the actions of :class:`PCloudMirror`)
+      - ``name`` A string giving the name of the item
+      - ``size`` An integer giving the size of the local file (``0`` for folders and deletions)
+      - ``verify`` A boolean value indicating whether the transfer is skipped when the checksums of the local and remote files match
+
+    :param operation: A :class:`PCloudSync.Operation`.
+    :param localPath: A string giving the path to the local file or folder.
+    :param remote: A :class:`~.info.PCloudInfo` containing the information about the remote item.
+    :param parent: The remote parent folder.
+    :param name: A string giving the name of the remote item.
+    :param size: An optional integer giving the size of the local file.
+    :param verify: An optional boolean value indicating whether the checksums should be compared before updating.
+    """
+
+    __slots__ = ('operation', 'localPath', 'remote', 'parent', 'name', 'size', 'verify')
+
+    def __init__(self, operation, localPath, remote, parent, name, size=0, verify=False):
+        self.operation = operation
+        self.localPath = localPath
+        self.remote = remote
+        self.parent = parent
+        self.name = name
+        self.size = size
+        self.verify = verify
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.operation.name}, {self.name!r})"
+
+    @property
+    def isFolder(self):
+        """
+        A boolean value indicating whether the action creates or deletes a folder.
+        """
+        if (self.operation is PCloudSync.Operation.Delete) and (self.remote is not None):
+            return self.remote.isFolder
+        elif self.operation is PCloudSync.Operation.Delete:
+            return os.path.isdir(self.localPath) and not os.path.islink(self.localPath)
+        return (self.operation is PCloudSync.Operation.CreateFolder)
+
+
+class PCloudSyncReport:
+    """
+    Statistics about a synchronization performed by :class:`PCloudSync` or :class:`PCloudMirror`.
+    The instances of this class have the following attributes:
+      - ``createdFolders`` An integer giving the number of folders which have been created
+      - ``uploadedFiles`` An integer giving the number of new files which have been uploaded
+      - ``updatedFiles`` An integer giving the number of existing files which have been uploaded again
+      - ``downloadedFiles`` An integer giving the number of files which have been downloaded
+      - ``deletedFiles`` An integer giving the number of files which have been deleted
+      - ``deletedFolders`` An integer giving the number of folders which have been deleted
+      - ``uploadedBytes`` An integer giving the number of bytes which have been uploaded
+      - ``downloadedBytes`` An integer giving the number of bytes which have been downloaded
+      - ``skippedFiles`` An integer giving the number of files which were up to date
+      - ``skippedBytes`` An integer giving the size of the files which were up to date
+      - ``conflicts`` A list of the local paths which were not synchronized, because a remote item of a different kind
+        (a folder instead of a file, or conversely) has the same name and deletions are not allowed
+      - ``elapsed`` A float giving the duration of the synchronization in seconds
+    """
+
+    def __init__(self):
+        self.createdFolders = 0
+        self.uploadedFiles = 0
+        self.updatedFiles = 0
+        self.downloadedFiles = 0
+        self.deletedFiles = 0
+        self.deletedFolders = 0
+        self.uploadedBytes = 0
+        self.downloadedBytes = 0
+        self.skippedFiles = 0
+        self.skippedBytes = 0
+        self.conflicts = []
+        self.elapsed = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(uploaded={self.uploadedFiles}, updated={self.updatedFiles}, downloaded={self.downloadedFiles}, deleted={self.deletedFiles}, skipped={self.skippedFiles})"
+
+    @property
+    def throughput(self):
+        """
+        A float giving the number of bytes transferred (uploaded or downloaded) per second.
+        """
+        if (self.elapsed == 0):
+            return 0.0
+        return (self.uploadedBytes + self.downloadedBytes) / self.elapsed
+
+
+class PCloudSync:
+    """
+    Synchronizes a local folder tree to a *PCloud* folder tree.
+
+    The synchronization is done in two steps. :meth:`plan` walks both trees and lists the actions
+    which are needed (as :class:`PCloudSyncAction`), so that they can be reviewed before :meth:`execute` performs them::
+
+        sync = PCloudSync(pCloud, '/home/user/Photos', '/Photos', delete=True, workers=4)
+        actions = sync.plan()
+        report = sync.execute(actions)
+        print(f'{report.uploadedBytes} bytes uploaded at {report.throughput} bytes/s')
+
+    A remote file is considered up to date when it has the same size as the local file and the local file
+    has not been modified since the remote file was (the remote files are modified when they are uploaded).
+    When **checksum** is enabled, the files which have been modified but whose size did not change are uploaded
+    only if their checksum differs from the one of the remote file (the checksums are computed by the workers).
+
+    The files are uploaded and deleted concurrently by **workers** threads, whereas folders are created
+    and deleted one at a time (once the previous actions are done), so that the actions are performed in the planned order:
+    remote items are deleted first (files before their folders), then folders are created and finally files are uploaded.
+
+    The files which are updated are uploaded to a temporary file (named after the remote file, with a ``.part`` suffix),
+    which then replaces the remote file (moving it to the trash), so that the remote file is kept when the upload fails.
+
+    .. note::
+        This class is meant to be used internally by :meth:`PCloud.sync() <pcloud.PCloud.sync()>`.
+
+    :param pCloud: :class:`~pcloud.PCloud` instance.
+    :param localPath: A string giving the path to the local folder.
+    :param folder: An integer representing the id of the remote folder, a string giving its path or a :class:`~.info.PCloudFolderInfo`.
+    :param delete: An optional boolean value indicating whether the remote items which do not exist locally should be deleted.
+    :param checksum: An optional boolean value indicating whether the checksums should be compared before updating files.
+    :param workers: An optional integer giving the number of files transferred concurrently.
+    """
+
+    class Operation(Enum):
+        """
+        Operations performed by :class:`PCloudSync`.
+        """
+
+        Delete       = 0
+        """
+        Delete a file or (empty) folder.
+
+        :meta hide-value:
+        """
+        CreateFolder = 1
+        """
+        Create a folder.
+
+        :meta hide-value:
+        """
+        Upload       = 2
+        """
+        Upload a new file.
+
+        :meta hide-value:
+        """
+        Update       = 3
+        """
+        Upload an existing file again.
+
+        :meta hide-value:
+        """
+        Download     = 4
+        """
+        Download a remote file (replacing the local file).
+
+        :meta hide-value:
+        """
+
+    hashBlockSize = 1048576
+    """ Size of the blocks read to compute the checksums of the local files """
+
+    def __init__(self, pCloud, localPath, folder, delete=False, checksum=False, workers=1):
+        self.pCloud = pCloud
+        self.localPath = localPath
+        self.folder = folder
+        self.delete = delete
+        self.checksum = checksum
+        self.workers = workers
+        self.report = PCloudSyncReport()
+        self.__lock = Lock()
+
+    def plan(self):
+        """
+        Lists the actions needed to synchronize the remote tree with the local tree.
+
+        The files which are up to date are counted in :attr:`report` (which is reset).
+
+        :return: A list of :class:`PCloudSyncAction`.
+        """
+        self.report = PCloudSyncReport()
+        folder = self.folder
+        if not getattr(folder, 'isFolder', False):
+            folder = self.pCloud.listFolder(folder, recursive=True)
+        deletions, creations, uploads = [], [], []
+        self.__planFolder(self.localPath, folder, folder, deletions, creations, uploads)
+        return deletions + creations + uploads
+
+    def __planFolder(self, localPath, remote, parent, deletions, creations, uploads):
+        remoteItems = {o.name: o for o in remote} if remote is not None else {}
+        with os.scandir(localPath) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            item = remoteItems.pop(entry.name, None)
+            isFolder = entry.is_dir()
+            if (item is not None) and (item.isFolder != isFolder):
+                if not self.delete:
+                    self.report.conflicts.append(entry.path)
+                    continue
+                self.__planDelete(item, parent, deletions)
+                item = None
+            if isFolder:
+                if item is None:
+                    action = PCloudSyncAction(PCloudSync.Operation.CreateFolder, entry.path, None, parent, entry.name)
+                    creations.append(action)
+                    self.__planFolder(entry.path, None, action, deletions, creations, uploads)
+                else:
+                    self.__planFolder(entry.path, item, item, deletions, creations, uploads)
+                continue
+            stat = entry.stat()
+            if item is None:
+                uploads.append(PCloudSyncAction(PCloudSync.Operation.Upload, entry.path, None, parent, entry.name, stat.st_size))
+            elif (getattr(item, 'size', None) == stat.st_size) and (int(stat.st_mtime) <= self.__timestamp(item)):
+                self.report.skippedFiles += 1
+                self.report.skippedBytes += stat.st_size
+            else:
+                verify = self.checksum and (getattr(item, 'size', None) == stat.st_size)
+                uploads.append(PCloudSyncAction(PCloudSync.Operation.Update, entry.path, item, parent, entry.name, stat.st_size, verify))
+        if self.delete:
+            for item in remoteItems.values():
+                self.__planDelete(item, parent, deletions)
+
+    def __planDelete(self, item, parent, deletions):
+        # The contents of the folders are deleted before the folders
+        if item.isFolder:
+            for child in item:
+                self.__planDelete(child, item, deletions)
+        deletions.append(PCloudSyncAction(PCloudSync.Operation.Delete, None, item, parent, item.name))
+
+    @staticmethod
+    def __timestamp(item):
+        try:
+            return parsedate_to_datetime(item.modified).timestamp()
+        except (AttributeError, TypeError, ValueError):
+            return 0
+
+    def execute(self, actions):
+        """
+        Performs the given actions.
+
+        The statistics about the actions are added to :attr:`report`.
+        When an action fails, the actions which have not started are cancelled and the exception is raised.
+
+        :param actions: A list of :class:`PCloudSyncAction` (as returned by :meth:`plan`).
+        :return: The :class:`PCloudSyncReport` giving the statistics about the synchronization.
+        """
+        start = time.monotonic()
+        executor = ThreadPoolExecutor(self.workers)
+        try:
+            pending = []
+            for action in actions:
+                if action.isFolder:
+                    self.__wait(pending)
+                    pending = []
+                    self._perform(action)
+                else:
+                    pending.append(executor.submit(self._perform, action))
+            self.__wait(pending)
+        finally:
+            executor.shutdown(cancel_futures=True)
+            self.report.elapsed += time.monotonic() - start
+        return self.report
+
+    @staticmethod
+    def __wait(futures):
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            future.result()
+
+    def _perform(self, action):
+        if action.operation is PCloudSync.Operation.Delete:
+            if action.remote.isFolder:
+                self.pCloud.deleteFolder(action.remote.id)
+            else:
+                self.pCloud.deleteFile(action.remote.id)
+            self._count('deletedFolders' if action.remote.isFolder else 'deletedFiles')
+        elif action.operation is PCloudSync.Operation.CreateFolder:
+            action.remote = self.pCloud.createFolder(self.__folderId(action.parent), action.name)
+            self._count('createdFolders')
+        elif action.verify and self.__sameChecksum(action):
+            self._count('skippedFiles')
+            self._count('skippedBytes', action.size)
+        else:
+            self.__upload(action)
+            self._count('uploadedFiles' if action.operation is PCloudSync.Operation.Upload else 'updatedFiles')
+
+    def _count(self, name, value=1):
+        with self.__lock:
+            setattr(self.report, name, getattr(self.report, name) + value)
+
+    @staticmethod
+    def __folderId(parent):
+        if isinstance(parent, PCloudSyncAction):
+            return parent.remote.id
+        return parent.id
+
+    def __sameChecksum(self, action):
+        remoteChecksum = self.pCloud.checksumFile(action.remote.id)
+        for algo in self.pCloud.HashAlgorithm:
+            if (len(remoteChecksum) == algo.length):
+                break
+        else: #pragma: no cover
+            return False
+        return (_hashFile(action.localPath, algo.value, self.hashBlockSize) == remoteChecksum)
+
+    def __upload(self, action):
+        name = action.name if (action.remote is None) else action.name + '.part'
+        with open(action.localPath, 'rb') as srcFile:
+            pCloudFile = self.pCloud.createFile(self.__folderId(action.parent), name)
+            try:
+                with pCloudFile:
+                    offset = 0
+                    for o in pCloudFile.uploadFile(srcFile, 0):
+                        self._count('uploadedBytes', o - offset)
+                        offset = o
+                if action.remote is not None:
+                    self.pCloud.renameFile(pCloudFile.fileId, action.name)
+            except BaseException:
+                self.pCloud.deleteFile(pCloudFile.fileId)
+                raise
+
+
+class PCloudMirror(PCloudSync):
+    """
+    Mirrors a *PCloud* folder tree to a local folder tree.
+
+    This is the converse of :class:`PCloudSync`: :meth:`plan` lists the local folders to create, the files to download and,
+    when **delete** is set, the local files and folders which do not exist remotely. The local files which have the same size as
+    the remote files are downloaded only when their checksums differ from the ones given by :meth:`PCloud.checksumFile() <pcloud.PCloud.checksumFile()>`
+    (SHA-1, which is available on all *PCloud* servers). The local checksums are computed by a pool of **hashWorkers** processes,
+    while the workers wait for the remote checksums, so that hashing large files does not hold the workers back.
+
+    The files are downloaded to a temporary file (named after the local file, with a ``.part`` suffix), which replaces the local file
+    once it has been downloaded.
+
+    .. note::
+        This class is meant to be used internally by :meth:`PCloud.mirror() <pcloud.PCloud.mirror()>`.
+
+    :param pCloud: :class:`~pcloud.PCloud` instance.
+    :param folder: An integer representing the id of the remote folder, a string giving its path or a :class:`~.info.PCloudFolderInfo`.
+    :param localPath: A string giving the path to the local folder.
+    :param delete: An optional boolean value indicating whether the local items which do not exist remotely should be deleted.
+    :param workers: An optional integer giving the number of files transferred concurrently.
+    :param hashWorkers: An optional integer giving the number of processes computing checksums
+                        (the number of processors by default, ``0`` to compute them in the workers).
+    """
+
+    def __init__(self, pCloud, folder, localPath, delete=False, workers=1, hashWorkers=None):
+        super().__init__(pCloud, localPath, folder, delete, True, workers)
+        self.hashWorkers = hashWorkers
+        self.__hashExecutor = None
+
+    def plan(self):
+        """
+        Lists the actions needed to mirror the remote tree to the local tree.
+
+        :return: A list of :class:`PCloudSyncAction`.
+        """
+        self.report = PCloudSyncReport()
+        folder = self.folder
+        if not getattr(folder, 'isFolder', False):
+            folder = self.pCloud.listFolder(folder, recursive=True)
+        deletions, creations, downloads = [], [], []
+        self.__planFolder(folder, self.localPath, deletions, creations, downloads)
+        return deletions + creations + downloads
+
+    def __planFolder(self, remote, localPath, deletions, creations, downloads):
+        entries = {}
+        if os.path.isdir(localPath):
+            with os.scandir(localPath) as it:
+                entries = {e.name: e for e in it}
+        for item in sorted(remote, key=lambda o: o.name):
+            path = os.path.join(localPath, item.name)
+            entry = entries.pop(item.name, None)
+            if (entry is not None) and (entry.is_dir(follow_symlinks=False) != item.isFolder):
+                if not self.delete:
+                    self.report.conflicts.append(path)
+                    continue
+                self.__planDelete(path, deletions)
+                entry = None
+            if item.isFolder:
+                if entry is None:
+                    creations.append(PCloudSyncAction(PCloudSync.Operation.CreateFolder, path, item, None, item.name))
+                self.__planFolder(item, path, deletions, creations, downloads)
+            else:
+                verify = (entry is not None) and (entry.stat().st_size == getattr(item, 'size', None))
+                downloads.append(PCloudSyncAction(PCloudSync.Operation.Download, path, item, None, item.name, getattr(item, 'size', 0), verify))
+        if self.delete:
+            for name in sorted(entries.keys()):
+                self.__planDelete(entries[name].path, deletions)
+
+    def __planDelete(self, path, deletions):
+        # The contents of the folders are deleted before the folders
+        if os.path.isdir(path) and not os.path.islink(path):
+            with os.scandir(path) as it:
+                paths = sorted([e.path for e in it])
+            for p in paths:
+                self.__planDelete(p, deletions)
+        deletions.append(PCloudSyncAction(PCloudSync.Operation.Delete, path, None, None, os.path.basename(path)))
+
+    def execute(self, actions):
+        """
+        Performs the given actions.
+
+        The statistics about the actions are added to :attr:`report`.
+        When an action fails, the actions which have not started are cancelled and the exception is raised.
+
+        :param actions: A list of :class:`PCloudSyncAction` (as returned by :meth:`plan`).
+        :return: The :class:`PCloudSyncReport` giving the statistics about the synchronization.
+        """
+        if (self.hashWorkers != 0) and any([a.verify for a in actions]):
+            self.__hashExecutor = ProcessPoolExecutor(self.hashWorkers)
+        try:
+            return super().execute(actions)
+        finally:
+            if self.__hashExecutor is not None:
+                self.__hashExecutor.shutdown(cancel_futures=True)
+                self.__hashExecutor = None
+
+    def _perform(self, action):
+        if action.operation is PCloudSync.Operation.Delete:
+            if action.isFolder:
+                os.rmdir(action.localPath)
+                self._count('deletedFolders')
+            else:
+                os.remove(action.localPath)
+                self._count('deletedFiles')
+        elif action.operation is PCloudSync.Operation.CreateFolder:
+            os.makedirs(action.localPath, exist_ok=True)
+            self._count('createdFolders')
+        elif action.verify and self.__sameChecksum(action):
+            self._count('skippedFiles')
+            self._count('skippedBytes', action.size)
+        else:
+            self.__download(action)
+            self._count('downloadedFiles')
+
+    def __sameChecksum(self, action):
+        algo = self.pCloud.HashAlgorithm.SHA1
+        localChecksum = None
+        if self.__hashExecutor is not None:
+            localChecksum = self.__hashExecutor.submit(_hashFile, action.localPath, algo.value, self.hashBlockSize)
+        remoteChecksum = self.pCloud.checksumFile(action.remote.id, algo)
+        if (len(remoteChecksum) != algo.length):
+            # Another checksum was returned
+            for algo in self.pCloud.HashAlgorithm:
+                if (len(remoteChecksum) == algo.length):
+                    break
+            else: #pragma: no cover
+                return False
+            localChecksum = None
+        if localChecksum is None:
+            return (_hashFile(action.localPath, algo.value, self.hashBlockSize) == remoteChecksum)
+        return (localChecksum.result() == remoteChecksum)
+
+    def __download(self, action):
+        partPath = action.localPath + '.part'
+        try:
+            with self.pCloud.openFile(action.remote.id) as pCloudFile, open(partPath, 'wb') as destFile:
+                offset = 0
+                for o in pCloudFile.downloadFile(destFile, 0):
+                    self._count('downloadedBytes', o - offset)
+                    offset = o
+            os.replace(partPath, action.localPath)
+        except BaseException:
+            if os.path.exists(partPath):
+                os.remove(partPath)
+            raise
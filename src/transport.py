@@ -0,0 +1,450 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import ssl
+import socket
+import requests
+
+from abc import ABC, abstractmethod
+from threading import Lock
+from urllib.parse import urlsplit
+
+from .response import PCloudResponse
+from .jsonstream import PCloudJsonDecoder
+
+class PCloudTransport(ABC):
+    """
+    Base class for the transports used by :class:`~pcloud.PCloud` to send requests to *PCloud* API servers.
+
+    A transport sends requests either on its own default connection(s) or on a *session*,
+    which is a connection dedicated to a file descriptor (*PCloud* file descriptors are bound to the connection
+    on which they have been opened).
+
+    The responses are returned as :class:`~.response.PCloudResponse`, except for file data,
+    which is returned as a byte array (or copied into a caller-supplied buffer).
+
+    Subclasses must implement all the abstract methods (otherwise they cannot be instantiated).
+    """
+
+    binary = False
+    """ Whether the transport talks to binary API servers (see :meth:`PCloud.getApiServer() <pcloud.PCloud.getApiServer()>`) """
+
+    @abstractmethod
+    def session(self): #pragma: no cover
+        """
+        Creates a new session (i.e. a connection dedicated to a file descriptor).
+
+        :return: An opaque session object to be given to :meth:`request()`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def closeSession(self, session): #pragma: no cover
+        """
+        Closes a session created with :meth:`session()`.
+
+        :param session: A session object returned by :meth:`session()`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def request(self, session, method, server, endPoint, params=None, data=None, files=None, into=None, hook=None): #pragma: no cover
+        """
+        Sends a request to a *PCloud* API server.
+
+        When **into** is given, file data is not returned, but received directly into this buffer
+        and the number of bytes received is returned instead.
+        When **hook** is given, it is called with each object of the response (from the innermost ones)
+        and its return value replaces the object (see :class:`~.jsonstream.PCloudJsonDecoder`).
+
+        :param session: A session object returned by :meth:`session()` or ``None`` to use the default connection.
+        :param method: A string containing the HTTP method.
+        :param server: A string containing the URL of the *PCloud* API server.
+        :param endPoint: A string containing the name of the *PCloud* API method.
+        :param params: An optional dictionnary of parameters.
+        :param data: An optional bytes-like object (``bytes``, ``bytearray``, ``memoryview``, ``mmap``) to be sent with the request.
+        :param files: An optional dictionnary of files to be uploaded.
+        :param into: An optional writable bytes-like object (``bytearray``, ``memoryview``, ``mmap``) receiving file data.
+        :param hook: An optional function called with each object of the response.
+        :return: A :class:`~.response.PCloudResponse`, a byte array containing file data
+            or an integer giving the number of bytes received into **into**.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self): #pragma: no cover
+        """
+        Closes the default connection(s) of the transport.
+        """
+        raise NotImplementedError
+
+
+class PCloudHttpTransport(PCloudTransport):
+    """
+    Transport sending requests as JSON over HTTPS using ``requests``.
+
+    When a hook is given to :meth:`request()`, the response is decoded while it is received
+    with a :class:`~.jsonstream.PCloudJsonDecoder`.
+
+    :param pool: An optional :class:`~.pool.PCloudSessionPool` used for requests which are not bound to a session.
+        If it is not provided, a new connection is opened for each of them.
+    """
+
+    chunkSize = 65536
+    """ The size of the chunks in which file data is received into a caller-supplied buffer (or JSON is decoded incrementally) """
+
+    def __init__(self, pool=None):
+        self.pool = pool
+
+    def session(self):
+        return requests.Session()
+
+    def closeSession(self, session):
+        session.close()
+
+    def request(self, session, method, server, endPoint, params=None, data=None, files=None, into=None, hook=None):
+        kwArgs = {}
+        if params is not None:
+            kwArgs['params'] = params
+        if type(data) is bytes:
+            kwArgs['data'] = data
+        elif data is not None:
+            # Other buffers (bytearray, memoryview, mmap) are sent as they are, without being copied into bytes:
+            kwArgs['data'] = memoryview(data).cast('B')
+        if type(files) is dict:
+            kwArgs['files'] = files
+        if (into is not None) or (hook is not None):
+            kwArgs['stream'] = True
+
+        if session is not None:
+            s = session
+        elif self.pool is not None:
+            s = self.pool
+        else:
+            s = requests
+
+        #print(f"{server + endPoint} {kwArgs}")
+        r = s.request(method, server + endPoint, **kwArgs)
+
+        r.raise_for_status()
+        if r.headers['Content-Type'].startswith('application/json') and (hook is not None):
+            return PCloudResponse(self.__decode(r, hook))
+        elif r.headers['Content-Type'].startswith('application/json'):
+            #print(r.json())
+            return PCloudResponse(r.json())
+        elif (r.headers['Content-Type'] == 'application/octet-stream') and (into is not None):
+            return self.__readInto(r, into)
+        elif (r.headers['Content-Type'] == 'application/octet-stream'):
+            #print(r.content)
+            return r.content
+        else: #pragma: no cover
+            raise ValueError(f"Unhandled content type: {r.headers['Content-Type']}")
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+
+    def __decode(self, r, hook):
+        decoder = PCloudJsonDecoder(hook)
+        for chunk in r.iter_content(self.chunkSize):
+            decoder.feed(chunk)
+        return decoder.close()
+
+    def __readInto(self, r, into):
+        view = memoryview(into).cast('B')
+        pos = 0
+        while (pos < len(view)):
+            n = r.raw.readinto(view[pos:pos + self.chunkSize])
+            if not n:
+                break
+            pos += n
+        # Consume the end of the body, so that the connection (to which file descriptors are bound) is reused:
+        while (len(r.raw.read(self.chunkSize)) != 0): #pragma: no cover
+            pass
+        return pos
+
+
+class _PCloudBinaryData:
+    def __init__(self, length):
+        self.length = length
+
+
+class PCloudBinarySession:
+    """
+    A connection to a *PCloud* binary API server.
+
+    The connection is opened on the first request and then kept open until :meth:`close()` is called.
+    Requests sent concurrently are serialized.
+
+    .. note::
+        This class is meant to be used internally by :class:`PCloudBinaryTransport`.
+
+    :param timeout: An optional timeout (in seconds) for socket operations.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.server = None
+        self.__socket = None
+        self.__lock = Lock()
+
+    def __connect(self, server):
+        url = urlsplit(server)
+        if (url.scheme == 'https'):
+            port = url.port or 443
+        elif (url.scheme == 'http'):
+            port = url.port or 80
+        else:
+            raise ValueError(f"Unsupported URL scheme: {url.scheme}")
+
+        sock = socket.create_connection((url.hostname, port), self.timeout)
+        if (url.scheme == 'https'):
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=url.hostname)
+        self.__socket = sock
+        self.server = server
+
+    def __recv(self, length):
+        buf = bytearray(length)
+        self.__recvInto(memoryview(buf))
+        return bytes(buf)
+
+    def __recvInto(self, view):
+        pos = 0
+        while (pos < len(view)):
+            n = self.__socket.recv_into(view[pos:])
+            if (n == 0):
+                raise ConnectionError("Connection closed by PCloud server")
+            pos += n
+
+    @staticmethod
+    def encodeRequest(method, params, dataLength=None):
+        """
+        Encodes a request using *PCloud* binary protocol.
+
+        :param method: A string containing the name of the *PCloud* API method.
+        :param params: A dictionnary of parameters.
+        :param dataLength: An optional integer giving the length of the data sent after the request.
+        :return: A byte array containing the encoded request.
+        """
+        name = method.encode()
+        if (len(name) > 127):
+            raise ValueError(f"Method name is too long: {method}")
+
+        req = bytearray()
+        if dataLength is not None:
+            req.append(0x80 | len(name))
+            req += dataLength.to_bytes(8, 'little')
+        else:
+            req.append(len(name))
+        req += name
+
+        req.append(len(params))
+        for k, v in params.items():
+            key = k.encode()
+            if (len(key) > 63):
+                raise ValueError(f"Parameter name is too long: {k}")
+            if isinstance(v, bool):
+                req.append(0x80 | len(key))
+                req += key
+                req.append(int(v))
+            elif isinstance(v, int) and (v >= 0):
+                req.append(0x40 | len(key))
+                req += key
+                req += int(v).to_bytes(8, 'little')
+            else:
+                value = str(v).encode()
+                req.append(len(key))
+                req += key
+                req += len(value).to_bytes(4, 'little')
+                req += value
+
+        if (len(req) > 65535):
+            raise ValueError(f"Request is too long: {len(req)} bytes")
+        return len(req).to_bytes(2, 'little') + req
+
+    @staticmethod
+    def decodeResponse(buf, pos=0, strings=None):
+        """
+        Decodes a value encoded using *PCloud* binary protocol.
+
+        :param buf: A byte array containing the encoded response.
+        :param pos: An optional integer giving the position of the value in the byte array.
+        :param strings: An optional list of the strings already decoded (which can be referenced by the value).
+        :return: A tuple containing the decoded value and the position of the next value in the byte array.
+        """
+        if strings is None:
+            strings = []
+
+        t = buf[pos]
+        pos += 1
+        if (t <= 3) or (100 <= t <= 149):
+            if (t <= 3):
+                length = int.from_bytes(buf[pos:pos + t + 1], 'little')
+                pos += t + 1
+            else:
+                length = t - 100
+            value = bytes(buf[pos:pos + length]).decode()
+            strings.append(value)
+            return value, pos + length
+        if (4 <= t <= 7):
+            index = int.from_bytes(buf[pos:pos + t - 3], 'little')
+            return strings[index], pos + t - 3
+        if (150 <= t <= 199):
+            return strings[t - 150], pos
+        if (8 <= t <= 15):
+            return int.from_bytes(buf[pos:pos + t - 7], 'little'), pos + t - 7
+        if (200 <= t <= 219):
+            return t - 200, pos
+        if (t == 16):
+            value = {}
+            while (buf[pos] != 255):
+                k, pos = PCloudBinarySession.decodeResponse(buf, pos, strings)
+                value[k], pos = PCloudBinarySession.decodeResponse(buf, pos, strings)
+            return value, pos + 1
+        if (t == 17):
+            value = []
+            while (buf[pos] != 255):
+                v, pos = PCloudBinarySession.decodeResponse(buf, pos, strings)
+                value.append(v)
+            return value, pos + 1
+        if (t == 18) or (t == 19):
+            return (t == 19), pos
+        if (t == 20):
+            return _PCloudBinaryData(int.from_bytes(buf[pos:pos + 8], 'little')), pos + 8
+        raise ValueError(f"Invalid binary value type: {t}")
+
+    def request(self, server, endPoint, params=None, data=None, into=None, hook=None):
+        """
+        Sends a request on the connection.
+
+        The binary response is decoded at once: **hook** is called on the decoded objects.
+
+        :param server: A string containing the URL of the *PCloud* binary API server.
+        :param endPoint: A string containing the name of the *PCloud* API method.
+        :param params: An optional dictionnary of parameters.
+        :param data: An optional bytes-like object to be sent with the request.
+        :param into: An optional writable bytes-like object into which file data is received.
+        :param hook: An optional function called with each object of the response.
+        :return: A :class:`~.response.PCloudResponse`, a byte array containing file data
+            or an integer giving the number of bytes received into **into**.
+        """
+        if (data is not None) and (type(data) is not bytes):
+            data = memoryview(data).cast('B')
+        req = PCloudBinarySession.encodeRequest(endPoint, params or {}, len(data) if data is not None else None)
+
+        with self.__lock:
+            if self.__socket is None:
+                self.__connect(server)
+            try:
+                self.__socket.sendall(req)
+                if data is not None:
+                    self.__socket.sendall(data)
+
+                length = int.from_bytes(self.__recv(4), 'little')
+                value, _ = PCloudBinarySession.decodeResponse(self.__recv(length))
+                content = None
+                for k, v in value.items():
+                    if isinstance(v, _PCloudBinaryData) and (into is not None) and (v.length <= len(into)):
+                        self.__recvInto(memoryview(into).cast('B')[:v.length])
+                        content = v.length
+                        value[k] = v.length
+                    elif isinstance(v, _PCloudBinaryData):
+                        content = self.__recv(v.length)
+                        value[k] = v.length
+            except BaseException:
+                self.__close()
+                raise
+
+        if (content is not None) and (value.get('result') == 0):
+            return content
+        if hook is not None:
+            value = PCloudJsonDecoder.apply(value, hook)
+        return PCloudResponse(value)
+
+    def __close(self):
+        if self.__socket is not None:
+            try:
+                self.__socket.close()
+            finally:
+                self.__socket = None
+
+    def close(self):
+        """
+        Closes the connection.
+        """
+        with self.__lock:
+            self.__close()
+
+
+class PCloudBinaryTransport(PCloudTransport):
+    """
+    Transport sending requests using *PCloud* binary protocol.
+
+    The binary protocol is much cheaper to encode and decode than JSON over HTTP, and file data
+    is sent and received without any HTTP overhead. All the requests which are not bound
+    to a file descriptor share a single kept-alive connection.
+
+    It is used as follows::
+
+        with PCloud(transport=PCloudBinaryTransport()) as pCloud:
+            pCloud.userInfo()
+
+    :param timeout: An optional timeout (in seconds) for socket operations.
+    """
+
+    binary = True
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.__session = PCloudBinarySession(timeout)
+
+    def session(self):
+        return PCloudBinarySession(self.timeout)
+
+    def closeSession(self, session):
+        session.close()
+
+    def request(self, session, method, server, endPoint, params=None, data=None, files=None, into=None, hook=None):
+        if session is None:
+            session = self.__session
+            if (session.server is not None) and (session.server != server):
+                session.close()
+
+        if type(files) is not dict:
+            return session.request(server, endPoint, params=params, data=data, into=into, hook=hook)
+
+        # The binary protocol uploads one file per request:
+        r = None
+        for name, (fileName, content) in files.items():
+            if hasattr(content, 'read'):
+                content = content.read()
+            if type(content) is str:
+                content = content.encode()
+            fileParams = dict(params or {})
+            fileParams['filename'] = fileName
+            fr = session.request(server, endPoint, params=fileParams, data=content)
+            if (r is None) or (fr.result != 0):
+                r = fr
+            else:
+                r['metadata'].extend(fr['metadata'])
+                r['fileids'].extend(fr['fileids'])
+            if (r.result != 0):
+                break
+        return r
+
+    def close(self):
+        self.__session.close()
@@ -18,6 +18,10 @@
 import unittest
 
 from .test_pcloud import TestPCloud
+from .test_sessionpool import TestSessionPool
+from .test_binarytransport import TestBinaryTransport
+from .test_info import TestInfo
+from .test_jsonstream import TestJsonStream
 
 from .test_getdigest import TestGetDigest
 from .test_supportedlanguages import TestSupportedLanguages
@@ -45,14 +49,34 @@ from .test_openfile import TestOpenFile
 from .test_createfile import TestCreateFile
 
 from .test_readfile import TestReadFile
+from .test_readinto import TestReadInto
 from .test_writefile import TestWriteFile
 from .test_truncatefile import TestTruncateFile
 from .test_sizefile import TestSizeFile
 from .test_offsetfile import TestOffsetFile
 from .test_seekfile import TestSeekFile
+from .test_readahead import TestReadAhead
+from .test_writebehind import TestWriteBehind
+from .test_fileio import TestFileIO
 
 from .test_check import TestCheck
+from .test_cache import TestCache
+from .test_pathindex import TestPathIndex
+from .test_snapshot import TestSnapshot
+from .test_walk import TestWalk
+from .test_prefetch import TestPrefetch
+from .test_refresh import TestRefresh
+from .test_sync import TestSync
+from .test_mirror import TestMirror
+from .test_progress import TestProgress
 from .test_upload import TestUpload
+from .test_uploadparallel import TestUploadParallel
+from .test_verify import TestVerify
+from .test_uploadmmap import TestUploadMmap
 from .test_download import TestDownload
+from .test_downloadparallel import TestDownloadParallel
+from .test_adaptiveblocksize import TestAdaptiveBlockSize
+
+from .test_asyncpcloud import TestAsyncPCloud, TestAsyncPCloudFile
 
 unittest.main()
@@ -0,0 +1,190 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import gc
+import json
+import sys
+import time
+import timeit
+import tracemalloc
+
+from pcloud.src.index import PCloudPathIndex
+from pcloud.src.info import PCloudInfo, PCloudFileInfo
+from pcloud.src.jsonstream import PCloudJsonDecoder
+
+def fileMetadata(fileId):
+    return {
+        'fileid': fileId,
+        'parentfolderid': fileId // 100,
+        'name': f'file{fileId}.txt',
+        'isfolder': False,
+        'ismine': True,
+        'isshared': False,
+        'thumb': False,
+        'category': 4,
+        'contenttype': 'text/plain',
+        'icon': 'document',
+        'hash': 1234567890123456789 + fileId,
+        'size': fileId * 8,
+        'created': 'Sun, 2 Feb 2020 20:20:20 +0000',
+        'modified': 'Sun, 2 Feb 2020 20:20:20 +0000',
+        'id': f'f{fileId}',
+    }
+
+def folderMetadata(count):
+    return {
+        'folderid': 1,
+        'parentfolderid': 0,
+        'name': 'Folder',
+        'isfolder': True,
+        'ismine': True,
+        'isshared': False,
+        'thumb': False,
+        'icon': 'folder',
+        'created': 'Sun, 2 Feb 2020 20:20:20 +0000',
+        'modified': 'Sun, 2 Feb 2020 20:20:20 +0000',
+        'id': 'd1',
+        'contents': [fileMetadata(i) for i in range(0, count)],
+    }
+
+def benchmarkInfo(count=100000, repeat=5):
+    """
+    Measures the memory used by each :class:`~pcloud.src.info.PCloudInfo` and the time needed to build them.
+
+    :param count: An integer giving the number of entries in the listed folder.
+    :param repeat: An integer giving the number of times the construction is timed.
+    :return: A tuple ``(bytes, seconds)`` giving the memory and the time per entry.
+    """
+    metadata = folderMetadata(count)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    folder = PCloudInfo(None, metadata)
+    memory = (tracemalloc.get_traced_memory()[0] - before) / count
+    tracemalloc.stop()
+    del folder
+    duration = min(timeit.repeat(lambda: PCloudInfo(None, metadata), number=1, repeat=repeat)) / count
+    return memory, duration
+
+def benchmarkDispatch(count=1000, repeat=300):
+    """
+    Measures the time needed to build file information objects with :class:`~pcloud.src.info.PCloudInfoMeta` dispatch
+    (one item at a time and with :meth:`~pcloud.src.info.PCloudInfoMeta.fromList()`) and without it.
+
+    The metadata only contains the file id, so that the dispatch is not hidden by the attributes copy.
+    The timings are interleaved and the best one is kept, to reduce the noise.
+
+    :param count: An integer giving the number of items built in each run.
+    :param repeat: An integer giving the number of runs.
+    :return: A dictionary mapping the names of the methods to the time per item (in seconds).
+    """
+    metadata = [{'fileid': i} for i in range(0, count)]
+    methods = {
+        'direct'  : lambda: [type.__call__(PCloudFileInfo, None, m) for m in metadata],
+        'dispatch': lambda: [PCloudInfo(None, m) for m in metadata],
+        'fromList': lambda: PCloudInfo.fromList(None, metadata),
+    }
+    timings = {k: [] for k in methods}
+    for _ in range(0, repeat):
+        for k, method in methods.items():
+            timings[k].append(timeit.timeit(method, number=1))
+    return {k: min(v) / count for k, v in timings.items()}
+
+def listingChunks(count, chunkSize=65536):
+    # The JSON text of a recursive listing (one folder per 100 files), generated chunk by chunk
+    buf = '{"result": 0, "metadata": {"folderid": 0, "name": "/", "isfolder": true, "contents": ['
+    for i in range(0, count):
+        if (i % 100 == 0):
+            buf += (', ' if i != 0 else '') + json.dumps(dict(folderMetadata(0), folderid=i // 100 + 1))[:-3] + '['
+        buf += (', ' if i % 100 != 0 else '') + json.dumps(fileMetadata(i))
+        if (i % 100 == 99) or (i == count - 1):
+            buf += ']}'
+        if len(buf) >= chunkSize:
+            yield buf.encode()
+            buf = ''
+    yield (buf + ']}}').encode()
+
+def benchmarkStream(count=100000):
+    """
+    Measures the peak memory and the time needed to build a recursive listing, with :class:`~pcloud.src.jsonstream.PCloudJsonDecoder`
+    and by decoding the whole response at once (as :meth:`requests.Response.json()` would).
+
+    :param count: An integer giving the number of files in the listing.
+    :return: A dictionary mapping the names of the methods to tuples ``(bytes, seconds)`` giving the peak memory and the time per entry.
+    """
+    def hook(metadata):
+        if ('fileid' in metadata) or ('folderid' in metadata):
+            return PCloudInfo(None, metadata)
+        return metadata
+    def whole(chunks):
+        return PCloudInfo(None, json.loads(b''.join(chunks))['metadata'])
+    def stream(chunks):
+        decoder = PCloudJsonDecoder(hook)
+        for chunk in chunks:
+            decoder.feed(chunk)
+        return decoder.close()['metadata']
+
+    results = {}
+    chunks = list(listingChunks(count))
+    for name, method in [('whole', whole), ('stream', stream)]:
+        # The chunks are generated while they are decoded when the memory is measured (as they would be received)
+        gc.collect()
+        tracemalloc.start()
+        root = method(listingChunks(count))
+        memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del root
+        gc.collect()
+        start = time.perf_counter()
+        root = method(chunks)
+        results[name] = (memory / count, (time.perf_counter() - start) / count)
+        del root
+    return results
+
+def benchmarkPathIndex(folders=(10, 100, 1000), repeat=5):
+    """
+    Measures the time needed to add the complete listing of a folder with 100 files to a :class:`~pcloud.src.index.PCloudPathIndex`
+    which already contains other folders with 100 files each.
+    This time should not depend on the number of folders in the index.
+
+    :param folders: An iterable of integers giving the numbers of folders in the index.
+    :param repeat: An integer giving the number of times the listing is added.
+    :return: A dictionary mapping the numbers of folders to the time per listing (in seconds).
+    """
+    results = {}
+    for count in folders:
+        index = PCloudPathIndex()
+        root = dict(folderMetadata(0), folderid=0, name='/', contents=[])
+        for f in range(0, count):
+            folder = dict(folderMetadata(0), folderid=f + 1, contents=[fileMetadata(i) for i in range(100 * f, 100 * (f + 1))])
+            folder['name'] = f'Folder{f}'
+            root['contents'].append(folder)
+        index.add(root, complete=True)
+        listing = dict(root['contents'][0], path='/Folder0')
+        results[count] = min(timeit.repeat(lambda: index.add(listing, complete=True), number=1, repeat=repeat))
+    return results
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    memory, duration = benchmarkInfo(count)
+    print(f"PCloudInfo: {memory:.0f} bytes/entry, {duration * 1e6:.2f} us/entry ({count} entries)")
+    for name, duration in benchmarkDispatch().items():
+        print(f"PCloudInfoMeta ({name}): {duration * 1e9:.0f} ns/item")
+    for name, (memory, duration) in benchmarkStream(count).items():
+        print(f"listFolder ({name}): {memory:.0f} bytes/entry peak, {duration * 1e6:.2f} us/entry")
+    for folders, duration in benchmarkPathIndex().items():
+        print(f"PCloudPathIndex ({folders} folders): {duration * 1e6:.0f} us/listing")
@@ -0,0 +1,155 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import socketserver
+import threading
+
+class PCloudBinaryServer:
+    """
+    Local stand-in for a *PCloud* binary API server.
+
+    The server answers the requests with the given responses (in order) and records
+    the requests it received as tuples ``(connection, method, params, data)``.
+    A response can be a dictionnary or a tuple ``(dictionnary, data)``.
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        self._connections = 0
+        self._lock = threading.Lock()
+
+        server = self
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                with server._lock:
+                    connection = server._connections
+                    server._connections += 1
+                while True:
+                    header = self.__recv(2)
+                    if header is None:
+                        return
+                    method, params, dataLength = PCloudBinaryServer.decodeRequest(self.__recv(int.from_bytes(header, 'little')))
+                    data = self.__recv(dataLength) if dataLength is not None else None
+                    with server._lock:
+                        server.requests.append((connection, method, params, data))
+                        response = server.responses.pop(0)
+                    if type(response) is tuple:
+                        self.request.sendall(PCloudBinaryServer.encodeResponse(*response))
+                    else:
+                        self.request.sendall(PCloudBinaryServer.encodeResponse(response))
+
+            def __recv(self, length):
+                buf = b''
+                while (len(buf) < length):
+                    chunk = self.request.recv(length - len(buf))
+                    if (len(chunk) == 0):
+                        return None
+                    buf += chunk
+                return buf
+
+        self.__server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.__server.daemon_threads = True
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.__server.shutdown()
+        self.__server.server_close()
+        return False
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.__server.server_address[1]}/"
+
+    @property
+    def connections(self):
+        return self._connections
+
+    @staticmethod
+    def decodeRequest(req):
+        pos = 0
+        nameLength = req[pos] & 0x7F
+        hasData = bool(req[pos] & 0x80)
+        pos += 1
+        dataLength = None
+        if hasData:
+            dataLength = int.from_bytes(req[pos:pos + 8], 'little')
+            pos += 8
+        method = req[pos:pos + nameLength].decode()
+        pos += nameLength
+
+        params = {}
+        nParams = req[pos]
+        pos += 1
+        for p in range(0, nParams):
+            paramType = req[pos] >> 6
+            keyLength = req[pos] & 0x3F
+            pos += 1
+            key = req[pos:pos + keyLength].decode()
+            pos += keyLength
+            if (paramType == 0):
+                length = int.from_bytes(req[pos:pos + 4], 'little')
+                params[key] = req[pos + 4:pos + 4 + length].decode()
+                pos += 4 + length
+            elif (paramType == 1):
+                params[key] = int.from_bytes(req[pos:pos + 8], 'little')
+                pos += 8
+            else:
+                params[key] = bool(req[pos])
+                pos += 1
+        assert(pos == len(req))
+        return method, params, dataLength
+
+    @staticmethod
+    def encodeResponse(value, data=None):
+        strings = []
+        def encode(v):
+            if isinstance(v, bool):
+                return bytes([19 if v else 18])
+            if isinstance(v, int):
+                if (v < 20):
+                    return bytes([200 + v])
+                n = max(1, (v.bit_length() + 7) // 8)
+                return bytes([7 + n]) + v.to_bytes(n, 'little')
+            if isinstance(v, str):
+                if v in strings:
+                    i = strings.index(v)
+                    if (i < 50):
+                        return bytes([150 + i])
+                    return bytes([4]) + i.to_bytes(1, 'little')
+                strings.append(v)
+                b = v.encode()
+                if (len(b) < 50):
+                    return bytes([100 + len(b)]) + b
+                return bytes([1]) + len(b).to_bytes(2, 'little') + b
+            if isinstance(v, bytes):
+                return bytes([20]) + len(v).to_bytes(8, 'little')
+            if isinstance(v, dict):
+                return bytes([16]) + b''.join(encode(k) + encode(i) for k, i in v.items()) + bytes([255])
+            if isinstance(v, list):
+                return bytes([17]) + b''.join(encode(i) for i in v) + bytes([255])
+            raise TypeError(f"Unsupported type: {type(v)}")
+
+        if data is not None:
+            value = dict(value)
+            value['data'] = data
+        res = encode(value)
+        return len(res).to_bytes(4, 'little') + res + (data or b'')
@@ -0,0 +1,168 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import io
+import requests
+import threading
+import unittest
+import unittest.mock
+
+from hashlib import sha1, md5
+
+class PCloudFakeServer:
+    """
+    In-memory stand-in for *PCloud* HTTP API, answering the requests sent through mocks
+    of ``requests.request`` and ``requests.Session``.
+
+    It is meant for tests where requests are sent concurrently (so that the order of the responses
+    cannot be known in advance). The files are stored in :attr:`files` (a dictionnary mapping file ids to byte arrays)
+    and the requests it received are recorded in :attr:`calls` as tuples ``(endPoint, params, data)``.
+    """
+
+    def __init__(self, files=None):
+        self.files = {k: bytearray(v) for k, v in (files or {}).items()}
+        self.calls = []
+        self.failures = {}
+        self.__fds = {}
+        self.__nextFd = 1
+        self.__lock = threading.Lock()
+
+    def setup(self, mock_session, mock_request):
+        mock_request.side_effect = self.request
+        def session():
+            s = unittest.mock.Mock()
+            # Not recorded by the mock, so that the data (possibly views over a mapped file) is not retained
+            s.request = self.request
+            return s
+        mock_session.side_effect = session
+
+    def endPoints(self):
+        return [c[0] for c in self.calls]
+
+    @staticmethod
+    def __response(value):
+        mr = unittest.mock.Mock(spec=requests.Response, status_code=200)
+        if type(value) is dict:
+            mr.headers = {'Content-Type': 'application/json; charset=utf-8'}
+            mr.json.return_value = value
+        else:
+            mr.headers = {'Content-Type': 'application/octet-stream'}
+            mr.content = bytes(value)
+            mr.raw = io.BytesIO(mr.content)
+        return mr
+
+    def request(self, method, url, params=None, data=None, files=None, stream=False):
+        endPoint = url.split('/')[-1]
+        params = dict(params or {})
+        with self.__lock:
+            self.calls.append((endPoint, params, None if data is None else bytes(data)))
+            if endPoint in self.failures:
+                code = self.failures[endPoint].pop(0)
+                if (len(self.failures[endPoint]) == 0):
+                    del self.failures[endPoint]
+                return self.__response({'result': code, 'error': "Failure"})
+            r = getattr(self, '_' + endPoint)(params, data)
+        if (type(r) is dict) and ('result' not in r):
+            r['result'] = 0
+        if (type(r) is dict) and (('username' in params) or (endPoint == 'file_open')):
+            r['auth'] = 'AuthAuthAuthAuthAuthAuthAuthAuthAuthAuth'
+        return self.__response(r)
+
+    def _getdigest(self, params, data):
+        return {'digest': 'pCloudpCloudpCloudDigestDigestDigestDigestDigestDigestDigest'}
+
+    def _logout(self, params, data):
+        return {'auth_deleted': True}
+
+    def _file_open(self, params, data):
+        if 'fileid' in params:
+            fileId = params['fileid']
+            if fileId not in self.files:
+                return {'result': 2009, 'error': "File not found."}
+        else:
+            fileId = max(list(self.files.keys()) + [0]) + 1
+            self.files[fileId] = bytearray()
+        if (params['flags'] & 0x0200):
+            self.files[fileId] = bytearray()
+        fd = self.__nextFd
+        self.__nextFd += 1
+        self.__fds[fd] = [fileId, 0]
+        return {'fd': fd, 'fileid': fileId}
+
+    def _file_close(self, params, data):
+        del self.__fds[params['fd']]
+        return {}
+
+    def _file_size(self, params, data):
+        fileId, offset = self.__fds[params['fd']]
+        return {'size': len(self.files[fileId]), 'offset': offset}
+
+    def _file_seek(self, params, data):
+        fileId, offset = self.__fds[params['fd']]
+        base = [0, offset, len(self.files[fileId])][params['whence']]
+        self.__fds[params['fd']][1] = base + params['offset']
+        return {'offset': base + params['offset']}
+
+    def _file_truncate(self, params, data):
+        fileId, offset = self.__fds[params['fd']]
+        del self.files[fileId][params['length']:]
+        self.files[fileId] += bytes(params['length'] - len(self.files[fileId]))
+        return {}
+
+    def _file_pread(self, params, data):
+        fileId, _ = self.__fds[params['fd']]
+        return self.files[fileId][params['offset']:params['offset'] + params['count']]
+
+    def _file_read(self, params, data):
+        fileId, offset = self.__fds[params['fd']]
+        self.__fds[params['fd']][1] += min(params['count'], max(0, len(self.files[fileId]) - offset))
+        return self.files[fileId][offset:offset + params['count']]
+
+    def __write(self, fileId, offset, data):
+        content = self.files[fileId]
+        if (offset > len(content)):
+            content += bytes(offset - len(content))
+        content[offset:offset + len(data)] = data
+        return {'bytes': len(data)}
+
+    def _file_pwrite(self, params, data):
+        fileId, _ = self.__fds[params['fd']]
+        return self.__write(fileId, params['offset'], data)
+
+    def _file_write(self, params, data):
+        fileId, offset = self.__fds[params['fd']]
+        self.__fds[params['fd']][1] += len(data)
+        return self.__write(fileId, offset, data)
+
+    def _stat(self, params, data):
+        if params['fileid'] not in self.files:
+            return {'result': 2009, 'error': "File not found."}
+        content = bytes(self.files[params['fileid']])
+        return {'metadata': {
+            'fileid': params['fileid'],
+            'size': len(content),
+            'hash': int.from_bytes(sha1(content).digest()[:8], 'little'),
+            'modified': 'Sat, 01 Jan 2022 00:00:00 +0000',
+        }}
+
+    def _checksumfile(self, params, data):
+        content = bytes(self.files[params['fileid']])
+        return {
+            'sha1': sha1(content).hexdigest(),
+            'md5': md5(content).hexdigest(),
+            'metadata': {'fileid': params['fileid'], 'size': len(content)},
+        }
@@ -0,0 +1,115 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import itertools
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+
+from pcloud import PCloud
+from pcloud.src.file import PCloudFile, PCloudTransferEvent
+
+class TestAdaptiveBlockSize(TestCase):
+    data = bytes(range(0, 200))
+
+    def setUp(self):
+        self.__blockSizes = (PCloudFile.blockSize, PCloudFile.minBlockSize, PCloudFile.maxBlockSize)
+        PCloudFile.blockSize = 8
+        PCloudFile.minBlockSize = 4
+        PCloudFile.maxBlockSize = 32
+        self.__dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.__dir.name, 'test.txt')
+
+    def tearDown(self):
+        PCloudFile.blockSize, PCloudFile.minBlockSize, PCloudFile.maxBlockSize = self.__blockSizes
+        self.__dir.cleanup()
+
+    def __transfer(self, server, upload, duration, adaptive=True):
+        progress = []
+        clock = itertools.count(0, duration)
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, \
+             unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session, \
+             unittest.mock.patch('pcloud.src.file.time.perf_counter') as mock_perf_counter:
+            server.setup(mock_session, mock_request)
+            mock_perf_counter.side_effect = lambda: next(clock)
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                if upload:
+                    transfer = pCloud.upload(self.path, 1, adaptive=adaptive)
+                else:
+                    transfer = pCloud.download(self.path, 1, adaptive=adaptive)
+                for p in transfer:
+                    self.assertIs(type(p), PCloudTransferEvent)
+                    progress.append((int(p), p.blockSize))
+        return progress
+
+    def __blocks(self, server, endPoint):
+        return [c[1]['count'] if endPoint == 'file_pread' else len(c[2]) for c in server.calls if c[0] == endPoint]
+
+    def testUploadGrow(self):
+        with open(self.path, 'wb') as srcFile:
+            srcFile.write(self.data)
+        server = PCloudFakeServer({1: b''})
+        progress = self.__transfer(server, True, 0.001)
+
+        self.assertEqual(server.files, {1: bytearray(self.data)})
+        self.assertEqual(self.__blocks(server, 'file_pwrite'), [8, 16, 32, 32, 32, 32, 32, 16])
+        self.assertEqual(progress[:4], [(0, 8), (8, 16), (24, 32), (56, 32)])
+        self.assertEqual(progress[-1], (200, 32))
+
+    def testUploadShrink(self):
+        with open(self.path, 'wb') as srcFile:
+            srcFile.write(self.data[:40])
+        server = PCloudFakeServer({1: b''})
+        progress = self.__transfer(server, True, 100)
+
+        self.assertEqual(server.files, {1: bytearray(self.data[:40])})
+        self.assertEqual(self.__blocks(server, 'file_pwrite'), [8] + [4]*8)
+        self.assertEqual(progress[-1], (40, 4))
+
+    def testUploadFixed(self):
+        with open(self.path, 'wb') as srcFile:
+            srcFile.write(self.data[:40])
+        server = PCloudFakeServer({1: b''})
+        progress = self.__transfer(server, True, 0.001, adaptive=False)
+
+        self.assertEqual(self.__blocks(server, 'file_pwrite'), [8]*5)
+        self.assertEqual(progress, [(o, 8) for o in range(0, 41, 8)])
+
+    def testDownloadGrow(self):
+        server = PCloudFakeServer({1: self.data})
+        progress = self.__transfer(server, False, 0.001)
+
+        with open(self.path, 'rb') as destFile:
+            self.assertEqual(destFile.read(), self.data)
+        self.assertEqual(self.__blocks(server, 'file_pread'), [8, 16, 32, 32, 32, 32, 32, 32, 32])
+        self.assertEqual(progress[-1], (200, 32))
+
+    def testDownloadShrink(self):
+        server = PCloudFakeServer({1: self.data[:40]})
+        progress = self.__transfer(server, False, 100)
+
+        with open(self.path, 'rb') as destFile:
+            self.assertEqual(destFile.read(), self.data[:40])
+        self.assertEqual(self.__blocks(server, 'file_pread'), [8] + [4]*9)
+        self.assertEqual(progress[-1], (40, 4))
@@ -0,0 +1,198 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import asyncio
+import os
+import requests
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock
+
+from .testcase_auth import AuthTestCase
+from .testcase_file import FileTestCase
+from .fakeserver import PCloudFakeServer
+from .objects import *
+
+from pcloud import AsyncPCloud, PCloud
+from pcloud.src.info import PCloudFolderInfo
+from pcloud.src.error import PCloudError
+
+class TestAsyncPCloud(AuthTestCase):
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    def testListFolder(self, mock_request):
+        root = PCloudTestRootFolder([PCloudTestFile('test'), PCloudTestFolder('Test')])
+        self.setupMockNormal(mock_request, {'result' : 0, 'metadata': dict(root(depth=1, base=0))})
+
+        async def run():
+            async with AsyncPCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                return await pCloud.listFolder(0)
+        r = asyncio.run(run())
+
+        self.checkMock('GET', 'https://pcloud.localhost/listfolder', params={'folderid': 0})
+        self.assertIs(type(r), PCloudFolderInfo)
+        root.check(self, r)
+
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    def testError(self, mock_request):
+        self.setupMockError(mock_request, 2009, "File not found.")
+
+        async def run():
+            async with AsyncPCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                with self.assertRaises(PCloudError) as e:
+                    await pCloud.statFile(1)
+                self.assertEqual(e.exception.code, 2009)
+        asyncio.run(run())
+
+        self.checkMock('GET', 'https://pcloud.localhost/stat', params={'fileid': 1})
+
+    def testConcurrentLogin(self):
+        class PCloudSlowLoginServer(PCloudFakeServer):
+            def request(self, method, url, params=None, data=None, files=None, stream=False):
+                if 'username' in (params or {}):
+                    time.sleep(0.05)
+                return super().request(method, url, params=params, data=data, files=files, stream=stream)
+
+        async def run():
+            async with AsyncPCloud('https://pcloud.localhost/', workers=8) as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                return await asyncio.gather(*[pCloud.checksumFile(1, PCloud.HashAlgorithm.SHA1) for _ in range(0, 8)])
+
+        server = PCloudSlowLoginServer({1: b'Hello world!'})
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            r = asyncio.run(run())
+
+        self.assertEqual(len(set(r)), 1)
+        self.assertEqual(server.endPoints().count('getdigest'), 1)
+        self.assertEqual(len([c for c in server.calls if 'username' in c[1]]), 1)
+
+    def testOpen(self):
+        async def run():
+            async with AsyncPCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                async with await pCloud.open(1, 'w', encoding='utf-8') as f:
+                    await f.write('Hello\nworld!\n')
+                async with await pCloud.open(1, 'r', encoding='utf-8') as f:
+                    lines = [line async for line in f]
+                    await f.seek(0)
+                    return lines, await f.read(), await f.tell()
+
+        server = PCloudFakeServer({1: b''})
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            r = asyncio.run(run())
+
+        self.assertEqual(r, (['Hello\n', 'world!\n'], 'Hello\nworld!\n', 13))
+        self.assertEqual(server.files[1], bytearray(b'Hello\nworld!\n'))
+
+    def testLeaveGenerator(self):
+        class PCloudClosingServer(PCloudFakeServer):
+            def _file_close(self, params, data):
+                closed.append(threading.current_thread())
+                return super()._file_close(params, data)
+
+        async def run():
+            async with AsyncPCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                gen = pCloud.upload(srcPath, 1)
+                async for p in gen:
+                    break
+                await gen.aclose()
+                return list(closed)
+
+        closed = []
+        server = PCloudClosingServer({1: b''})
+        with tempfile.TemporaryDirectory() as tmpDir:
+            srcPath = os.path.join(tmpDir, 'test.txt')
+            with open(srcPath, 'wb') as srcFile:
+                srcFile.write(b'Hello world!')
+            with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+                server.setup(mock_session, mock_request)
+                r = asyncio.run(run())
+
+        # The file is closed by a worker thread as soon as the generator is closed
+        self.assertEqual(len(r), 1)
+        self.assertIsNot(r[0], threading.main_thread())
+
+    def testMaxConnections(self):
+        class PCloudCountingServer(PCloudFakeServer):
+            def request(self, method, url, params=None, data=None, files=None, stream=False):
+                if url.endswith('/checksumfile'):
+                    with lock:
+                        running[0] += 1
+                        running[1] = max(running)
+                    time.sleep(0.02)
+                    with lock:
+                        running[0] -= 1
+                return super().request(method, url, params=params, data=data, files=files, stream=stream)
+
+        async def run():
+            async with AsyncPCloud('https://pcloud.localhost/', maxConnections=2) as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                return await asyncio.gather(*[pCloud.checksumFile(1) for _ in range(0, 6)])
+
+        lock = threading.Lock()
+        running = [0, 0]
+        server = PCloudCountingServer({1: b'Hello world!'})
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            asyncio.run(run())
+
+        self.assertEqual(running[1], 2)
+
+
+class TestAsyncPCloudFile(FileTestCase):
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testReadWrite(self, mock_session, mock_request):
+        self.setupMock(mock_session, mock_request, 18, [b'Hello world!', {'result': 0, 'bytes': 6}, {'result': 0, 'size': 18, 'offset': 12}])
+
+        async def run():
+            async with AsyncPCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                async with await pCloud.openFile(1) as pCloudFile:
+                    data = await pCloudFile.read(12)
+                    written = await pCloudFile.write(b'Hello!')
+                    size = await pCloudFile.size
+            return data, written, size
+        data, written, size = asyncio.run(run())
+
+        self.checkMock('GET', 'https://pcloud.localhost/file_read', params={'fd': 18, 'count': 12})
+        self.checkMock('PUT', 'https://pcloud.localhost/file_write', params={'fd': 18}, data=b'Hello!')
+        self.checkMock('GET', 'https://pcloud.localhost/file_size', params={'fd': 18})
+        self.checkMock('GET', 'https://pcloud.localhost/file_close', params={'fd': 18})
+        self.assertEqual(data, b'Hello world!')
+        self.assertEqual(written, 6)
+        self.assertEqual(size, 18)
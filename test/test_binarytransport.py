@@ -0,0 +1,179 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import unittest
+
+from .testcase import TestCase
+from .binaryserver import PCloudBinaryServer
+
+from pcloud import PCloud
+from pcloud.src.error import PCloudError
+from pcloud.src.info import PCloudFileInfo, PCloudFolderInfo
+from pcloud.src.transport import PCloudTransport, PCloudBinaryTransport, PCloudBinarySession
+
+class TestBinaryTransport(TestCase):
+    digest = {
+        'result':  0,
+        'expires': 'Sun, 2 Feb 2020 20:20:20 +0000',
+        'digest':  'pCloudpCloudpCloudDigestDigestDigestDigestDigestDigestDigest'
+    }
+
+    def testIncompleteTransport(self):
+        class PCloudIncompleteTransport(PCloudTransport):
+            def session(self):
+                return None
+
+        with self.assertRaises(TypeError):
+            PCloudIncompleteTransport()
+
+    def testEncodeRequest(self):
+        req = PCloudBinarySession.encodeRequest('file_pread', {'fd': 1, 'count': 2, 'auth': 'a', 'recursive': True})
+        self.assertEqual(req[:2], (len(req) - 2).to_bytes(2, 'little'))
+        self.assertEqual(PCloudBinaryServer.decodeRequest(req[2:]), ('file_pread', {'fd': 1, 'count': 2, 'auth': 'a', 'recursive': True}, None))
+
+    def testEncodeRequestData(self):
+        req = PCloudBinarySession.encodeRequest('file_write', {'fd': 1}, 12)
+        self.assertEqual(PCloudBinaryServer.decodeRequest(req[2:]), ('file_write', {'fd': 1}, 12))
+
+    def testEncodeRequestNegative(self):
+        req = PCloudBinarySession.encodeRequest('file_seek', {'offset': -5})
+        self.assertEqual(PCloudBinaryServer.decodeRequest(req[2:]), ('file_seek', {'offset': '-5'}, None))
+
+    def testDecodeResponse(self):
+        value = {
+            'result': 0,
+            'long'  : 'x'*300,
+            'number': 1234567890123456789,
+            'list'  : ['long', 'long', False, 3],
+            'nested': {'result': 19},
+        }
+        res = PCloudBinaryServer.encodeResponse(value)
+        self.assertEqual(PCloudBinarySession.decodeResponse(res[4:]), (value, len(res) - 4))
+
+    def testNoAuth(self):
+        with PCloudBinaryServer([{'result': 0, 'ip': '127.0.0.1', 'country': 'fr'}]) as server:
+            with PCloud(server.url, transport=PCloudBinaryTransport()) as pCloud:
+                ip = pCloud.getIp()
+
+        self.assertEqual(ip, '127.0.0.1')
+        self.assertEqual(server.requests, [(0, 'getip', {}, None)])
+
+    def testAuth(self):
+        with PCloudBinaryServer([
+            self.digest,
+            {'result': 0, 'email': 'test@example.com', 'auth': 'AuthAuthAuthAuthAuthAuthAuthAuthAuthAuth'},
+            {'result': 0, 'auth_deleted': True},
+        ]) as server:
+            with PCloud(server.url, transport=PCloudBinaryTransport()) as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                info = pCloud.userInfo()
+                self.assertTrue(pCloud.authenticated)
+
+        self.assertEqual(info['email'], 'test@example.com')
+        self.assertNotIn('auth', info)
+        self.assertEqual(server.connections, 1)
+        self.assertEqual([r[1] for r in server.requests], ['getdigest', 'userinfo', 'logout'])
+        self.assertEqual(server.requests[1][2]['username'], 'username')
+        self.assertEqual(server.requests[1][2]['passworddigest'], 'e9d9e70ff0e5e360841217316d1161767819dd96')
+        self.assertEqual(server.requests[1][2]['getauth'], 1)
+        self.assertEqual(server.requests[2][2], {'auth': 'AuthAuthAuthAuthAuthAuthAuthAuthAuthAuth'})
+
+    def testError(self):
+        with PCloudBinaryServer([
+            self.digest,
+            {'result': 2005, 'error': "Directory does not exist.", 'auth': 'AuthAuthAuthAuthAuthAuthAuthAuthAuthAuth'},
+            {'result': 0, 'auth_deleted': True},
+        ]) as server:
+            with PCloud(server.url, transport=PCloudBinaryTransport()) as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                with self.assertRaises(PCloudError) as e:
+                    pCloud.listFolder(1)
+                self.assertEqual(e.exception.code, 2005)
+
+        self.assertEqual(server.requests[1][1], 'listfolder')
+        for k, v in {'folderid': 1, 'recursive': False, 'showdeleted': False, 'nofiles': False, 'noshares': False}.items():
+            self.assertEqual(server.requests[1][2][k], v)
+
+    def testListFolderStream(self):
+        with PCloudBinaryServer([
+            self.digest,
+            {'result': 0, 'auth': 'AuthAuthAuthAuthAuthAuthAuthAuthAuthAuth', 'metadata': {'folderid': 0, 'name': '/', 'contents': [
+                {'folderid': 1, 'name': 'Test', 'contents': [{'fileid': 2, 'name': 'test', 'size': 12}]},
+                {'fileid': 3, 'name': 'test', 'size': 4},
+            ]}},
+            {'result': 0, 'auth_deleted': True},
+        ]) as server:
+            with PCloud(server.url, transport=PCloudBinaryTransport()) as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                root = pCloud.listFolder(0, recursive=True, stream=True)
+
+        self.assertIs(type(root), PCloudFolderInfo)
+        self.assertEqual([(o.id, o.name) for o in root], [(1, 'Test'), (3, 'test')])
+        self.assertIs(type(root[0]), PCloudFolderInfo)
+        self.assertIs(type(root[0][0]), PCloudFileInfo)
+        self.assertEqual((root[0][0].id, root[0][0].size), (2, 12))
+
+    def testReadWriteFile(self):
+        with PCloudBinaryServer([
+            self.digest,
+            {'result': 0, 'fd': 1, 'fileid': 18, 'auth': 'AuthAuthAuthAuthAuthAuthAuthAuthAuthAuth'},
+            ({'result': 0}, b'Hello world!'),
+            {'result': 0, 'bytes': 6},
+            {'result': 5004, 'error': "Read error, try reopening the file."},
+            {'result': 0},
+            {'result': 0, 'auth_deleted': True},
+        ]) as server:
+            with PCloud(server.url, transport=PCloudBinaryTransport()) as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                with pCloud.openFile(18) as pCloudFile:
+                    data = pCloudFile.read(12, 0)
+                    written = pCloudFile.write(b'Hello!', 12)
+                    with self.assertRaises(PCloudError) as e:
+                        pCloudFile.read(12)
+                    self.assertEqual(e.exception.code, 5004)
+
+        self.assertEqual(data, b'Hello world!')
+        self.assertEqual(written, 6)
+        self.assertEqual(server.connections, 2)
+        self.assertEqual([r[0:2] for r in server.requests], [(0, 'getdigest'), (0, 'file_open'), (0, 'file_pread'), (0, 'file_pwrite'), (0, 'file_read'), (0, 'file_close'), (1, 'logout')])
+        self.assertEqual(server.requests[3][2:], ({'fd': 1, 'offset': 12, 'auth': 'AuthAuthAuthAuthAuthAuthAuthAuthAuthAuth'}, b'Hello!'))
+
+    def testWriteBuffer(self):
+        with PCloudBinaryServer([
+            self.digest,
+            {'result': 0, 'fd': 1, 'fileid': 18, 'auth': 'AuthAuthAuthAuthAuthAuthAuthAuthAuthAuth'},
+            {'result': 0, 'bytes': 6},
+            {'result': 0},
+            {'result': 0, 'auth_deleted': True},
+        ]) as server:
+            with PCloud(server.url, transport=PCloudBinaryTransport()) as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                with pCloud.openFile(18) as pCloudFile:
+                    written = pCloudFile.write(memoryview(bytearray(b'Hello world!'))[6:], 12)
+
+        self.assertEqual(written, 6)
+        self.assertEqual(server.requests[2][1:], ('file_pwrite', {'fd': 1, 'offset': 12, 'auth': 'AuthAuthAuthAuthAuthAuthAuthAuthAuthAuth'}, b'world!'))
@@ -0,0 +1,222 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import unittest
+import unittest.mock
+
+from hashlib import sha1, md5
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+
+from pcloud import PCloud
+from pcloud.src.cache import PCloudCache
+from pcloud.src.error import PCloudError
+from pcloud.src.info import PCloudFileInfo
+
+class PCloudFolderServer(PCloudFakeServer):
+    def __fileId(self, params):
+        if 'path' in params:
+            return int(params['path'].split('/')[-1][len('test'):-len('.txt')])
+        return params['fileid']
+
+    def __metadata(self, fileId):
+        return {'fileid': fileId, 'name': f'test{fileId}.txt', 'size': len(self.files[fileId])}
+
+    def _stat(self, params, data):
+        fileId = self.__fileId(params)
+        if fileId not in self.files:
+            return {'result': 2009, 'error': "File not found."}
+        return {'metadata': self.__metadata(fileId)}
+
+    def _listfolder(self, params, data):
+        return {'metadata': {'folderid': 0, 'name': '/', 'contents': [self.__metadata(f) for f in sorted(self.files)]}}
+
+    def _deletefile(self, params, data):
+        fileId = self.__fileId(params)
+        metadata = self.__metadata(fileId)
+        del self.files[fileId]
+        return {'metadata': metadata}
+
+    def _deletefolder(self, params, data):
+        self.files.clear()
+        return {'metadata': {'folderid': params['folderid'], 'name': 'Test'}}
+
+class TestCache(TestCase):
+    def setUp(self):
+        self.__time = 1000
+        self.__patch = unittest.mock.patch('pcloud.src.cache.time.monotonic', side_effect=lambda: self.__time)
+        self.__patch.start()
+
+    def tearDown(self):
+        self.__patch.stop()
+
+    def sleep(self, duration):
+        self.__time += duration
+
+    def testGetSet(self):
+        cache = PCloudCache()
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('a', 3)
+        self.assertEqual(cache.get('a'), 3)
+        self.assertEqual(cache.get('b'), 2)
+        self.assertEqual(len(cache), 2)
+
+    def testTtl(self):
+        cache = PCloudCache(ttl=10)
+        cache.set('a', 1)
+        self.sleep(5)
+        cache.set('b', 2)
+        self.sleep(5)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 2)
+        self.assertEqual(len(cache), 1)
+
+    def testLru(self):
+        cache = PCloudCache(maxSize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def testInvalidate(self):
+        cache = PCloudCache()
+        cache.set('a', 1, [('fileid', 1), 'path'])
+        cache.set('b', 2, [('fileid', 2)])
+        cache.set('c', 3)
+        cache.invalidate(('fileid', 1), ('fileid', 3))
+        self.assertEqual([cache.get(k) for k in 'abc'], [None, 2, 3])
+        cache.invalidate('path', ('fileid', 2))
+        self.assertEqual([cache.get(k) for k in 'abc'], [None, None, 3])
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def testInvalidSize(self):
+        with self.assertRaises(ValueError):
+            PCloudCache(maxSize=0)
+
+    def __run(self, server, fun, **kwArgs):
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/', **kwArgs) as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                return fun(pCloud)
+
+    def testDisabled(self):
+        server = PCloudFolderServer({1: b'Test'})
+        cache = self.__run(server, lambda pCloud: [pCloud.statFile(1), pCloud.statFile(1), pCloud.cache][-1])
+
+        self.assertIsNone(cache)
+        self.assertEqual(server.endPoints().count('stat'), 2)
+
+    def testStat(self):
+        def fun(pCloud):
+            r = [pCloud.statFile(1), pCloud.statFile(1), pCloud.statFile('/test1.txt'), pCloud.statFile(2)]
+            self.sleep(30)
+            r.append(pCloud.statFile(1))
+            return r
+
+        server = PCloudFolderServer({1: b'Test', 2: b''})
+        r = self.__run(server, fun, cacheSize=16, cacheTtl=30)
+
+        self.assertEqual([type(i) for i in r], [PCloudFileInfo]*5)
+        self.assertEqual([i.id for i in r], [1, 1, 1, 2, 1])
+        self.assertIsNot(r[0], r[1])
+        self.assertEqual([c[1].get('fileid', c[1].get('path')) for c in server.calls if c[0] == 'stat'], [1, '/test1.txt', 2, 1])
+
+    def testChecksum(self):
+        server = PCloudFolderServer({1: b'Test'})
+        r = self.__run(server, lambda pCloud: [pCloud.checksumFile(1), pCloud.checksumFile(1, PCloud.HashAlgorithm.MD5)], cacheSize=16)
+
+        self.assertEqual(r, [sha1(b'Test').hexdigest(), md5(b'Test').hexdigest()])
+        self.assertEqual(server.endPoints().count('checksumfile'), 1)
+
+    def testListFolderFlags(self):
+        def fun(pCloud):
+            return [len(pCloud.listFolder(0)), len(pCloud.listFolder(0)), len(pCloud.listFolder(0, recursive=True))]
+
+        server = PCloudFolderServer({1: b'Test', 2: b''})
+        self.assertEqual(self.__run(server, fun, cacheSize=16), [2, 2, 2])
+        self.assertEqual(server.endPoints().count('listfolder'), 2)
+
+    def testDeleteFile(self):
+        def fun(pCloud):
+            r = [len(pCloud.listFolder(0)), pCloud.statFile(2).size, pCloud.statFile('/test1.txt').size]
+            pCloud.deleteFile(1)
+            r += [len(pCloud.listFolder(0)), pCloud.statFile(2).size, pCloud.statFile(1)]
+            return r
+
+        server = PCloudFolderServer({1: b'Test', 2: b''})
+        with self.assertRaises(PCloudError):
+            self.__run(server, fun, cacheSize=16)
+        self.assertEqual([c[0] for c in server.calls if c[0] in ('stat', 'listfolder')], ['listfolder', 'stat', 'stat', 'listfolder', 'stat'])
+
+    def testDeleteFolder(self):
+        def fun(pCloud):
+            pCloud.statFile(2)
+            pCloud.deleteFolder(1)
+            return pCloud.statFile(2)
+
+        server = PCloudFolderServer({2: b''})
+        with self.assertRaises(PCloudError):
+            self.__run(server, fun, cacheSize=16)
+        self.assertEqual(server.endPoints().count('stat'), 2)
+
+    def testWrite(self):
+        def fun(pCloud):
+            r = [pCloud.statFile(1).size, pCloud.checksumFile(2)]
+            with pCloud.openFile(1) as pCloudFile:
+                pCloudFile.write(b'Hello world!', 0)
+            with pCloud.openFile(2) as pCloudFile:
+                pCloudFile.read(4, 0)
+            r += [pCloud.statFile(1).size, pCloud.checksumFile(2)]
+            with pCloud.openFile(2, PCloud.FileOpenFlags.O_TRUNC):
+                pass
+            r.append(pCloud.checksumFile(2))
+            return r
+
+        server = PCloudFolderServer({1: b'Test', 2: b'Test'})
+        r = self.__run(server, fun, cacheSize=16)
+
+        self.assertEqual(r[:4], [4, sha1(b'Test').hexdigest(), 12, sha1(b'Test').hexdigest()])
+        self.assertEqual(r[4], sha1(b'').hexdigest())
+        self.assertEqual(server.endPoints().count('stat'), 2)
+        self.assertEqual(server.endPoints().count('checksumfile'), 2)
+
+    def testWriteBlocks(self):
+        def fun(pCloud):
+            r = [pCloud.statFile(1).size]
+            with pCloud.openFile(1) as pCloudFile:
+                pCloudFile.write(b'Hello', 0)
+                r.append(pCloud.statFile(1).size)
+                with unittest.mock.patch.object(pCloud.cache, 'invalidate', wraps=pCloud.cache.invalidate) as mock_invalidate:
+                    for b in range(1, 100):
+                        pCloudFile.write(b'!', 4 + b)
+                    r += [pCloud.statFile(1).size, mock_invalidate.call_count]
+            r.append(pCloud.statFile(1).size)
+            return r
+
+        server = PCloudFolderServer({1: b'Test'})
+        self.assertEqual(self.__run(server, fun, cacheSize=16), [4, 5, 5, 0, 104])
+        self.assertEqual(server.endPoints().count('stat'), 3)
@@ -27,18 +27,22 @@ from pcloud.src.error import PCloudError
 from PythonUtils import testdata
 
 class TestDownload(FileTestCase):
+    @unittest.mock.patch('pcloud.src.progress.open')
     @unittest.mock.patch('pcloud.src.main.os.remove')
     @unittest.mock.patch('pcloud.src.main.os.path.isfile')
     @unittest.mock.patch('pcloud.src.main.open')
     @unittest.mock.patch('pcloud.src.main.requests.request')
     @unittest.mock.patch('pcloud.src.main.requests.Session')
-    def __testNormal(self, fileIdOrPath, data, prog, mock_session, mock_request, mock_open, mock_isfile, mock_remove):
+    def __testNormal(self, fileIdOrPath, data, prog, mock_session, mock_request, mock_open, mock_isfile, mock_remove, mock_progopen):
         # Setup mocks
         maxProgress = (prog or 0) + sum([len(d) for d in data])
         self.setupMock(mock_session, mock_request, 18, data + [b''])
 
         dataFile = unittest.mock.MagicMock()
         dataFile.__enter__.return_value = dataFile
+        # The data is written from a reused buffer:
+        written = []
+        dataFile.write.side_effect = lambda d: written.append(bytes(d))
 
         progFile = unittest.mock.MagicMock()
         progFile.__enter__.return_value = progFile
@@ -46,10 +50,8 @@ class TestDownload(FileTestCase):
             progFile.read.side_effect = str(prog)
 
         unittest.mock.mock_open(mock_open)
-        if prog is None:
-            mock_open.side_effect = [dataFile] + [progFile]*(len(data) + 1)
-        else:
-            mock_open.side_effect = [progFile, dataFile] + [progFile]*(len(data) + 1)
+        mock_open.side_effect = [dataFile]
+        mock_progopen.side_effect = [progFile]*(1 + int(prog is not None))
 
         mock_isfile.return_value = prog is not None
 
@@ -71,31 +73,36 @@ class TestDownload(FileTestCase):
             expectedProgress += len(d)
 
         if prog is not None:
-            self.checkCall(mock_open, 0, 'test.txt.prog', 'rt')
+            self.checkCall(mock_progopen, 0, 'test.txt.prog', 'rt')
             self.assertEqual([c[0] for c in progFile.read.call_args_list], [()])
 
-        self.checkCall(mock_open, int(prog is not None), 'test.txt', 'xb' if prog is None else 'ab')
-        self.assertEqual([c[0] for c in dataFile.write.call_args_list], [(d,) for d in data])
+        self.checkCall(mock_open, 0, 'test.txt', 'xb' if prog is None else 'r+b')
+        if prog is not None:
+            self.checkCall(dataFile.truncate, 0, prog)
+        self.assertEqual(written, data)
 
-        for d in range(1, len(data) + 2):
-            self.checkCall(mock_open, int(prog is not None) + d, 'test.txt.prog', 'wt')
-        self.assertEqual([c[0] for c in progFile.write.call_args_list], [(str(min(maxProgress, (prog or 0) + c*PCloudFile.blockSize)),) for c in range(0, len(data) + 1)])
+        self.checkCall(mock_progopen, int(prog is not None), 'test.txt.prog', 'wt')
+        self.assertEqual([c[0] for c in progFile.write.call_args_list], [('#pcloud-progress fileid=1\n' + (f'+0 {prog}\n' if prog else ''),)])
 
         self.assertEqual(len(mock_remove.call_args_list), 1)
         self.checkCall(mock_remove, 0, 'test.txt.prog')
 
+    @unittest.mock.patch('pcloud.src.progress.open')
     @unittest.mock.patch('pcloud.src.main.os.remove')
     @unittest.mock.patch('pcloud.src.main.os.path.isfile')
     @unittest.mock.patch('pcloud.src.main.open')
     @unittest.mock.patch('pcloud.src.main.requests.request')
     @unittest.mock.patch('pcloud.src.main.requests.Session')
-    def __testError(self, fileIdOrPath, data, error, prog, mock_session, mock_request, mock_open, mock_isfile, mock_remove):
+    def __testError(self, fileIdOrPath, data, error, prog, mock_session, mock_request, mock_open, mock_isfile, mock_remove, mock_progopen):
         # Setup mocks
         maxProgress = (prog or 0) + sum([len(d) for d in data])
         self.setupMock(mock_session, mock_request, 18, data + [error])
 
         dataFile = unittest.mock.MagicMock()
         dataFile.__enter__.return_value = dataFile
+        # The data is written from a reused buffer:
+        written = []
+        dataFile.write.side_effect = lambda d: written.append(bytes(d))
 
         progFile = unittest.mock.MagicMock()
         progFile.__enter__.return_value = progFile
@@ -103,10 +110,8 @@ class TestDownload(FileTestCase):
             progFile.read.side_effect = str(prog)
 
         unittest.mock.mock_open(mock_open)
-        if prog is None:
-            mock_open.side_effect = [dataFile] + [progFile]*(len(data) + 1)
-        else:
-            mock_open.side_effect = [progFile, dataFile] + [progFile]*(len(data) + 1)
+        mock_open.side_effect = [dataFile]
+        mock_progopen.side_effect = [progFile]*(1 + int(prog is not None))
 
         mock_isfile.return_value = prog is not None
 
@@ -133,15 +138,16 @@ class TestDownload(FileTestCase):
             expectedProgress += len(d)
 
         if prog is not None:
-            self.checkCall(mock_open, 0, 'test.txt.prog', 'rt')
+            self.checkCall(mock_progopen, 0, 'test.txt.prog', 'rt')
             self.assertEqual([c[0] for c in progFile.read.call_args_list], [()])
 
-        self.checkCall(mock_open, int(prog is not None), 'test.txt', 'xb' if prog is None else 'ab')
-        self.assertEqual([c[0] for c in dataFile.write.call_args_list], [(d,) for d in data])
+        self.checkCall(mock_open, 0, 'test.txt', 'xb' if prog is None else 'r+b')
+        if prog is not None:
+            self.checkCall(dataFile.truncate, 0, prog)
+        self.assertEqual(written, data)
 
-        for d in range(1, len(data) + 2):
-            self.checkCall(mock_open, int(prog is not None) + d, 'test.txt.prog', 'wt')
-        self.assertEqual([c[0] for c in progFile.write.call_args_list], [(str(min(maxProgress, (prog or 0) + c*PCloudFile.blockSize)),) for c in range(0, len(data) + 1)])
+        self.checkCall(mock_progopen, int(prog is not None), 'test.txt.prog', 'wt')
+        self.assertEqual([c[0] for c in progFile.write.call_args_list], [('#pcloud-progress fileid=1\n' + (f'+0 {prog}\n' if prog else ''),)] + ([(f'+{prog or 0} {maxProgress}\n',)] if data else []))
 
         self.assertEqual(len(mock_remove.call_args_list), 0)
 
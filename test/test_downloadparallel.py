@@ -0,0 +1,161 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+
+from pcloud import PCloud
+from pcloud.src.file import PCloudFile
+from pcloud.src.error import PCloudError
+
+class TestDownloadParallel(TestCase):
+    data = bytes(range(0, 100))
+
+    def setUp(self):
+        self.__blockSize = PCloudFile.blockSize
+        PCloudFile.blockSize = 8
+        self.__dir = tempfile.TemporaryDirectory()
+        self.destPath = os.path.join(self.__dir.name, 'test.txt')
+
+    def tearDown(self):
+        PCloudFile.blockSize = self.__blockSize
+        self.__dir.cleanup()
+
+    def __download(self, server, workers):
+        progress = []
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                for p in pCloud.download(self.destPath, 1, workers=workers):
+                    progress.append(p)
+        return progress
+
+    def testNormal(self):
+        server = PCloudFakeServer({1: self.data})
+        progress = self.__download(server, 4)
+
+        with open(self.destPath, 'rb') as destFile:
+            self.assertEqual(destFile.read(), self.data)
+        self.assertFalse(os.path.exists(self.destPath + '.prog'))
+        self.assertEqual(progress[0], 0)
+        self.assertEqual(progress[-1], len(self.data))
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual(server.endPoints().count('file_open'), 4)
+        self.assertEqual(server.endPoints().count('file_close'), 4)
+        self.assertEqual(sorted([c[1]['offset'] for c in server.calls if c[0] == 'file_pread']), list(range(0, 100, 8)))
+
+    def testFewBlocks(self):
+        server = PCloudFakeServer({1: self.data[:12]})
+        self.__download(server, 4)
+
+        with open(self.destPath, 'rb') as destFile:
+            self.assertEqual(destFile.read(), self.data[:12])
+        self.assertEqual(server.endPoints().count('file_open'), 2)
+
+    def testResume(self):
+        with open(self.destPath, 'wb') as destFile:
+            destFile.write(self.data[:16] + bytes(16) + self.data[32:40])
+        with open(self.destPath + '.prog', 'wt') as progFile:
+            progFile.write('0 16\n32 40\n')
+
+        server = PCloudFakeServer({1: self.data})
+        progress = self.__download(server, 3)
+
+        with open(self.destPath, 'rb') as destFile:
+            self.assertEqual(destFile.read(), self.data)
+        self.assertEqual(progress[0], 24)
+        self.assertEqual(progress[-1], len(self.data))
+        self.assertEqual(sorted([c[1]['offset'] for c in server.calls if c[0] == 'file_pread']), [16, 24] + list(range(40, 100, 8)))
+
+    def testResumeSequential(self):
+        with open(self.destPath, 'wb') as destFile:
+            destFile.write(self.data[:20])
+        with open(self.destPath + '.prog', 'wt') as progFile:
+            progFile.write('20')
+
+        server = PCloudFakeServer({1: self.data})
+        self.__download(server, 2)
+
+        with open(self.destPath, 'rb') as destFile:
+            self.assertEqual(destFile.read(), self.data)
+        self.assertEqual(sorted([c[1]['offset'] for c in server.calls if c[0] == 'file_pread']), list(range(20, 100, 8)))
+
+    def testError(self):
+        server = PCloudFakeServer({1: self.data})
+        server.failures['file_pread'] = [5004]
+
+        with self.assertRaises(PCloudError) as e:
+            self.__download(server, 2)
+        self.assertEqual(e.exception.code, 5004)
+
+        self.assertTrue(os.path.exists(self.destPath + '.prog'))
+        self.assertEqual(server.endPoints().count('file_close'), 2)
+
+    def testResumeChanged(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                metadata = PCloudFakeServer({1: self.data})._stat({'fileid': 1}, None)['metadata']
+                with open(self.destPath, 'wb') as destFile:
+                    destFile.write(self.data[:40])
+                with open(self.destPath + '.prog', 'wt') as progFile:
+                    progFile.write(f'#pcloud-progress fileid=1 size=100 mtime=1640995200000000000 hash={metadata["hash"]}\n+0 40\n')
+
+                # The remote file has been modified in place (with the same size)
+                changed = bytes(reversed(self.data))
+                server = PCloudFakeServer({1: changed})
+                self.__download(server, workers)
+
+                with open(self.destPath, 'rb') as destFile:
+                    self.assertEqual(destFile.read(), changed)
+                self.assertEqual(min([c[1]['offset'] for c in server.calls if c[0] == 'file_pread']), 0)
+                os.remove(self.destPath)
+
+    def testResumeUnchanged(self):
+        metadata = PCloudFakeServer({1: self.data})._stat({'fileid': 1}, None)['metadata']
+        with open(self.destPath, 'wb') as destFile:
+            destFile.write(self.data[:40])
+        with open(self.destPath + '.prog', 'wt') as progFile:
+            progFile.write(f'#pcloud-progress fileid=1 size=100 mtime=1640995200000000000 hash={metadata["hash"]}\n+0 40\n')
+
+        server = PCloudFakeServer({1: self.data})
+        self.__download(server, 1)
+
+        with open(self.destPath, 'rb') as destFile:
+            self.assertEqual(destFile.read(), self.data)
+        self.assertEqual(min([c[1]['offset'] for c in server.calls if c[0] == 'file_pread']), 40)
+
+    def testResumeMissingDestination(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                with open(self.destPath + '.prog', 'wt') as progFile:
+                    progFile.write('#pcloud-progress fileid=1\n+0 40\n')
+
+                server = PCloudFakeServer({1: self.data})
+                self.__download(server, workers)
+
+                with open(self.destPath, 'rb') as destFile:
+                    self.assertEqual(destFile.read(), self.data)
+                self.assertFalse(os.path.exists(self.destPath + '.prog'))
+                os.remove(self.destPath)
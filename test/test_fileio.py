@@ -0,0 +1,164 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import gzip
+import io
+import unittest
+import unittest.mock
+import zipfile
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+
+from pcloud import PCloud
+from pcloud.src.fileio import PCloudFileIO
+
+class TestFileIO(TestCase):
+    def __run(self, server, fun):
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                return fun(pCloud)
+
+    def testText(self):
+        server = PCloudFakeServer({1: 'Hello\nwörld!\n'.encode('utf-8')})
+        def fun(pCloud):
+            with pCloud.open(1, 'rt', encoding='utf-8') as f:
+                return f.readlines()
+
+        self.assertEqual(self.__run(server, fun), ['Hello\n', 'wörld!\n'])
+        self.assertIn('file_close', server.endPoints())
+
+    def testGzip(self):
+        data = b''.join([b'Line %d\n' % i for i in range(0, 1000)])
+        server = PCloudFakeServer({1: gzip.compress(data)})
+        def fun(pCloud):
+            with pCloud.open(1, 'rb') as f, gzip.GzipFile(fileobj=f) as g:
+                return g.read()
+
+        self.assertEqual(self.__run(server, fun), data)
+
+    def testZip(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as z:
+            z.writestr('a.txt', b'A'*1000)
+            z.writestr('b.txt', b'B'*1000)
+        server = PCloudFakeServer({1: archive.getvalue()})
+        def fun(pCloud):
+            with pCloud.open(1, 'rb') as f, zipfile.ZipFile(f) as z:
+                return z.namelist(), z.read('b.txt')
+
+        self.assertEqual(self.__run(server, fun), (['a.txt', 'b.txt'], b'B'*1000))
+
+    def testWrite(self):
+        server = PCloudFakeServer({1: b'Old contents'})
+        def fun(pCloud):
+            with pCloud.open(1, 'w', encoding='utf-8') as f:
+                f.write('Hello\n')
+                f.write('world!\n')
+
+        self.__run(server, fun)
+        self.assertEqual(server.files[1], b'Hello\nworld!\n')
+        self.assertEqual([c[1]['flags'] for c in server.calls if c[0] == 'file_open'], [int(PCloud.FileOpenFlags.O_CREAT | PCloud.FileOpenFlags.O_TRUNC | PCloud.FileOpenFlags.O_WRITE)])
+
+    def testAppend(self):
+        server = PCloudFakeServer({1: b'Hello'})
+        def fun(pCloud):
+            with pCloud.open(1, 'ab') as f:
+                f.write(b' world')
+                f.seek(0)
+                f.write(b'!')
+                f.flush()
+                return f.tell()
+
+        self.assertEqual(self.__run(server, fun), 12)
+        self.assertEqual(server.files[1], b'Hello world!')
+
+    def testRandom(self):
+        server = PCloudFakeServer({1: b'0123456789'})
+        def fun(pCloud):
+            with pCloud.open(1, 'r+b', buffering=0) as f:
+                self.assertIs(type(f), PCloudFileIO)
+                self.assertEqual(f.seek(-4, io.SEEK_END), 6)
+                self.assertEqual(f.read(2), b'67')
+                self.assertEqual(f.seek(-4, io.SEEK_CUR), 4)
+                f.write(b'ab')
+                buffer = bytearray(3)
+                self.assertEqual(f.readinto(buffer), 3)
+                self.assertEqual(f.truncate(), 9)
+                self.assertEqual(f.read(), b'')
+                return bytes(buffer), f.tell()
+
+        self.assertEqual(self.__run(server, fun), (b'678', 9))
+        self.assertEqual(server.files[1], b'0123ab678')
+
+    def testTell(self):
+        server = PCloudFakeServer({1: bytes(range(0, 100))})
+        def fun(pCloud):
+            with pCloud.open(1, 'rb', buffering=0) as f:
+                f.read(10)
+                f.seek(20, io.SEEK_CUR)
+                return f.tell()
+
+        self.assertEqual(self.__run(server, fun), 30)
+        self.assertNotIn('file_size', server.endPoints())
+        self.assertNotIn('file_seek', server.endPoints())
+
+    def testModes(self):
+        server = PCloudFakeServer({1: b''})
+        def fun(pCloud):
+            modes = {}
+            for mode in ['r', 'r+', 'w', 'w+', 'a', 'x']:
+                with pCloud.open(1, mode + 'b', buffering=0) as f:
+                    modes[mode] = (f.readable(), f.writable(), f.seekable())
+            return modes
+
+        self.assertEqual(self.__run(server, fun), {
+            'r':  (True,  False, True),
+            'r+': (True,  True,  True),
+            'w':  (False, True,  True),
+            'w+': (True,  True,  True),
+            'a':  (False, True,  True),
+            'x':  (False, True,  True),
+        })
+
+    def testUnsupported(self):
+        server = PCloudFakeServer({1: b''})
+        def fun(pCloud):
+            with pCloud.open(1, 'rb', buffering=0) as f:
+                with self.assertRaises(io.UnsupportedOperation):
+                    f.write(b'Hello')
+                with self.assertRaises(io.UnsupportedOperation):
+                    f.fileno()
+            self.assertTrue(f.closed)
+            with self.assertRaises(ValueError):
+                f.read()
+
+        self.__run(server, fun)
+
+    def testInvalidMode(self):
+        server = PCloudFakeServer({1: b''})
+        def fun(pCloud):
+            for mode in ['rw', 'rbt', 'q', 'r++', 't']:
+                with self.assertRaises(ValueError):
+                    pCloud.open(1, mode)
+
+        self.__run(server, fun)
+        self.assertNotIn('file_open', server.endPoints())
@@ -0,0 +1,76 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import unittest
+
+from .testcase import TestCase
+
+from pcloud.src.info import PCloudInfoMeta, PCloudInfo, PCloudFileInfo, PCloudFolderInfo
+
+class TestInfo(TestCase):
+    def setUp(self):
+        class Base(metaclass=PCloudInfoMeta):
+            def __init__(self, pc, metadata):
+                self.pc = pc
+                self.metadata = metadata
+        class A(Base):
+            classId = 'a'
+        class B(Base):
+            classId = 'b'
+        class AB(A):
+            classId = 'b'
+        class Other(A):
+            pass
+        self.classes = (Base, A, B, AB, Other)
+
+    def testDispatch(self):
+        Base, A, B, AB, Other = self.classes
+        for cls, metadata, expected in [
+            (Base, {}, Base),
+            (Base, {'a': 1}, A),
+            (Base, {'b': 1}, B),
+            (Base, {'a': 1, 'b': 1}, AB),
+            (A, {}, A),
+            (A, {'b': 1}, AB),
+            (B, {'a': 1}, B),
+            (AB, {}, AB),
+        ]:
+            r = cls(None, metadata)
+            self.assertIs(type(r), expected, f"{cls.__name__}({metadata})")
+            self.assertIs(r.metadata, metadata)
+
+    def testFromList(self):
+        Base, A, B, AB, Other = self.classes
+        metadata = [{'b': 1}, {}, {'a': 1}, {'a': 1, 'b': 1}]
+        r = Base.fromList('pc', metadata)
+
+        self.assertEqual([type(o) for o in r], [B, Base, A, AB])
+        self.assertEqual([o.metadata for o in r], metadata)
+        self.assertEqual([o.pc for o in r], ['pc'] * 4)
+        self.assertEqual(Base.fromList('pc', []), [])
+
+    def testPCloudInfo(self):
+        r = PCloudInfo.fromList(None, [{'fileid': 1, 'name': 'test'}, {'folderid': 2, 'name': 'Test', 'contents': [{'fileid': 3}]}])
+
+        self.assertIs(type(r[0]), PCloudFileInfo)
+        self.assertEqual(r[0].id, 1)
+        self.assertEqual(r[0].name, 'test')
+        self.assertIs(type(r[1]), PCloudFolderInfo)
+        self.assertEqual(r[1].id, 2)
+        self.assertIs(type(r[1][0]), PCloudFileInfo)
+        self.assertEqual(r[1][0].id, 3)
+        self.assertIs(type(PCloudInfo(None, {'folderid': 0})), PCloudFolderInfo)
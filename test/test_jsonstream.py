@@ -0,0 +1,114 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import json
+import unittest
+
+from .testcase import TestCase
+
+from pcloud.src.jsonstream import PCloudJsonDecoder
+
+class TestJsonStream(TestCase):
+    value = {
+        'result': 0,
+        'metadata': {
+            'folderid': 0,
+            'name': '/',
+            'contents': [
+                {'fileid': 1, 'name': 'café.txt', 'size': 1234567890123, 'hash': 18446744073709551615, 'ismine': True, 'thumb': False, 'icon': None},
+                {'folderid': 2, 'name': 'Test "1"\\', 'contents': [{'fileid': 3, 'name': '\U0001f600', 'ratio': -1.5e-3}]},
+                {'folderid': 4, 'name': 'Empty', 'contents': []},
+            ],
+        },
+        'empty': {},
+    }
+
+    def setUp(self):
+        self.__chunkSize = PCloudJsonDecoder.chunkSize
+
+    def tearDown(self):
+        PCloudJsonDecoder.chunkSize = self.__chunkSize
+
+    @staticmethod
+    def hook(value):
+        if 'fileid' in value:
+            return ('file', value['fileid'])
+        if 'folderid' in value:
+            return ('folder', value['folderid'], value.get('contents'))
+        return value
+
+    def __decode(self, text, size, hook=None):
+        decoder = PCloudJsonDecoder(hook)
+        for i in range(0, len(text), size):
+            decoder.feed(text[i:i + size])
+        return decoder.close()
+
+    def testChunks(self):
+        for ensureAscii in [False, True]:
+            for indent in [None, 2]:
+                text = json.dumps(self.value, ensure_ascii=ensureAscii, indent=indent).encode()
+                for size in [1, 3, 7, 64, len(text)]:
+                    with self.subTest(ensureAscii=ensureAscii, indent=indent, size=size):
+                        self.assertEqual(self.__decode(text, size), self.value)
+
+    def testHook(self):
+        text = json.dumps(self.value).encode()
+        expected = json.loads(text, object_hook=self.hook)
+        self.assertEqual(expected['metadata'][0], 'folder')
+        for chunkSize in [1, 16, 65536]:
+            PCloudJsonDecoder.chunkSize = chunkSize
+            for size in [1, 5, len(text)]:
+                with self.subTest(chunkSize=chunkSize, size=size):
+                    self.assertEqual(self.__decode(text, size, self.hook), expected)
+
+    def testHookOrder(self):
+        calls = []
+        def hook(value):
+            calls.append(value.get('fileid', value.get('folderid')))
+            return value
+        PCloudJsonDecoder.chunkSize = 1
+        self.__decode(json.dumps(self.value).encode(), 4, hook)
+        self.assertEqual(calls, [1, 3, 2, 4, 0, None, None])
+
+    def testIncremental(self):
+        calls = []
+        decoder = PCloudJsonDecoder(lambda v: calls.append(v.get('fileid')) or v)
+        decoder.chunkSize = 1
+        decoder.feed(b'{"result": 0, "contents": [{"fileid": 1}, {"fil')
+        self.assertEqual(calls, [1])
+        decoder.feed(b'eid": 2}, {"fileid": 3')
+        self.assertEqual(calls, [1, 2])
+        decoder.feed(b'}]}')
+        self.assertEqual(calls, [1, 2, 3, None])
+        self.assertEqual(decoder.close(), {'result': 0, 'contents': [{'fileid': 1}, {'fileid': 2}, {'fileid': 3}]})
+
+    def testScalars(self):
+        for value in [0, -12, 3.25, 1e+20, True, False, None, "", "a\\b\"c", [], {}, [[]], [{}]]:
+            text = json.dumps(value).encode()
+            with self.subTest(value=value):
+                self.assertEqual(self.__decode(text, 1), value)
+                self.assertEqual(self.__decode(b' ' + text + b' \n', 2), value)
+
+    def testApply(self):
+        value = json.loads(json.dumps(self.value))
+        self.assertEqual(PCloudJsonDecoder.apply(value, self.hook), json.loads(json.dumps(self.value), object_hook=self.hook))
+
+    def testErrors(self):
+        for text in [b'', b'{', b'[1, 2', b'{"a" 1}', b'{"a": 1,}', b'[1,]', b'[1 2]', b'{1: 2}', b'[1] 2', b'tru', b'nul', b'"abc', b'[-]', b'[1e]']:
+            with self.subTest(text=text):
+                with self.assertRaises(json.JSONDecodeError):
+                    self.__decode(text, 1)
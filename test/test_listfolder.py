@@ -28,7 +28,7 @@ from PythonUtils import testdata
 
 class TestListFolder(AuthTestCase):
     @unittest.mock.patch('pcloud.src.main.requests.request')
-    def __testNormal(self, root, base, mock_request, recursive=False, noFiles=False):
+    def __testNormal(self, root, base, mock_request, recursive=False, noFiles=False, stream=False):
         if recursive:
             self.setupMockNormal(mock_request, {'result' : 0, 'metadata': dict(root(base=base))})
         else:
@@ -38,12 +38,13 @@ class TestListFolder(AuthTestCase):
             pCloud.username = 'username'
             pCloud.password = 'password'
 
-            r = pCloud.listFolder(base, recursive=recursive, noFiles=noFiles)
+            r = pCloud.listFolder(base, recursive=recursive, noFiles=noFiles, stream=stream)
 
+        kwArgs = {'stream': True} if stream else {}
         if type(base) is int:
-            self.checkMock('GET', 'https://pcloud.localhost/listfolder', params={'folderid': base})
+            self.checkMock('GET', 'https://pcloud.localhost/listfolder', params={'folderid': base}, **kwArgs)
         elif type(base) is str:
-            self.checkMock('GET', 'https://pcloud.localhost/listfolder', params={'path': base})
+            self.checkMock('GET', 'https://pcloud.localhost/listfolder', params={'path': base}, **kwArgs)
         else: #pragma: no cover
             raise TypeError(f"Invalid base type: {type(base)}")
         root.check(self, r)
@@ -166,6 +167,44 @@ class TestListFolder(AuthTestCase):
             PCloudTestFolder('Test2', [PCloudTestFile('test21'), PCloudTestFile('test22')])
         ]), '/', noFiles=True)
 
+    def testIdTree2Stream(self):
+        self.__testNormal(PCloudTestRootFolder([
+            PCloudTestFolder('Test1', [PCloudTestFile('test11'), PCloudTestFile('test12')]),
+            PCloudTestFolder('Test2', [PCloudTestFile('test21'), PCloudTestFile('test22')])
+        ]), 0, stream=True)
+
+    def testIdTree2RecursiveStream(self):
+        self.__testNormal(PCloudTestRootFolder([
+            PCloudTestFolder('Test1', [PCloudTestFile('test11'), PCloudTestFile('test12')]),
+            PCloudTestFolder('Test2', [PCloudTestFile('test21'), PCloudTestFile('test22')], 2),
+            PCloudTestFolder('Test3', [])
+        ]), 0, recursive=True, stream=True)
+
+    def testPathTree2RecursiveStream(self):
+        self.__testNormal(PCloudTestRootFolder([
+            PCloudTestFolder('Test1', [PCloudTestFile('test11'), PCloudTestFile('test12')]),
+            PCloudTestFolder('Test2', [PCloudTestFile('test21'), PCloudTestFile('test22')])
+        ]), '/Test2', recursive=True, stream=True)
+
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    def testCompact(self, mock_request):
+        root = PCloudTestRootFolder([PCloudTestFolder('Test', [PCloudTestFile('test')])])
+        self.setupMockNormal(mock_request, {'result' : 0, 'metadata': dict(root(base=0))})
+
+        with PCloud('https://pcloud.localhost/') as pCloud:
+            pCloud.username = 'username'
+            pCloud.password = 'password'
+
+            r = pCloud.listFolder(0, recursive=True)
+
+        for info in [r, r[0], r[0][0]]:
+            self.assertFalse(hasattr(info, '__dict__'), f"{info} has a dictionary")
+            with self.assertRaises(AttributeError):
+                info.other = None
+        with self.assertRaises(AttributeError):
+            r[0].size
+        root.check(self, r)
+
     @testdata.TestData([
         {'result': 1000, 'error': "Log in required."                          },
         {'result': 2000, 'error': "Log in failed."                            },
@@ -209,6 +248,21 @@ class TestListFolder(AuthTestCase):
 
         self.checkMock('GET', 'https://pcloud.localhost/listfolder', params={'folderid': 0})
 
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    def testPCloudErrorStream(self, mock_request):
+        self.setupMockError(mock_request, 2005, "Directory does not exist.")
+
+        with PCloud('https://pcloud.localhost/') as pCloud:
+            pCloud.username = 'username'
+            pCloud.password = 'password'
+
+            with self.assertRaises(PCloudError) as e:
+                folder = pCloud.listFolder(0, recursive=True, stream=True)
+
+            self.assertEqual(e.exception.code, 2005)
+
+        self.checkMock('GET', 'https://pcloud.localhost/listfolder', params={'folderid': 0}, stream=True)
+
     @unittest.mock.patch('pcloud.src.main.requests.request')
     def testHttpError(self, mock_request):
         self.setupMockHttpError(mock_request)
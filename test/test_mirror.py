@@ -0,0 +1,147 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .test_sync import PCloudSyncServer
+
+from pcloud import PCloud
+from pcloud.src.error import PCloudError
+
+class TestMirror(TestCase):
+    def setUp(self):
+        self.__dir = tempfile.TemporaryDirectory()
+        self.root = self.__dir.name
+        self.server = PCloudSyncServer()
+        self.server.add(0, 'a.txt', b'Hello world!')
+        sub = self.server.add(0, 'sub')
+        self.server.add(sub, 'b.txt', b'Bonjour le monde !')
+        self.server.add(self.server.add(sub, 'deep'), 'c.txt', b'')
+
+    def tearDown(self):
+        self.__dir.cleanup()
+
+    def write(self, path, content):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+    def tree(self, path=None):
+        path = path or self.root
+        tree = []
+        for name in os.listdir(path):
+            p = os.path.join(path, name)
+            if os.path.isdir(p):
+                tree.append((name, self.tree(p)))
+            else:
+                with open(p, 'rb') as f:
+                    tree.append((name, f.read()))
+        return sorted(tree)
+
+    def __mirror(self, **kwArgs):
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            self.server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                del self.server.calls[:]
+                return pCloud.mirror(0, self.root, **kwArgs)
+
+    expected = [('a.txt', b'Hello world!'), ('sub', [('b.txt', b'Bonjour le monde !'), ('deep', [('c.txt', b'')])])]
+
+    def testCreate(self):
+        report = self.__mirror(workers=3)
+
+        self.assertEqual(self.tree(), self.expected)
+        self.assertEqual((report.createdFolders, report.downloadedFiles, report.skippedFiles), (2, 3, 0))
+        self.assertEqual(report.downloadedBytes, 30)
+        self.assertNotIn('checksumfile', self.server.endPoints())
+
+    def testUpToDate(self):
+        self.__mirror()
+        report = self.__mirror(workers=2, hashWorkers=0)
+
+        self.assertEqual(self.tree(), self.expected)
+        self.assertEqual((report.createdFolders, report.downloadedFiles, report.skippedFiles), (0, 0, 3))
+        self.assertEqual((report.downloadedBytes, report.skippedBytes), (0, 30))
+        self.assertEqual(self.server.endPoints().count('checksumfile'), 3)
+        self.assertNotIn('file_open', self.server.endPoints())
+
+    def testHashWorkers(self):
+        self.__mirror()
+        self.write('a.txt', b'Hello World!')
+        report = self.__mirror(workers=2, hashWorkers=1)
+
+        self.assertEqual(self.tree(), self.expected)
+        self.assertEqual((report.downloadedFiles, report.skippedFiles), (1, 2))
+
+    def testChanged(self):
+        self.__mirror()
+        self.write('a.txt', b'Hello World!')
+        self.write('sub/b.txt', b'Bonjour !')
+        report = self.__mirror(hashWorkers=0)
+
+        self.assertEqual(self.tree(), self.expected)
+        self.assertEqual((report.downloadedFiles, report.skippedFiles), (2, 1))
+        # The size of b.txt changed, so that its checksum is not needed
+        self.assertEqual(self.server.endPoints().count('checksumfile'), 2)
+
+    def testDelete(self):
+        self.write('e.txt', b'Old')
+        self.write('old/older/d.txt', b'Old')
+        report = self.__mirror(delete=True, workers=2)
+
+        self.assertEqual(self.tree(), self.expected)
+        self.assertEqual((report.deletedFolders, report.deletedFiles), (2, 2))
+
+    def testNoDelete(self):
+        self.write('e.txt', b'Old')
+        report = self.__mirror()
+
+        self.assertEqual(self.tree(), sorted(self.expected + [('e.txt', b'Old')]))
+        self.assertEqual((report.deletedFolders, report.deletedFiles), (0, 0))
+
+    def testConflict(self):
+        self.write('a.txt/d.txt', b'Old')
+        self.write('sub', b'Old')
+        report = self.__mirror()
+
+        self.assertEqual(report.conflicts, [os.path.join(self.root, 'a.txt'), os.path.join(self.root, 'sub')])
+        self.assertEqual(self.tree(), [('a.txt', [('d.txt', b'Old')]), ('sub', b'Old')])
+
+        report = self.__mirror(delete=True)
+
+        self.assertEqual(report.conflicts, [])
+        self.assertEqual(self.tree(), self.expected)
+
+    def testError(self):
+        self.write('a.txt', b'Hello World!')
+        self.server.failures['file_pread'] = [5003]
+
+        with self.assertRaises(PCloudError) as e:
+            self.__mirror(hashWorkers=0)
+        self.assertEqual(e.exception.code, 5003)
+
+        # The local file is left as is
+        self.assertEqual(self.tree()[0], ('a.txt', b'Hello World!'))
+        self.assertNotIn('a.txt.part', os.listdir(self.root))
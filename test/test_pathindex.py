@@ -0,0 +1,323 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import posixpath
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+
+from pcloud import PCloud
+from pcloud.src.index import PCloudPathIndex
+from pcloud.src.info import PCloudFolderInfo
+
+class PCloudTreeServer(PCloudFakeServer):
+    def __init__(self, paths):
+        super().__init__({i: b'' for i, p in paths.items() if not p.endswith('/')})
+        self.paths = {(('folderid' if p.endswith('/') else 'fileid'), i): posixpath.normpath(p) for i, p in paths.items()}
+
+    def __item(self, params, kind):
+        if 'path' in params:
+            return [i for i, p in self.paths.items() if p == posixpath.normpath(params['path'])][0]
+        return (kind, params[kind])
+
+    def __metadata(self, item, recursive=False, depth=0):
+        path = self.paths[item]
+        metadata = {item[0]: item[1], 'name': posixpath.basename(path) or '/'}
+        if (path != '/'):
+            metadata['parentfolderid'] = [i for i, p in self.paths.items() if p == posixpath.dirname(path)][0][1]
+        if (item[0] == 'folderid') and (recursive or (depth == 0)):
+            metadata['contents'] = [self.__metadata(i, recursive, depth + 1) for i, p in sorted(self.paths.items()) if (p != path) and (posixpath.dirname(p) == path)]
+        return metadata
+
+    def _listfolder(self, params, data):
+        item = self.__item(params, 'folderid')
+        metadata = self.__metadata(item, params['recursive'])
+        if 'path' in params:
+            metadata['path'] = self.paths[item]
+        return {'metadata': metadata}
+
+    def _stat(self, params, data):
+        return {'metadata': self.__metadata(self.__item(params, 'fileid'))}
+
+    def _file_open(self, params, data):
+        if ('path' in params) and (posixpath.normpath(params['path']) not in self.paths.values()):
+            r = super()._file_open({'flags': params['flags']}, data)
+            self.paths[('fileid', r['fileid'])] = posixpath.normpath(params['path'])
+            return r
+        return super()._file_open({'fileid': self.__item(params, 'fileid')[1], 'flags': params['flags']}, data)
+
+    def _renamefile(self, params, data):
+        item = self.__item(params, 'fileid')
+        if 'toname' in params:
+            self.paths[item] = posixpath.join(posixpath.dirname(self.paths[item]), params['toname'])
+        else:
+            self.paths[item] = posixpath.join(self.paths[('folderid', params['tofolderid'])], posixpath.basename(self.paths[item]))
+        return {'metadata': self.__metadata(item)}
+
+    def _renamefolder(self, params, data):
+        item = self.__item(params, 'folderid')
+        oldPath = self.paths[item]
+        newPath = posixpath.join(posixpath.dirname(oldPath), params['toname'])
+        self.paths = {i: (newPath + p[len(oldPath):] if (p == oldPath) or p.startswith(oldPath + '/') else p) for i, p in self.paths.items()}
+        return {'metadata': self.__metadata(item, depth=1)}
+
+    def _deletefile(self, params, data):
+        item = self.__item(params, 'fileid')
+        metadata = self.__metadata(item)
+        del self.paths[item]
+        return {'metadata': metadata}
+
+    def _createfolderifnotexists(self, params, data):
+        folderId = max([i for k, i in self.paths if k == 'folderid']) + 1
+        if 'path' in params:
+            self.paths[('folderid', folderId)] = params['path']
+        else:
+            self.paths[('folderid', folderId)] = posixpath.join(self.paths[('folderid', params['folderid'])], params['name'])
+        return {'metadata': self.__metadata(('folderid', folderId), depth=1)}
+
+class TestPathIndex(TestCase):
+    tree = {
+        'folderid': 0, 'name': '/', 'contents': [
+            {'folderid': 1, 'name': 'a', 'parentfolderid': 0, 'contents': [
+                {'fileid': 5, 'name': 'x.txt', 'parentfolderid': 1},
+            ]},
+            {'fileid': 2, 'name': 'b.txt', 'parentfolderid': 0},
+        ]
+    }
+
+    def testAdd(self):
+        index = PCloudPathIndex()
+        index.add(self.tree, complete=True)
+
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.lookup('/'), ('folderid', 0))
+        self.assertEqual(index.lookup('/a/x.txt'), ('fileid', 5))
+        self.assertEqual(index.lookup('//a/'), ('folderid', 1))
+        self.assertIsNone(index.lookup('/c'))
+        self.assertEqual(index.path(('fileid', 2)), '/b.txt')
+
+    def testExists(self):
+        index = PCloudPathIndex()
+        index.add({'folderid': 1, 'name': 'a', 'path': '/a', 'contents': [{'folderid': 3, 'name': 'c'}]}, complete=True)
+
+        self.assertTrue(index.exists('/a/c'))
+        self.assertFalse(index.exists('/a/d'))
+        self.assertIsNone(index.exists('/a/c/d'))
+        self.assertIsNone(index.exists('/b'))
+
+    def testIncomplete(self):
+        index = PCloudPathIndex()
+        index.add(self.tree)
+
+        self.assertTrue(index.exists('/a/x.txt'))
+        self.assertIsNone(index.exists('/a/y.txt'))
+
+    def testUnknownParent(self):
+        index = PCloudPathIndex()
+        index.add({'fileid': 7, 'name': 'z.txt', 'parentfolderid': 9})
+
+        self.assertEqual(len(index), 0)
+
+    def testMove(self):
+        index = PCloudPathIndex()
+        index.add(self.tree, complete=True)
+        index.add({'folderid': 1, 'name': 'c', 'parentfolderid': 0})
+
+        self.assertEqual(index.lookup('/c/x.txt'), ('fileid', 5))
+        self.assertIsNone(index.lookup('/a/x.txt'))
+        self.assertFalse(index.exists('/a'))
+
+    def testRelist(self):
+        index = PCloudPathIndex()
+        index.add(self.tree, complete=True)
+        index.add({'folderid': 0, 'name': '/', 'contents': [
+            {'fileid': 2, 'name': 'b.txt', 'parentfolderid': 0},
+            {'fileid': 6, 'name': 'a', 'parentfolderid': 0, 'isdeleted': True},
+            {'fileid': 8, 'name': 'd.txt', 'parentfolderid': 0},
+        ]}, complete=True)
+
+        self.assertEqual(len(index), 3)
+        self.assertIsNone(index.lookup('/a/x.txt'))
+        self.assertFalse(index.exists('/a'))
+        self.assertEqual(index.lookup('/d.txt'), ('fileid', 8))
+
+    def testReplace(self):
+        index = PCloudPathIndex()
+        index.add(self.tree, complete=True)
+        index.add({'fileid': 9, 'name': 'b.txt', 'parentfolderid': 0})
+
+        self.assertEqual(index.lookup('/b.txt'), ('fileid', 9))
+        self.assertIsNone(index.path(('fileid', 2)))
+
+    def testRemove(self):
+        index = PCloudPathIndex()
+        index.add(self.tree, complete=True)
+        index.remove(('folderid', 1))
+
+        self.assertEqual(len(index), 2)
+        self.assertFalse(index.exists('/a'))
+        index.clear()
+        self.assertEqual(len(index), 0)
+
+    def testRelistMany(self):
+        index = PCloudPathIndex()
+        index.add({'folderid': 0, 'name': '/', 'contents': [
+            {'folderid': f, 'name': f'f{f}', 'parentfolderid': 0, 'contents': [
+                {'fileid': 100 * f + i, 'name': f'{i}.txt', 'parentfolderid': f} for i in range(0, 50)
+            ]} for f in range(1, 101)
+        ]}, complete=True)
+        index.add({'folderid': 1, 'name': 'f1', 'path': '/f1', 'contents': [
+            {'fileid': 100 + i, 'name': f'{i}.txt', 'parentfolderid': 1} for i in range(0, 50, 2)
+        ]}, complete=True)
+
+        self.assertEqual(len(index), 1 + 100 * 51 - 25)
+        self.assertFalse(index.exists('/f1/1.txt'))
+        self.assertEqual(index.lookup('/f1/2.txt'), ('fileid', 102))
+        self.assertEqual(index.lookup('/f10/1.txt'), ('fileid', 1001))
+        self.assertEqual(index.lookup('/f11/1.txt'), ('fileid', 1101))
+
+    def testMoveNested(self):
+        index = PCloudPathIndex()
+        index.add(self.tree, complete=True)
+        index.add({'folderid': 3, 'name': 'ab', 'parentfolderid': 0, 'contents': [{'fileid': 4, 'name': 'y.txt', 'parentfolderid': 3}]}, complete=True)
+        index.add({'folderid': 1, 'name': 'c', 'parentfolderid': 3})
+        index.remove(('folderid', 3))
+
+        self.assertEqual(len(index), 2)
+        self.assertIsNone(index.lookup('/ab/c/x.txt'))
+        self.assertFalse(index.exists('/a'))
+        self.assertFalse(index.exists('/ab'))
+        self.assertEqual(index.lookup('/b.txt'), ('fileid', 2))
+
+    def __run(self, server, fun, pathIndex=True):
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/', pathIndex=pathIndex) as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                return fun(pCloud)
+
+    def __server(self):
+        return PCloudTreeServer({0: '/', 1: '/a/', 5: '/a/x.txt', 2: '/b.txt'})
+
+    def __params(self, server, endPoint):
+        return [{k: v for k, v in c[1].items() if k in ('path', 'fileid', 'folderid', 'topath', 'tofolderid')} for c in server.calls if c[0] == endPoint]
+
+    def testDisabled(self):
+        server = self.__server()
+        index = self.__run(server, lambda pCloud: [pCloud.listFolder('/', recursive=True), pCloud.statFile('/a/x.txt'), pCloud.pathIndex][-1], pathIndex=False)
+
+        self.assertIsNone(index)
+        self.assertEqual(self.__params(server, 'stat'), [{'path': '/a/x.txt'}])
+
+    def testRecursiveListing(self):
+        def fun(pCloud):
+            pCloud.listFolder('/', recursive=True)
+            return [pCloud.statFile('/a/x.txt').id, pCloud.listFolder('/a/').id, pCloud.pathIndex.exists('/a/y.txt')]
+
+        server = self.__server()
+        self.assertEqual(self.__run(server, fun), [5, 1, False])
+        self.assertEqual(self.__params(server, 'stat'), [{'fileid': 5}])
+        self.assertEqual(self.__params(server, 'listfolder'), [{'path': '/'}, {'folderid': 1}])
+
+    def testListing(self):
+        def fun(pCloud):
+            pCloud.listFolder(0)
+            return [pCloud.pathIndex.exists('/a'), pCloud.pathIndex.exists('/a/x.txt'), pCloud.pathIndex.exists('/c')]
+
+        self.assertEqual(self.__run(self.__server(), fun), [True, None, False])
+
+    def testRenameFile(self):
+        def fun(pCloud):
+            pCloud.listFolder(0, recursive=True)
+            pCloud.renameFile('/a/x.txt', 'y.txt')
+            pCloud.statFile('/a/y.txt')
+            return [pCloud.pathIndex.exists('/a/x.txt'), pCloud.pathIndex.lookup('/a/y.txt')]
+
+        server = self.__server()
+        self.assertEqual(self.__run(server, fun), [False, ('fileid', 5)])
+        self.assertEqual(self.__params(server, 'renamefile'), [{'fileid': 5}])
+        self.assertEqual(self.__params(server, 'stat'), [{'fileid': 5}])
+
+    def testMoveFile(self):
+        def fun(pCloud):
+            pCloud.listFolder(0, recursive=True)
+            pCloud.moveFile('/b.txt', '/a')
+            return pCloud.pathIndex.lookup('/a/b.txt')
+
+        server = self.__server()
+        self.assertEqual(self.__run(server, fun), ('fileid', 2))
+        self.assertEqual(self.__params(server, 'renamefile'), [{'fileid': 2, 'tofolderid': 1}])
+
+    def testRenameFolder(self):
+        def fun(pCloud):
+            pCloud.listFolder(0, recursive=True)
+            pCloud.renameFolder(1, 'c')
+            return [pCloud.pathIndex.lookup('/c/x.txt'), pCloud.pathIndex.exists('/a')]
+
+        self.assertEqual(self.__run(self.__server(), fun), [('fileid', 5), False])
+
+    def testDeleteFile(self):
+        def fun(pCloud):
+            pCloud.listFolder(0, recursive=True)
+            pCloud.deleteFile('/b.txt')
+            return pCloud.pathIndex.exists('/b.txt')
+
+        server = self.__server()
+        self.assertFalse(self.__run(server, fun))
+        self.assertEqual(self.__params(server, 'deletefile'), [{'fileid': 2}])
+
+    def testCreateFolder(self):
+        def fun(pCloud):
+            pCloud.listFolder(0)
+            pCloud.createFolder('/a', 'c')
+            return pCloud.pathIndex.lookup('/a/c')
+
+        server = self.__server()
+        self.assertEqual(self.__run(server, fun), ('folderid', 2))
+        self.assertEqual(self.__params(server, 'createfolderifnotexists'), [{'folderid': 1}])
+
+    def testOpenCreate(self):
+        def fun(pCloud):
+            pCloud.listFolder('/a')
+            with pCloud.open('/a/y.txt', 'w') as f:
+                f.write('Hello')
+            return [pCloud.pathIndex.exists('/a/y.txt'), pCloud.pathIndex.lookup('/a/y.txt'), pCloud.statFile('/a/y.txt').id]
+
+        server = self.__server()
+        self.assertEqual(self.__run(server, fun), [True, ('fileid', 6), 6])
+        self.assertEqual(self.__params(server, 'stat'), [{'fileid': 6}])
+
+    def testFileAsFolder(self):
+        def fun(pCloud):
+            pCloud.listFolder(0, recursive=True)
+            return pCloud.listFolder('/b.txt')
+
+        server = self.__server()
+        self.__run(server, fun)
+        self.assertEqual(self.__params(server, 'listfolder')[1], {'path': '/b.txt'})
+
+    def testFolderInfo(self):
+        def fun(pCloud):
+            return pCloud.listFolder(PCloudFolderInfo(pCloud, {'folderid': 1, 'name': 'a'})).id
+
+        server = self.__server()
+        self.assertEqual(self.__run(server, fun, pathIndex=False), 1)
+        self.assertEqual(self.__params(server, 'listfolder'), [{'folderid': 1}])
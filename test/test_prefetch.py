@@ -0,0 +1,177 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import threading
+import time
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .test_walk import PCloudTreeServer
+
+from pcloud import PCloud
+
+class PCloudSlowTreeServer(PCloudTreeServer):
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def request(self, method, url, params=None, data=None, files=None, stream=False):
+        if url.endswith('/listfolder'):
+            self.threads.add(threading.current_thread())
+        return super().request(method, url, params=params, data=data, files=files, stream=stream)
+
+    def waitListed(self, *folderIds):
+        for _ in range(0, 500):
+            if all([f in self.listed() for f in folderIds]):
+                return
+            time.sleep(0.01)
+        raise AssertionError(f"{folderIds} not listed")  #pragma: no cover
+
+class PCloudBlockingTreeServer(PCloudSlowTreeServer):
+    def __init__(self, folderId):
+        super().__init__()
+        self.folderId = folderId
+        self.blocked = threading.Event()
+        self.release = threading.Event()
+
+    def request(self, method, url, params=None, data=None, files=None, stream=False):
+        # The first listing of the folder waits until it is released
+        if url.endswith('/listfolder') and (params.get('folderid') == self.folderId) and not self.blocked.is_set():
+            self.blocked.set()
+            self.release.wait(5)
+        return super().request(method, url, params=params, data=data, files=files, stream=stream)
+
+class TestPrefetch(TestCase):
+    def __run(self, server, fun, **kwArgs):
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/', **kwArgs) as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                return fun(pCloud)
+
+    @staticmethod
+    def __tree(folder):
+        return [(o.name, TestPrefetch.__tree(o) if o.isFolder else None) for o in folder]
+
+    expected = [('a', [('y', None)]), ('b', [('c', [('e', []), ('z', None)])]), ('d', []), ('x', None)]
+
+    def testDisabled(self):
+        server = PCloudSlowTreeServer()
+        r = self.__run(server, lambda pCloud: self.__tree(pCloud.listFolder(0)))
+
+        self.assertEqual(r, self.expected)
+        self.assertEqual(server.listed(), [0, 1, 2, 3, 5, 4])
+        self.assertEqual(server.threads, {threading.current_thread()})
+
+    def testPrefetch(self):
+        server = PCloudSlowTreeServer()
+        r = self.__run(server, lambda pCloud: self.__tree(pCloud.listFolder(0)), prefetch=2)
+
+        self.assertEqual(r, self.expected)
+        self.assertEqual(sorted(server.listed()), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(len(server.threads), 3)
+
+    def testHit(self):
+        def run(pCloud):
+            root = pCloud.listFolder(0)
+            server.waitListed(1, 2, 4)
+            return [o.name for o in root[1]]
+        server = PCloudSlowTreeServer()
+        r = self.__run(server, run, prefetch=1)
+
+        self.assertEqual(r, ['c'])
+        self.assertEqual(server.listed()[:4], [0, 1, 2, 4])
+        self.assertEqual(server.listed().count(2), 1)
+
+    def testFlags(self):
+        def run(pCloud):
+            root = pCloud.listFolder(0, noFiles=True)
+            server.waitListed(1, 2, 4)
+            return [o.name for o in pCloud.listFolder(1, noFiles=True)], [o.name for o in pCloud.listFolder(2)]
+        server = PCloudSlowTreeServer()
+        r = self.__run(server, run, prefetch=1)
+
+        self.assertEqual(r, (['y'], ['c']))
+        self.assertEqual(server.listed().count(1), 1)
+        self.assertEqual(server.listed().count(2), 2)
+
+    def testRecursive(self):
+        server = PCloudSlowTreeServer()
+        self.__run(server, lambda pCloud: pCloud.listFolder(0, recursive=True), prefetch=1)
+
+        self.assertEqual(server.listed(), [0])
+
+    def testInvalidate(self):
+        def run(pCloud):
+            root = pCloud.listFolder(0)
+            server.waitListed(1, 2, 4)
+            pCloud.deleteFile(10)
+            return [o.name for o in root[0]]
+        server = PCloudSlowTreeServer()
+        server._deletefile = lambda params, data: {'metadata': {'fileid': params['fileid'], 'isdeleted': True}}
+        r = self.__run(server, run, prefetch=1)
+
+        self.assertEqual(r, ['y'])
+        self.assertEqual(server.listed().count(1), 2)
+
+    def testInvalidateRunning(self):
+        def run(pCloud):
+            pCloud.listFolder(0)
+            server.blocked.wait(5)
+            pCloud.deleteFile(10)
+            server.release.set()
+            # The next prefetch is run when the dropped one is done (there is a single prefetch thread)
+            pCloud.listFolder(2)
+            server.waitListed(3)
+            return [o.name for o in pCloud.listFolder(1)]
+        server = PCloudBlockingTreeServer(1)
+        server._deletefile = lambda params, data: {'metadata': {'fileid': params['fileid'], 'isdeleted': True}}
+        r = self.__run(server, run, prefetch=1, cacheSize=16)
+
+        self.assertEqual(r, ['y'])
+        self.assertEqual(server.listed().count(1), 2)
+
+    def testWrite(self):
+        def run(pCloud):
+            root = pCloud.listFolder(0)
+            server.waitListed(1, 2, 4)
+            with pCloud.openFile(11) as pCloudFile:
+                pCloudFile.write(b'Hello', 0)
+                pCloudFile.write(b' world!', 5)
+            return [o.name for o in root[0]]
+        server = PCloudSlowTreeServer()
+        server.files[11] = bytearray(b'')
+        r = self.__run(server, run, prefetch=1, cacheSize=16)
+
+        self.assertEqual(r, ['y'])
+        self.assertEqual(server.listed().count(1), 1)
+        self.assertEqual(server.files[11], b'Hello world!')
+
+    def testMaxPrefetched(self):
+        def run(pCloud):
+            pCloud.maxPrefetched = 1
+            root = pCloud.listFolder(0)
+            server.waitListed(4)
+            return [o.name for o in root[0]], [o.name for o in root[2]]
+        server = PCloudSlowTreeServer()
+        r = self.__run(server, run, prefetch=1)
+
+        self.assertEqual(r, (['y'], []))
+        self.assertEqual(server.listed().count(4), 1)
@@ -0,0 +1,155 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+
+from pcloud.src.progress import PCloudProgress
+
+class TestProgress(TestCase):
+    def setUp(self):
+        self.__dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.__dir.name, 'test.txt.prog')
+
+    def tearDown(self):
+        self.__dir.cleanup()
+
+    def __write(self, content):
+        with open(self.path, 'wt') as progFile:
+            progFile.write(content)
+
+    def __read(self):
+        with open(self.path, 'rt') as progFile:
+            return progFile.read()
+
+    def testLoadOffset(self):
+        self.__write('20')
+        progress = PCloudProgress(self.path)
+        progress.load()
+
+        self.assertEqual(progress.ranges, [(0, 20)])
+        self.assertEqual(progress.offset, 20)
+        self.assertIsNone(progress.fileId)
+
+    def testLoadRanges(self):
+        self.__write('0 16\n32 40\n')
+        progress = PCloudProgress(self.path)
+        progress.load()
+
+        self.assertEqual(progress.ranges, [(0, 16), (32, 40)])
+        self.assertEqual(progress.done, 24)
+        self.assertEqual(progress.offset, 16)
+        self.assertEqual(progress.missing(48), [(16, 32), (40, 48)])
+
+    def testLoadJournal(self):
+        self.__write('#pcloud-progress fileid=12 size=48 mtime=1000\n+32 40\n+0 8\n+8 16\n+36 44\n')
+        progress = PCloudProgress(self.path)
+        progress.load()
+
+        self.assertEqual(progress.ranges, [(0, 16), (32, 44)])
+        self.assertEqual(progress.fileId, 12)
+        self.assertEqual(progress.size, 48)
+        self.assertEqual(progress.mtime, 1000)
+
+    def testOpen(self):
+        self.__write('#pcloud-progress fileid=12 size=48 mtime=1000\n+0 8\n+8 16\n')
+        progress = PCloudProgress(self.path)
+        progress.load()
+        progress.open(12, 48, 1000)
+
+        self.assertEqual(self.__read(), '#pcloud-progress fileid=12 size=48 mtime=1000\n+0 16\n')
+        progress.close()
+
+    @unittest.mock.patch('pcloud.src.progress.time.monotonic')
+    def testFlushBudget(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        progress = PCloudProgress(self.path)
+        progress.flushSize = 24
+        progress.open(12)
+
+        progress.add(0, 8)
+        progress.add(32, 40)
+        self.assertEqual(self.__read(), '#pcloud-progress fileid=12\n')
+        progress.add(8, 16)
+        self.assertEqual(self.__read(), '#pcloud-progress fileid=12\n+0 8\n+32 40\n+8 16\n')
+
+        progress.add(16, 24)
+        progress.add(24, 28)
+        self.assertEqual(self.__read(), '#pcloud-progress fileid=12\n+0 8\n+32 40\n+8 16\n')
+        mock_monotonic.return_value = progress.flushInterval
+        progress.add(40, 42)
+        self.assertEqual(self.__read(), '#pcloud-progress fileid=12\n+0 8\n+32 40\n+8 16\n+16 28\n+40 42\n')
+        progress.close()
+
+        progress = PCloudProgress(self.path)
+        progress.load()
+        self.assertEqual(progress.ranges, [(0, 28), (32, 42)])
+
+    def testClose(self):
+        progress = PCloudProgress(self.path)
+        sync = unittest.mock.Mock()
+        progress.open(12, sync=sync)
+        progress.add(0, 8)
+        sync.assert_not_called()
+        progress.close()
+
+        sync.assert_called_once_with()
+        self.assertEqual(self.__read(), '#pcloud-progress fileid=12\n+0 8\n')
+
+    def testRemove(self):
+        progress = PCloudProgress(self.path)
+        progress.open(12)
+        progress.add(0, 8)
+        progress.remove()
+
+        self.assertFalse(progress.exists())
+
+    def testStale(self):
+        for fileId, size, mtime in [(13, 48, 1000), (12, 47, 1000), (12, 48, 1001)]:
+            with self.subTest(fileId=fileId, size=size, mtime=mtime):
+                self.__write('#pcloud-progress fileid=12 size=48 mtime=1000\n+0 16\n')
+                progress = PCloudProgress(self.path)
+                progress.load()
+                progress.open(fileId, size, mtime)
+                progress.close()
+
+                self.assertEqual(progress.ranges, [])
+                self.assertEqual(self.__read(), f'#pcloud-progress fileid={fileId} size={size} mtime={mtime}\n')
+
+    def testStaleHash(self):
+        self.__write('#pcloud-progress fileid=12 size=48 mtime=1000 hash=77\n+0 16\n')
+        progress = PCloudProgress(self.path)
+        progress.load()
+        self.assertEqual(progress.hash, 77)
+        progress.open(12, 48, 1000, hash=78)
+        progress.close()
+
+        self.assertEqual(progress.ranges, [])
+        self.assertEqual(self.__read(), '#pcloud-progress fileid=12 size=48 mtime=1000 hash=78\n')
+
+    def testLegacy(self):
+        self.__write('16')
+        progress = PCloudProgress(self.path)
+        progress.load()
+        progress.open(12, 48, 1000)
+        progress.close()
+
+        self.assertEqual(progress.ranges, [(0, 16)])
@@ -0,0 +1,142 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+
+from pcloud import PCloud
+from pcloud.src.file import PCloudFile
+
+class TestReadAhead(TestCase):
+    data = bytes(range(0, 100))
+
+    def setUp(self):
+        self.__blockSize = PCloudFile.blockSize
+        PCloudFile.blockSize = 8
+
+    def tearDown(self):
+        PCloudFile.blockSize = self.__blockSize
+
+    def __run(self, server, fun, readAhead=32):
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                with pCloud.openFile(1, readAhead=readAhead) as pCloudFile:
+                    return fun(pCloudFile)
+
+    def __reads(self, server):
+        return [(c[1]['offset'], c[1]['count']) for c in server.calls if c[0] == 'file_pread']
+
+    def testSequential(self):
+        server = PCloudFakeServer({1: self.data})
+        chunks = self.__run(server, lambda f: [f.read(5) for _ in range(0, 21)])
+
+        self.assertEqual(b''.join(chunks), self.data)
+        self.assertEqual(chunks[-1], b'')
+        self.assertNotIn('file_read', server.endPoints())
+        self.assertEqual(self.__reads(server)[0], (0, 5))
+        self.assertEqual(self.__reads(server)[1:13], [(o, 8) for o in range(5, 100, 8)])
+        self.assertTrue(all([100 <= o < 100 + 32 for o, c in self.__reads(server)[13:]]))
+
+    def testLargeReads(self):
+        server = PCloudFakeServer({1: self.data})
+        chunks = self.__run(server, lambda f: [f.read(20) for _ in range(0, 6)])
+
+        self.assertEqual(b''.join(chunks), self.data)
+        self.assertEqual(chunks[-1], b'')
+
+    def testReadsLargerThanReadAhead(self):
+        server = PCloudFakeServer({1: self.data})
+        chunks = self.__run(server, lambda f: [f.read(30) for _ in range(0, 5)], readAhead=8)
+
+        self.assertEqual([len(c) for c in chunks], [30, 30, 30, 10, 0])
+        self.assertEqual(b''.join(chunks), self.data)
+
+    def testReadIntoLargerThanReadAhead(self):
+        server = PCloudFakeServer({1: self.data})
+        def fun(f):
+            buffer = bytearray(30)
+            return [(f.readinto(buffer), bytes(buffer)) for _ in range(0, 3)]
+        r = self.__run(server, fun, readAhead=8)
+
+        self.assertEqual(r, [(30, self.data[o:o + 30]) for o in (0, 30, 60)])
+
+    def testBounded(self):
+        server = PCloudFakeServer({1: self.data})
+        def fun(f):
+            f.read(4)
+            f.read(4)
+            f.close()
+        self.__run(server, fun)
+
+        self.assertTrue(all([o < 4 + 32 for o, c in self.__reads(server)]))
+
+    def testRandom(self):
+        server = PCloudFakeServer({1: self.data})
+        chunks = self.__run(server, lambda f: [f.read(4, o) for o in [50, 10, 90, 0]])
+
+        self.assertEqual(chunks, [self.data[o:o + 4] for o in [50, 10, 90, 0]])
+        self.assertEqual(self.__reads(server), [(o, 4) for o in [50, 10, 90, 0]])
+
+    def testSequentialOffsets(self):
+        server = PCloudFakeServer({1: self.data})
+        chunks = self.__run(server, lambda f: [f.read(10, o) for o in range(40, 100, 10)])
+
+        self.assertEqual(b''.join(chunks), self.data[40:])
+        self.assertEqual(self.__reads(server)[0], (40, 10))
+        self.assertEqual(self.__reads(server)[1:8], [(o, 8) for o in range(50, 100, 8)])
+        self.assertTrue(all([100 <= o < 100 + 32 for o, c in self.__reads(server)[8:]]))
+
+    def testWrite(self):
+        server = PCloudFakeServer({1: self.data})
+        def fun(f):
+            chunks = [f.read(4), f.read(4)]
+            f.write(b'ABCD', 8)
+            chunks += [f.read(4), f.read(4)]
+            return chunks
+        chunks = self.__run(server, fun)
+
+        self.assertEqual(chunks, [self.data[0:4], self.data[4:8], b'ABCD', self.data[12:16]])
+
+    def testSeek(self):
+        server = PCloudFakeServer({1: self.data})
+        def fun(f):
+            chunks = [f.read(4), f.read(4)]
+            offset = f.offset
+            f.seek(4, PCloud.OffsetOrigin.Current.value)
+            chunks += [f.read(4)]
+            return offset, f.offset, chunks
+        offset, end, chunks = self.__run(server, fun)
+
+        self.assertEqual(offset, 8)
+        self.assertEqual(end, 16)
+        self.assertEqual(chunks, [self.data[0:4], self.data[4:8], self.data[12:16]])
+        self.assertEqual([(c[1]['offset'], c[1]['whence']) for c in server.calls if c[0] == 'file_seek'], [(8, 0), (4, 1)])
+
+    def testDisabled(self):
+        server = PCloudFakeServer({1: self.data})
+        chunks = self.__run(server, lambda f: [f.read(5) for _ in range(0, 3)], readAhead=0)
+
+        self.assertEqual(b''.join(chunks), self.data[:15])
+        self.assertEqual(server.endPoints().count('file_read'), 3)
+        self.assertNotIn('file_pread', server.endPoints())
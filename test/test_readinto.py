@@ -0,0 +1,155 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import mmap
+import requests
+import unittest
+import unittest.mock
+
+from .testcase_file import FileTestCase
+from .binaryserver import PCloudBinaryServer
+
+from pcloud import PCloud
+from pcloud.src.error import PCloudError
+from pcloud.src.transport import PCloudHttpTransport, PCloudBinaryTransport
+
+class TestReadInto(FileTestCase):
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testNormal(self, mock_session, mock_request):
+        self.setupMock(mock_session, mock_request, 18, b'Test')
+
+        buffer = bytearray(4)
+        with PCloud('https://pcloud.localhost/') as pCloud:
+            pCloud.username = 'username'
+            pCloud.password = 'password'
+
+            with pCloud.openFile(1) as pCloudFile:
+                count = pCloudFile.readinto(buffer)
+
+        self.checkMock('GET', 'https://pcloud.localhost/file_read', params={'fd': 18, 'count': 4}, stream=True)
+        self.assertEqual(count, 4)
+        self.assertEqual(buffer, b'Test')
+
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testOffset(self, mock_session, mock_request):
+        self.setupMock(mock_session, mock_request, 18, b'Test')
+
+        buffer = bytearray(b'xxxxxxxx')
+        with PCloud('https://pcloud.localhost/') as pCloud:
+            pCloud.username = 'username'
+            pCloud.password = 'password'
+
+            with pCloud.openFile(1) as pCloudFile:
+                count = pCloudFile.readinto(memoryview(buffer)[2:8], offset=36)
+
+        self.checkMock('GET', 'https://pcloud.localhost/file_pread', params={'fd': 18, 'count': 6, 'offset': 36}, stream=True)
+        self.assertEqual(count, 4)
+        self.assertEqual(buffer, b'xxTestxx')
+
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testMmap(self, mock_session, mock_request):
+        self.setupMock(mock_session, mock_request, 18, b'Test')
+
+        with mmap.mmap(-1, 4) as buffer:
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                with pCloud.openFile(1) as pCloudFile:
+                    count = pCloudFile.readinto(buffer, offset=0)
+            data = buffer[:]
+
+        self.checkMock('GET', 'https://pcloud.localhost/file_pread', params={'fd': 18, 'count': 4, 'offset': 0}, stream=True)
+        self.assertEqual(count, 4)
+        self.assertEqual(data, b'Test')
+
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testChunks(self, mock_session, mock_request):
+        self.setupMock(mock_session, mock_request, 18, bytes(range(10)))
+
+        buffer = bytearray(16)
+        with unittest.mock.patch.object(PCloudHttpTransport, 'chunkSize', 4):
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                with pCloud.openFile(1) as pCloudFile:
+                    count = pCloudFile.readinto(buffer)
+
+        self.checkMock('GET', 'https://pcloud.localhost/file_read', params={'fd': 18, 'count': 16}, stream=True)
+        self.assertEqual(count, 10)
+        self.assertEqual(buffer, bytes(range(10)) + bytes(6))
+
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testError(self, mock_session, mock_request):
+        self.setupMock(mock_session, mock_request, 18, {'result': 5004, 'error': "Read error, try reopening the file."})
+
+        buffer = bytearray(4)
+        with PCloud('https://pcloud.localhost/') as pCloud:
+            pCloud.username = 'username'
+            pCloud.password = 'password'
+
+            with pCloud.openFile(1) as pCloudFile:
+                with self.assertRaises(PCloudError) as e:
+                    pCloudFile.readinto(buffer)
+                self.assertEqual(e.exception.code, 5004)
+
+        self.checkMock('GET', 'https://pcloud.localhost/file_read', params={'fd': 18, 'count': 4}, stream=True)
+        self.assertEqual(buffer, bytes(4))
+
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testHttpError(self, mock_session, mock_request):
+        self.setupMock(mock_session, mock_request, 18, requests.HTTPError)
+
+        with PCloud('https://pcloud.localhost/') as pCloud:
+            pCloud.username = 'username'
+            pCloud.password = 'password'
+
+            with pCloud.openFile(1) as pCloudFile:
+                with self.assertRaises(requests.HTTPError):
+                    pCloudFile.readinto(bytearray(4))
+
+    def testBinary(self):
+        with PCloudBinaryServer([
+            {'result': 0, 'digest': 'pCloudpCloudpCloudDigestDigestDigestDigestDigestDigestDigest'},
+            {'result': 0, 'fd': 1, 'fileid': 18, 'auth': 'AuthAuthAuthAuthAuthAuthAuthAuthAuthAuth'},
+            ({'result': 0}, b'Hello world!'),
+            {'result': 5004, 'error': "Read error, try reopening the file."},
+            {'result': 0},
+            {'result': 0, 'auth_deleted': True},
+        ]) as server:
+            buffer = bytearray(16)
+            with PCloud(server.url, transport=PCloudBinaryTransport()) as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                with pCloud.openFile(18) as pCloudFile:
+                    count = pCloudFile.readinto(buffer, 0)
+                    with self.assertRaises(PCloudError) as e:
+                        pCloudFile.readinto(buffer)
+                    self.assertEqual(e.exception.code, 5004)
+
+        self.assertEqual(count, 12)
+        self.assertEqual(buffer, b'Hello world!' + bytes(4))
+        self.assertEqual([r[1] for r in server.requests], ['getdigest', 'file_open', 'file_pread', 'file_read', 'file_close', 'logout'])
+        self.assertEqual(server.requests[2][2]['count'], 16)
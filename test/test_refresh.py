@@ -0,0 +1,192 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .test_walk import PCloudTreeServer
+
+from pcloud import PCloud
+
+class PCloudChangingServer(PCloudTreeServer):
+    def __init__(self):
+        super().__init__()
+        for f, m in list(self.folders.items()) + list(self.items.items()):
+            m['hash'] = f
+            m['modified'] = 'Sat, 01 Jan 2022 00:00:00 +0000'
+        self.__time = 0
+
+    def touch(self, folderId):
+        # As with PCloud, changes are only reflected in the metadata of the folder whose direct contents changed
+        self.__time += 1
+        self.folders[folderId]['modified'] = f'Sun, 02 Jan 2022 00:00:{self.__time:02d} +0000'
+
+    def _listfolder(self, params, data):
+        r = super()._listfolder(params, data)
+        if params.get('recursive') and ('metadata' in r):
+            r['metadata']['contents'] = [self._listfolder(dict(params, folderid=m['folderid']), data)['metadata'] if m['isfolder'] else m for m in r['metadata']['contents']]
+        return r
+
+class TestRefresh(TestCase):
+    def __run(self, server, change, changedOnly=False, **kwArgs):
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/', **kwArgs) as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                tree = pCloud.listFolder(0, recursive=True)
+                change(server)
+                del server.calls[:]
+                tree, diff = pCloud.refresh(tree, changedOnly=changedOnly)
+                listed = server.listed()
+                return self.__tree(tree), diff, listed
+
+    @staticmethod
+    def __tree(folder):
+        return [(o.name, TestRefresh.__tree(o) if o.isFolder else None) for o in folder]
+
+    @staticmethod
+    def __names(items):
+        return sorted([(o[0].name, o[1].name) if type(o) is tuple else o.name for o in items])
+
+    expected = [('a', [('y', None)]), ('b', [('c', [('e', []), ('z', None)])]), ('d', []), ('x', None)]
+
+    def testUnchanged(self):
+        tree, diff, listed = self.__run(PCloudChangingServer(), lambda s: None)
+
+        self.assertEqual(tree, self.expected)
+        self.assertEqual(len(diff), 0)
+        self.assertEqual(listed, [0])
+
+    def testModified(self):
+        def change(server):
+            server.items[12]['hash'] = 42
+            server.touch(3)
+        tree, diff, listed = self.__run(PCloudChangingServer(), change)
+
+        self.assertEqual(tree, self.expected)
+        self.assertEqual(self.__names(diff.modified), [('z', 'z')])
+        self.assertEqual(diff.modified[0][1].hash, 42)
+        self.assertEqual(len(diff), 1)
+        self.assertEqual(listed, [0])
+
+    def testAdded(self):
+        def change(server):
+            server.folders[6] = {'name': 'f', 'parentfolderid': 1, 'hash': 6, 'modified': ''}
+            server.items[13] = {'name': 'w', 'parentfolderid': 6, 'hash': 13, 'modified': ''}
+            server.items[14] = {'name': 'v', 'parentfolderid': 4, 'hash': 14, 'modified': ''}
+            server.touch(1)
+            server.touch(4)
+        tree, diff, listed = self.__run(PCloudChangingServer(), change)
+
+        self.assertEqual(tree, [('a', [('f', [('w', None)]), ('y', None)]), ('b', [('c', [('e', []), ('z', None)])]), ('d', [('v', None)]), ('x', None)])
+        self.assertEqual(self.__names(diff.added), ['f', 'v', 'w'])
+        self.assertEqual(len(diff), 3)
+        self.assertEqual(listed, [0])
+
+    def testRemoved(self):
+        def change(server):
+            del server.folders[3]
+            del server.folders[5]
+            del server.items[12]
+            del server.items[10]
+            server.touch(2)
+        tree, diff, listed = self.__run(PCloudChangingServer(), change)
+
+        self.assertEqual(tree, [('a', [('y', None)]), ('b', []), ('d', [])])
+        self.assertEqual(self.__names(diff.removed), ['c', 'e', 'x', 'z'])
+        self.assertEqual(len(diff), 4)
+        self.assertEqual(listed, [0])
+
+    def testMoved(self):
+        def change(server):
+            server.items[11]['parentfolderid'] = 4
+            server.folders[3]['parentfolderid'] = 0
+            server.folders[3]['name'] = 'g'
+            server.touch(1)
+            server.touch(2)
+            server.touch(4)
+        tree, diff, listed = self.__run(PCloudChangingServer(), change)
+
+        self.assertEqual(tree, [('a', []), ('b', []), ('g', [('e', []), ('z', None)]), ('d', [('y', None)]), ('x', None)])
+        self.assertEqual(self.__names(diff.moved), [('c', 'g'), ('y', 'y')])
+        self.assertEqual(len(diff), 2)
+        self.assertEqual(listed, [0])
+
+    def __runLazy(self, changedOnly):
+        def run(pCloud):
+            tree = pCloud.listFolder(0)
+            server.folders[6] = {'name': 'f', 'parentfolderid': 0, 'hash': 6, 'modified': ''}
+            server.items[13] = {'name': 'w', 'parentfolderid': 6, 'hash': 13, 'modified': ''}
+            server.items[14] = {'name': 'v', 'parentfolderid': 4, 'hash': 14, 'modified': ''}
+            server.touch(0)
+            server.touch(4)
+            tree, diff = pCloud.refresh(tree, changedOnly=changedOnly)
+            return [o.contentsLoaded for o in tree if o.isFolder], self.__names(diff.added), len(diff), server.listed()
+        server = PCloudChangingServer()
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                return run(pCloud)
+
+    def testLazy(self):
+        # The contents of the folders which were not listed are not new
+        self.assertEqual(self.__runLazy(False), ([True, True, True, True], ['f', 'w'], 2, [0, 0]))
+
+    def testLazyChangedOnly(self):
+        self.assertEqual(self.__runLazy(True), ([False, False, False, True], ['f', 'w'], 2, [0, 0, 6]))
+
+    def testPrefetch(self):
+        def change(server):
+            server.touch(1)
+            server.touch(2)
+            server.touch(3)
+        tree, diff, listed = self.__run(PCloudChangingServer(), change, changedOnly=True, prefetch=2)
+
+        self.assertEqual(tree, self.expected)
+        self.assertEqual(len(diff), 0)
+        self.assertEqual(sorted(listed), [0, 1, 2, 3])
+
+    def testChangedOnly(self):
+        def change(server):
+            server.items[11]['hash'] = 42
+            server.touch(1)
+            server.folders[6] = {'name': 'f', 'parentfolderid': 3, 'hash': 6, 'modified': ''}
+            server.touch(3)
+        tree, diff, listed = self.__run(PCloudChangingServer(), change, changedOnly=True)
+
+        # The folder added in c is not seen, since the metadata of b did not change
+        self.assertEqual(tree, self.expected)
+        self.assertEqual(self.__names(diff.modified), [('y', 'y')])
+        self.assertEqual(len(diff), 1)
+        self.assertEqual(listed, [0, 1])
+
+    def testDeepChange(self):
+        def change(server):
+            server.folders[6] = {'name': 'f', 'parentfolderid': 3, 'hash': 6, 'modified': ''}
+            server.touch(3)
+        tree, diff, listed = self.__run(PCloudChangingServer(), change)
+
+        self.assertEqual(tree, [('a', [('y', None)]), ('b', [('c', [('e', []), ('f', []), ('z', None)])]), ('d', []), ('x', None)])
+        self.assertEqual(self.__names(diff.added), ['f'])
+        self.assertEqual(len(diff), 1)
+        self.assertEqual(listed, [0])
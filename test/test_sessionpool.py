@@ -0,0 +1,96 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import requests
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+
+from pcloud import PCloud
+from pcloud.src.pool import PCloudSessionPool
+
+class TestSessionPool(TestCase):
+    def __createResponse(self, return_value):
+        mock_response = unittest.mock.Mock(spec=requests.Response, status_code=200)
+        mock_response.headers = {'Content-Type': 'application/json; charset=utf-8'}
+        mock_response.json.return_value = return_value
+        return mock_response
+
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testShared(self, mock_session, mock_request):
+        mock_session_object = unittest.mock.Mock()
+        mock_session_object.headers = {}
+        mock_session_object.request.side_effect = [
+            self.__createResponse({'result': 0, 'ip': '127.0.0.1', 'country': 'fr'}),
+            self.__createResponse({'result': 0, 'languages': {'en': 'English'}}),
+        ]
+        mock_session.return_value = mock_session_object
+
+        with PCloud('https://pcloud.localhost/', maxConnections=4) as pCloud:
+            ip = pCloud.getIp()
+            languages = pCloud.supportedLanguages()
+
+        mock_request.assert_not_called()
+        self.assertEqual(len(mock_session.call_args_list), 1)
+        self.assertEqual(len(mock_session_object.request.call_args_list), 2)
+        self.checkCall(mock_session_object.request, 0, 'GET', 'https://pcloud.localhost/getip')
+        self.checkCall(mock_session_object.request, 1, 'GET', 'https://pcloud.localhost/supportedlanguages')
+        self.assertEqual(len(mock_session_object.mount.call_args_list), 2)
+        mock_session_object.close.assert_called_once_with()
+
+        self.assertEqual(ip, '127.0.0.1')
+        self.assertEqual(languages, {'en': 'English'})
+
+    @unittest.mock.patch('pcloud.src.pool.time.monotonic')
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testIdleTimeout(self, mock_session, mock_time):
+        mock_session.side_effect = [unittest.mock.Mock(headers={}), unittest.mock.Mock(headers={})]
+        mock_time.side_effect = [0, 5, 20]
+
+        pool = PCloudSessionPool(2, idleTimeout=10)
+        s1 = pool.session
+        s2 = pool.session
+        s3 = pool.session
+
+        self.assertIs(s1, s2)
+        self.assertIsNot(s2, s3)
+        s1.close.assert_called_once_with()
+        s3.close.assert_not_called()
+
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testNoKeepAlive(self, mock_session):
+        mock_session.return_value = unittest.mock.Mock(headers={})
+
+        pool = PCloudSessionPool(2, keepAlive=False)
+        self.assertEqual(pool.session.headers, {'Connection': 'close'})
+
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testClose(self, mock_session):
+        mock_session.side_effect = [unittest.mock.Mock(headers={}), unittest.mock.Mock(headers={})]
+
+        with PCloudSessionPool(2) as pool:
+            s1 = pool.session
+        s2 = pool.session
+
+        s1.close.assert_called_once_with()
+        self.assertIsNot(s1, s2)
+
+    def testInvalid(self):
+        with self.assertRaises(ValueError):
+            PCloudSessionPool(0)
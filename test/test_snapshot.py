@@ -0,0 +1,177 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+
+from pcloud import PCloud
+from pcloud.src.snapshot import PCloudSnapshot
+
+class PCloudTreeServer(PCloudFakeServer):
+    def __init__(self):
+        super().__init__()
+        self.folders = {
+            0: {'name': '/', 'modified': 'Sun, 2 Feb 2020 20:20:20 +0000'},
+            1: {'name': 'a', 'parentfolderid': 0, 'modified': 'Sun, 2 Feb 2020 20:20:20 +0000'},
+            2: {'name': 'b', 'parentfolderid': 0, 'modified': 'Sun, 2 Feb 2020 20:20:20 +0000'},
+            3: {'name': 'c', 'parentfolderid': 2, 'modified': 'Sun, 2 Feb 2020 20:20:20 +0000'},
+        }
+        self.items = {
+            10: {'name': 'x.txt', 'parentfolderid': 0, 'hash': 18446744073709551615, 'size': 4, 'ismine': True},
+            11: {'name': 'y.txt', 'parentfolderid': 1, 'hash': 2, 'size': 8, 'ismine': True},
+            12: {'name': 'z.txt', 'parentfolderid': 3, 'hash': 3, 'size': 0, 'ismine': False},
+        }
+
+    def __metadata(self, folderId, recursive, depth=0):
+        metadata = dict(self.folders[folderId], folderid=folderId, isfolder=True)
+        if recursive or (depth == 0):
+            metadata['contents'] = [self.__metadata(f, recursive, depth + 1) for f, m in self.folders.items() if m.get('parentfolderid') == folderId]
+            metadata['contents'] += [dict(m, fileid=f, isfolder=False) for f, m in self.items.items() if m['parentfolderid'] == folderId]
+        return metadata
+
+    def _listfolder(self, params, data):
+        return {'metadata': self.__metadata(params['folderid'], params['recursive'])}
+
+    def listed(self):
+        return [(c[1]['folderid'], c[1]['recursive']) for c in self.calls if c[0] == 'listfolder']
+
+class TestSnapshot(TestCase):
+    def setUp(self):
+        self.__dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.__dir.name, 'snapshot.db')
+
+    def tearDown(self):
+        self.__dir.cleanup()
+
+    def __run(self, server, fun):
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                with PCloudSnapshot(self.path) as snapshot:
+                    return fun(pCloud, snapshot)
+
+    def __tree(self, info):
+        if info.isFolder:
+            return (info.name, [self.__tree(c) for c in info])
+        return (info.name, info.hash, info.size, info.isMine)
+
+    def testSaveLoad(self):
+        server = PCloudTreeServer()
+        self.__run(server, lambda pCloud, snapshot: snapshot.save(pCloud.listFolder(0, recursive=True)))
+        calls = len(server.calls)
+        root = self.__run(server, lambda pCloud, snapshot: snapshot.load(pCloud))
+
+        self.assertEqual(len(server.calls), calls)
+        self.assertEqual(self.__tree(root), ('/', [
+            ('a', [('y.txt', 2, 8, True)]),
+            ('b', [('c', [('z.txt', 3, 0, False)])]),
+            ('x.txt', 18446744073709551615, 4, True),
+        ]))
+        self.assertEqual(root.id, 0)
+        self.assertEqual(root[1][0].id, 3)
+        self.assertEqual(root[1][0].parentFolderId, 2)
+        self.assertEqual(root[1][0].modified, 'Sun, 2 Feb 2020 20:20:20 +0000')
+
+    def testLoadSubtree(self):
+        server = PCloudTreeServer()
+        self.__run(server, lambda pCloud, snapshot: snapshot.save(pCloud.listFolder(0, recursive=True)))
+        r = self.__run(server, lambda pCloud, snapshot: [snapshot.load(pCloud, 2), snapshot.load(pCloud, 4), len(snapshot)])
+
+        self.assertEqual(self.__tree(r[0]), ('b', [('c', [('z.txt', 3, 0, False)])]))
+        self.assertIsNone(r[1])
+        self.assertEqual(r[2], 7)
+
+    def testRefreshEmpty(self):
+        server = PCloudTreeServer()
+        root = self.__run(server, lambda pCloud, snapshot: snapshot.refresh(pCloud))
+
+        self.assertEqual(server.listed(), [(0, True)])
+        self.assertEqual(len(root), 3)
+
+    def testRefreshUnchanged(self):
+        server = PCloudTreeServer()
+        self.__run(server, lambda pCloud, snapshot: snapshot.refresh(pCloud))
+        del server.calls[:]
+        root = self.__run(server, lambda pCloud, snapshot: snapshot.refresh(pCloud, changedOnly=True))
+
+        self.assertEqual(server.listed(), [(0, False)])
+        self.assertEqual(self.__tree(root)[1][1], ('b', [('c', [('z.txt', 3, 0, False)])]))
+
+    def testRefreshChanged(self):
+        server = PCloudTreeServer()
+        self.__run(server, lambda pCloud, snapshot: snapshot.refresh(pCloud))
+        del server.calls[:]
+
+        # Rename a file in a/, add a new folder d/ and remove b/
+        server.items[11]['name'] = 'w.txt'
+        server.folders[1]['modified'] = 'Mon, 3 Feb 2020 20:20:20 +0000'
+        server.folders[4] = {'name': 'd', 'parentfolderid': 0, 'modified': 'Mon, 3 Feb 2020 20:20:20 +0000'}
+        server.folders[5] = {'name': 'e', 'parentfolderid': 4, 'modified': 'Mon, 3 Feb 2020 20:20:20 +0000'}
+        del server.folders[2]
+        del server.folders[3]
+        del server.items[12]
+        r = self.__run(server, lambda pCloud, snapshot: [snapshot.refresh(pCloud, changedOnly=True), len(snapshot)])
+
+        self.assertEqual(server.listed(), [(0, False), (1, False), (4, True)])
+        self.assertEqual(self.__tree(r[0]), ('/', [
+            ('a', [('w.txt', 2, 8, True)]),
+            ('d', [('e', [])]),
+            ('x.txt', 18446744073709551615, 4, True),
+        ]))
+        self.assertEqual(r[1], 6)
+
+    def __changeDeep(self, server):
+        # Add a file in b/c/ (only the modification time of c/ changes)
+        server.items[13] = {'name': 'v.txt', 'parentfolderid': 3, 'hash': 4, 'size': 2, 'ismine': True}
+        server.folders[3]['modified'] = 'Mon, 3 Feb 2020 20:20:20 +0000'
+        del server.items[10]
+
+    def testRefreshDeep(self):
+        server = PCloudTreeServer()
+        self.__run(server, lambda pCloud, snapshot: snapshot.refresh(pCloud))
+        del server.calls[:]
+        self.__changeDeep(server)
+        r = self.__run(server, lambda pCloud, snapshot: [snapshot.refresh(pCloud), len(snapshot)])
+
+        self.assertEqual(server.listed(), [(0, True)])
+        self.assertEqual(self.__tree(r[0]), ('/', [
+            ('a', [('y.txt', 2, 8, True)]),
+            ('b', [('c', [('v.txt', 4, 2, True), ('z.txt', 3, 0, False)])]),
+        ]))
+        self.assertEqual(r[1], 7)
+
+    def testRefreshDeepChangedOnly(self):
+        server = PCloudTreeServer()
+        self.__run(server, lambda pCloud, snapshot: snapshot.refresh(pCloud))
+        del server.calls[:]
+        self.__changeDeep(server)
+        root = self.__run(server, lambda pCloud, snapshot: snapshot.refresh(pCloud, changedOnly=True))
+
+        # The new file is not seen, since the metadata of b/ did not change
+        self.assertEqual(server.listed(), [(0, False)])
+        self.assertEqual(self.__tree(root), ('/', [
+            ('a', [('y.txt', 2, 8, True)]),
+            ('b', [('c', [('z.txt', 3, 0, False)])]),
+        ]))
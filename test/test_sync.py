@@ -0,0 +1,244 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock
+
+from email.utils import formatdate
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+
+from pcloud import PCloud
+from pcloud.src.error import PCloudError
+from pcloud.src.sync import PCloudSync
+
+class PCloudSyncServer(PCloudFakeServer):
+    def __init__(self):
+        super().__init__()
+        self.folders = {0: {'name': '/'}}
+        self.items = {}
+
+    def add(self, parentFolderId, name, content=None):
+        if content is None:
+            folderId = max(self.folders.keys()) + 1
+            self.folders[folderId] = {'name': name, 'parentfolderid': parentFolderId}
+            return folderId
+        fileId = max(list(self.files.keys()) + [0]) + 1
+        self.files[fileId] = bytearray(content)
+        self.items[fileId] = {'name': name, 'parentfolderid': parentFolderId, 'modified': formatdate(time.time())}
+        return fileId
+
+    def tree(self, folderId=0):
+        tree = [(m['name'], self.tree(f)) for f, m in self.folders.items() if m.get('parentfolderid') == folderId]
+        tree += [(m['name'], bytes(self.files[f])) for f, m in self.items.items() if m['parentfolderid'] == folderId]
+        return sorted(tree)
+
+    def __metadata(self, fileId):
+        return dict(self.items[fileId], fileid=fileId, isfolder=False, size=len(self.files[fileId]))
+
+    def _listfolder(self, params, data):
+        folderId = params.get('folderid', 0)
+        contents = [self._listfolder(dict(params, folderid=f), data)['metadata'] for f, m in self.folders.items() if m.get('parentfolderid') == folderId]
+        contents += [self.__metadata(f) for f, m in self.items.items() if m['parentfolderid'] == folderId]
+        return {'metadata': dict(self.folders[folderId], folderid=folderId, isfolder=True, contents=contents)}
+
+    def _createfolderifnotexists(self, params, data):
+        folderId = self.add(params['folderid'], params['name'])
+        return {'metadata': dict(self.folders[folderId], folderid=folderId, isfolder=True)}
+
+    def _file_open(self, params, data):
+        if 'name' in params:
+            return {'fd': super()._file_open({'fileid': self.add(params['folderid'], params['name'], b''), 'flags': 0}, data)['fd'], 'fileid': max(self.files.keys())}
+        self.items[params['fileid']]['modified'] = formatdate(time.time())
+        return super()._file_open(params, data)
+
+    def _renamefile(self, params, data):
+        # As with PCloud, the file which has the same name is replaced
+        item = self.items[params['fileid']]
+        for f, m in list(self.items.items()):
+            if (f != params['fileid']) and (m['parentfolderid'] == item['parentfolderid']) and (m['name'] == params['toname']):
+                self._deletefile({'fileid': f}, data)
+        item['name'] = params['toname']
+        return {'metadata': self.__metadata(params['fileid'])}
+
+    def _deletefile(self, params, data):
+        metadata = self.__metadata(params['fileid'])
+        del self.items[params['fileid']]
+        del self.files[params['fileid']]
+        return {'metadata': dict(metadata, isdeleted=True)}
+
+    def _deletefolder(self, params, data):
+        folderId = params['folderid']
+        if any([m.get('parentfolderid') == folderId for m in list(self.folders.values()) + list(self.items.values())]):
+            return {'result': 2006, 'error': "Folder is not empty."}
+        return {'metadata': dict(self.folders.pop(folderId), folderid=folderId, isfolder=True, isdeleted=True)}
+
+class TestSync(TestCase):
+    def setUp(self):
+        self.__dir = tempfile.TemporaryDirectory()
+        self.root = self.__dir.name
+        self.write('a.txt', b'Hello world!')
+        self.write('sub/b.txt', b'Bonjour le monde !')
+        self.write('sub/deep/c.txt', b'')
+
+    def tearDown(self):
+        self.__dir.cleanup()
+
+    def write(self, path, content, mtime=None):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def __run(self, server, fun):
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                return fun(pCloud)
+
+    def __sync(self, server, **kwArgs):
+        return self.__run(server, lambda pCloud: pCloud.sync(self.root, 0, **kwArgs))
+
+    expected = [('a.txt', b'Hello world!'), ('sub', [('b.txt', b'Bonjour le monde !'), ('deep', [('c.txt', b'')])])]
+
+    def testCreate(self):
+        server = PCloudSyncServer()
+        report = self.__sync(server, workers=3)
+
+        self.assertEqual(server.tree(), self.expected)
+        self.assertEqual((report.createdFolders, report.uploadedFiles, report.updatedFiles, report.skippedFiles), (2, 3, 0, 0))
+        self.assertEqual(report.uploadedBytes, 30)
+        self.assertGreater(report.throughput, 0)
+
+    def testUpToDate(self):
+        server = PCloudSyncServer()
+        self.__sync(server)
+        del server.calls[:]
+        report = self.__sync(server, workers=3)
+
+        self.assertEqual(server.tree(), self.expected)
+        self.assertEqual((report.createdFolders, report.uploadedFiles, report.updatedFiles, report.skippedFiles), (0, 0, 0, 3))
+        self.assertEqual((report.uploadedBytes, report.skippedBytes), (0, 30))
+        self.assertEqual([e for e in server.endPoints() if e not in ('getdigest', 'logout')], ['listfolder'])
+
+    def testUpdate(self):
+        server = PCloudSyncServer()
+        self.__sync(server)
+        self.write('sub/b.txt', b'Hallo Welt!', time.time() + 60)
+        report = self.__sync(server, workers=3)
+
+        self.assertEqual(server.tree(), [('a.txt', b'Hello world!'), ('sub', [('b.txt', b'Hallo Welt!'), ('deep', [('c.txt', b'')])])])
+        self.assertEqual((report.uploadedFiles, report.updatedFiles, report.skippedFiles), (0, 1, 2))
+        self.assertEqual(report.uploadedBytes, 11)
+        self.assertEqual([c[1]['toname'] for c in server.calls if c[0] == 'renamefile'], ['b.txt'])
+
+    def testUpdateError(self):
+        server = PCloudSyncServer()
+        self.__sync(server)
+        self.write('sub/b.txt', b'Hallo Welt!', time.time() + 60)
+        server.failures['file_pwrite'] = [5003]
+
+        with self.assertRaises(PCloudError) as e:
+            self.__sync(server)
+        self.assertEqual(e.exception.code, 5003)
+        # The remote file is kept and the temporary file is deleted
+        self.assertEqual(server.tree(), self.expected)
+
+    def testChecksum(self):
+        server = PCloudSyncServer()
+        self.__sync(server)
+        self.write('a.txt', b'Hello world!', time.time() + 60)
+        self.write('sub/b.txt', b'Bonjour la Terre!', time.time() + 60)
+        self.write('sub/b.txt', b'Bonjour la Terre!!', time.time() + 60)
+        del server.calls[:]
+        report = self.__sync(server, checksum=True, workers=2)
+
+        self.assertEqual(server.tree(), [('a.txt', b'Hello world!'), ('sub', [('b.txt', b'Bonjour la Terre!!'), ('deep', [('c.txt', b'')])])])
+        self.assertEqual((report.updatedFiles, report.skippedFiles), (1, 2))
+        self.assertEqual(server.endPoints().count('checksumfile'), 2)
+
+    def testNoChecksum(self):
+        server = PCloudSyncServer()
+        self.__sync(server)
+        self.write('a.txt', b'Hello world!', time.time() + 60)
+        del server.calls[:]
+        report = self.__sync(server)
+
+        self.assertEqual((report.updatedFiles, report.skippedFiles), (1, 2))
+        self.assertNotIn('checksumfile', server.endPoints())
+
+    def testDelete(self):
+        server = PCloudSyncServer()
+        old = server.add(0, 'old')
+        server.add(server.add(old, 'older'), 'd.txt', b'Old')
+        server.add(0, 'e.txt', b'Old')
+        report = self.__sync(server, delete=True, workers=2)
+
+        self.assertEqual(server.tree(), self.expected)
+        self.assertEqual((report.deletedFolders, report.deletedFiles), (2, 2))
+
+    def testNoDelete(self):
+        server = PCloudSyncServer()
+        server.add(0, 'e.txt', b'Old')
+        report = self.__sync(server)
+
+        self.assertEqual(server.tree(), sorted(self.expected + [('e.txt', b'Old')]))
+        self.assertEqual((report.deletedFolders, report.deletedFiles), (0, 0))
+
+    def testConflict(self):
+        server = PCloudSyncServer()
+        server.add(server.add(0, 'a.txt'), 'd.txt', b'Old')
+        server.add(0, 'sub', b'Old')
+        report = self.__sync(server)
+
+        self.assertEqual(report.conflicts, [os.path.join(self.root, 'a.txt'), os.path.join(self.root, 'sub')])
+        self.assertEqual(server.tree(), [('a.txt', [('d.txt', b'Old')]), ('sub', b'Old')])
+
+        report = self.__sync(server, delete=True)
+
+        self.assertEqual(report.conflicts, [])
+        self.assertEqual(server.tree(), self.expected)
+
+    def testPlan(self):
+        def run(pCloud):
+            sync = PCloudSync(pCloud, self.root, '/', delete=True)
+            return [(a.operation, a.name) for a in sync.plan()]
+        server = PCloudSyncServer()
+        server.add(0, 'e.txt', b'Old')
+        server.add(0, 'a.txt', b'Hello world!')
+        r = self.__run(server, run)
+
+        self.assertEqual(r, [(PCloudSync.Operation.Delete, 'e.txt'), (PCloudSync.Operation.CreateFolder, 'sub'), (PCloudSync.Operation.CreateFolder, 'deep'),
+                             (PCloudSync.Operation.Upload, 'b.txt'), (PCloudSync.Operation.Upload, 'c.txt')])
+        self.assertEqual(server.tree(), [('a.txt', b'Hello world!'), ('e.txt', b'Old')])
+
+    def testError(self):
+        server = PCloudSyncServer()
+        server.failures['file_pwrite'] = [5003]
+
+        with self.assertRaises(PCloudError) as e:
+            self.__sync(server, workers=2)
+        self.assertEqual(e.exception.code, 5003)
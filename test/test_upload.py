@@ -27,12 +27,14 @@ from pcloud.src.error import PCloudError
 from PythonUtils import testdata
 
 class TestUpload(FileTestCase):
+    @unittest.mock.patch('pcloud.src.main.os.stat')
+    @unittest.mock.patch('pcloud.src.progress.open')
     @unittest.mock.patch('pcloud.src.main.os.remove')
     @unittest.mock.patch('pcloud.src.main.os.path.isfile')
     @unittest.mock.patch('pcloud.src.main.open')
     @unittest.mock.patch('pcloud.src.main.requests.request')
     @unittest.mock.patch('pcloud.src.main.requests.Session')
-    def __testFileNormal(self, fileIdOrPath, data, prog, mock_session, mock_request, mock_open, mock_isfile, mock_remove):
+    def __testFileNormal(self, fileIdOrPath, data, prog, mock_session, mock_request, mock_open, mock_isfile, mock_remove, mock_progopen, mock_stat):
         # Setup mocks
         maxProgress = (prog or 0) + sum([len(d) for d in data])
         self.setupMock(mock_session, mock_request, 18, [{'result': 0, 'bytes': len(d)} for d in data])
@@ -47,12 +49,11 @@ class TestUpload(FileTestCase):
             progFile.read.side_effect = str(prog)
 
         unittest.mock.mock_open(mock_open)
-        if prog is None:
-            mock_open.side_effect = [dataFile] + [progFile]*(len(data) + 1)
-        else:
-            mock_open.side_effect = [progFile, dataFile] + [progFile]*(len(data) + 1)
+        mock_open.side_effect = [dataFile]
+        mock_progopen.side_effect = [progFile]*(1 + int(prog is not None))
 
         mock_isfile.return_value = prog is not None
+        mock_stat.return_value = unittest.mock.Mock(st_size=maxProgress, st_mtime_ns=1650000000000000000)
 
         # Execute test
         PCloudFile.blockSize = 8
@@ -70,26 +71,27 @@ class TestUpload(FileTestCase):
             self.checkMock('PUT', 'https://pcloud.localhost/file_pwrite', params={'fd': 18}, data=d)
 
         if prog is not None:
-            self.checkCall(mock_open, 0, 'test.txt.prog', 'rt')
+            self.checkCall(mock_progopen, 0, 'test.txt.prog', 'rt')
             self.assertEqual([c[0] for c in progFile.read.call_args_list], [()])
 
-        self.checkCall(mock_open, int(prog is not None), 'test.txt', 'rb')
+        self.checkCall(mock_open, 0, 'test.txt', 'rb')
         self.checkCall(dataFile.seek, 0, prog or 0)
         self.assertEqual([c[0] for c in dataFile.read.call_args_list], [(PCloudFile.blockSize,) for c in range(0, len(data) + 1)])
 
-        for d in range(1, len(data) + 2):
-            self.checkCall(mock_open, int(prog is not None) + d, 'test.txt.prog', 'wt')
-        self.assertEqual([c[0] for c in progFile.write.call_args_list], [(str(min(maxProgress, (prog or 0) + c*PCloudFile.blockSize)),) for c in range(0, len(data) + 1)])
+        self.checkCall(mock_progopen, int(prog is not None), 'test.txt.prog', 'wt')
+        self.assertEqual([c[0] for c in progFile.write.call_args_list], [(f'#pcloud-progress fileid=1 size={maxProgress} mtime=1650000000000000000\n' + (f'+0 {prog}\n' if prog else ''),)])
 
         self.assertEqual(len(mock_remove.call_args_list), 1)
         self.checkCall(mock_remove, 0, 'test.txt.prog')
 
+    @unittest.mock.patch('pcloud.src.main.os.stat')
+    @unittest.mock.patch('pcloud.src.progress.open')
     @unittest.mock.patch('pcloud.src.main.os.remove')
     @unittest.mock.patch('pcloud.src.main.os.path.isfile')
     @unittest.mock.patch('pcloud.src.main.open')
     @unittest.mock.patch('pcloud.src.main.requests.request')
     @unittest.mock.patch('pcloud.src.main.requests.Session')
-    def __testFolderNormal(self, folderIdOrPath, fileName, data, prog, mock_session, mock_request, mock_open, mock_isfile, mock_remove):
+    def __testFolderNormal(self, folderIdOrPath, fileName, data, prog, mock_session, mock_request, mock_open, mock_isfile, mock_remove, mock_progopen, mock_stat):
         # Setup mocks
         maxProgress = (prog or 0) + sum([len(d) for d in data])
         self.setupMock(mock_session, mock_request, 18, [{'result': 0, 'bytes': len(d)} for d in data])
@@ -104,12 +106,11 @@ class TestUpload(FileTestCase):
             progFile.read.side_effect = str(prog)
 
         unittest.mock.mock_open(mock_open)
-        if prog is None:
-            mock_open.side_effect = [dataFile] + [progFile]*(len(data) + 1)
-        else:
-            mock_open.side_effect = [progFile, dataFile] + [progFile]*(len(data) + 1)
+        mock_open.side_effect = [dataFile]
+        mock_progopen.side_effect = [progFile]*(1 + int(prog is not None))
 
         mock_isfile.return_value = prog is not None
+        mock_stat.return_value = unittest.mock.Mock(st_size=maxProgress, st_mtime_ns=1650000000000000000)
 
         # Execute test
         PCloudFile.blockSize = 8
@@ -127,26 +128,27 @@ class TestUpload(FileTestCase):
             self.checkMock('PUT', 'https://pcloud.localhost/file_pwrite', params={'fd': 18}, data=d)
 
         if prog is not None:
-            self.checkCall(mock_open, 0, 'test.txt.prog', 'rt')
+            self.checkCall(mock_progopen, 0, 'test.txt.prog', 'rt')
             self.assertEqual([c[0] for c in progFile.read.call_args_list], [()])
 
-        self.checkCall(mock_open, int(prog is not None), 'test.txt', 'rb')
+        self.checkCall(mock_open, 0, 'test.txt', 'rb')
         self.checkCall(dataFile.seek, 0, prog or 0)
         self.assertEqual([c[0] for c in dataFile.read.call_args_list], [(PCloudFile.blockSize,) for c in range(0, len(data) + 1)])
 
-        for d in range(1, len(data) + 2):
-            self.checkCall(mock_open, int(prog is not None) + d, 'test.txt.prog', 'wt')
-        self.assertEqual([c[0] for c in progFile.write.call_args_list], [(str(min(maxProgress, (prog or 0) + c*PCloudFile.blockSize)),) for c in range(0, len(data) + 1)])
+        self.checkCall(mock_progopen, int(prog is not None), 'test.txt.prog', 'wt')
+        self.assertEqual([c[0] for c in progFile.write.call_args_list], [(f'#pcloud-progress fileid=1 size={maxProgress} mtime=1650000000000000000\n' + (f'+0 {prog}\n' if prog else ''),)])
 
         self.assertEqual(len(mock_remove.call_args_list), 1)
         self.checkCall(mock_remove, 0, 'test.txt.prog')
 
+    @unittest.mock.patch('pcloud.src.main.os.stat')
+    @unittest.mock.patch('pcloud.src.progress.open')
     @unittest.mock.patch('pcloud.src.main.os.remove')
     @unittest.mock.patch('pcloud.src.main.os.path.isfile')
     @unittest.mock.patch('pcloud.src.main.open')
     @unittest.mock.patch('pcloud.src.main.requests.request')
     @unittest.mock.patch('pcloud.src.main.requests.Session')
-    def __testFileError(self, fileIdOrPath, data, error, prog, mock_session, mock_request, mock_open, mock_isfile, mock_remove):
+    def __testFileError(self, fileIdOrPath, data, error, prog, mock_session, mock_request, mock_open, mock_isfile, mock_remove, mock_progopen, mock_stat):
         # Setup mocks
         maxProgress = (prog or 0) + sum([len(d) for d in data])
         self.setupMock(mock_session, mock_request, 18, [{'result': 0, 'bytes': len(d)} for d in data] + [error])
@@ -161,12 +163,11 @@ class TestUpload(FileTestCase):
             progFile.read.side_effect = str(prog)
 
         unittest.mock.mock_open(mock_open)
-        if prog is None:
-            mock_open.side_effect = [dataFile] + [progFile]*(len(data) + 1)
-        else:
-            mock_open.side_effect = [progFile, dataFile] + [progFile]*(len(data) + 1)
+        mock_open.side_effect = [dataFile]
+        mock_progopen.side_effect = [progFile]*(1 + int(prog is not None))
 
         mock_isfile.return_value = prog is not None
+        mock_stat.return_value = unittest.mock.Mock(st_size=maxProgress, st_mtime_ns=1650000000000000000)
 
         # Execute test
         PCloudFile.blockSize = 8
@@ -190,26 +191,27 @@ class TestUpload(FileTestCase):
         self.checkMock('PUT', 'https://pcloud.localhost/file_pwrite', params={'fd': 18}, data=b'ERROR123')
 
         if prog is not None:
-            self.checkCall(mock_open, 0, 'test.txt.prog', 'rt')
+            self.checkCall(mock_progopen, 0, 'test.txt.prog', 'rt')
             self.assertEqual([c[0] for c in progFile.read.call_args_list], [()])
 
-        self.checkCall(mock_open, int(prog is not None), 'test.txt', 'rb')
+        self.checkCall(mock_open, 0, 'test.txt', 'rb')
         self.checkCall(dataFile.seek, 0, prog or 0)
         self.assertEqual([c[0] for c in dataFile.read.call_args_list], [(PCloudFile.blockSize,) for c in range(0, len(data) + 1)])
 
 
-        for d in range(1, len(data) + 2):
-            self.checkCall(mock_open, int(prog is not None) + d, 'test.txt.prog', 'wt')
-        self.assertEqual([c[0] for c in progFile.write.call_args_list], [(str(min(maxProgress, (prog or 0) + c*PCloudFile.blockSize)),) for c in range(0, len(data) + 1)])
+        self.checkCall(mock_progopen, int(prog is not None), 'test.txt.prog', 'wt')
+        self.assertEqual([c[0] for c in progFile.write.call_args_list], [(f'#pcloud-progress fileid=1 size={maxProgress} mtime=1650000000000000000\n' + (f'+0 {prog}\n' if prog else ''),)] + ([(f'+{prog or 0} {maxProgress}\n',)] if data else []))
 
         self.assertEqual(len(mock_remove.call_args_list), 0)
 
+    @unittest.mock.patch('pcloud.src.main.os.stat')
+    @unittest.mock.patch('pcloud.src.progress.open')
     @unittest.mock.patch('pcloud.src.main.os.remove')
     @unittest.mock.patch('pcloud.src.main.os.path.isfile')
     @unittest.mock.patch('pcloud.src.main.open')
     @unittest.mock.patch('pcloud.src.main.requests.request')
     @unittest.mock.patch('pcloud.src.main.requests.Session')
-    def __testFolderError(self, folderIdOrPath, fileName, data, error, prog, mock_session, mock_request, mock_open, mock_isfile, mock_remove):
+    def __testFolderError(self, folderIdOrPath, fileName, data, error, prog, mock_session, mock_request, mock_open, mock_isfile, mock_remove, mock_progopen, mock_stat):
         # Setup mocks
         maxProgress = (prog or 0) + sum([len(d) for d in data])
         self.setupMock(mock_session, mock_request, 18, [{'result': 0, 'bytes': len(d)} for d in data] + [error])
@@ -224,12 +226,11 @@ class TestUpload(FileTestCase):
             progFile.read.side_effect = str(prog)
 
         unittest.mock.mock_open(mock_open)
-        if prog is None:
-            mock_open.side_effect = [dataFile] + [progFile]*(len(data) + 1)
-        else:
-            mock_open.side_effect = [progFile, dataFile] + [progFile]*(len(data) + 1)
+        mock_open.side_effect = [dataFile]
+        mock_progopen.side_effect = [progFile]*(1 + int(prog is not None))
 
         mock_isfile.return_value = prog is not None
+        mock_stat.return_value = unittest.mock.Mock(st_size=maxProgress, st_mtime_ns=1650000000000000000)
 
         # Execute test
         PCloudFile.blockSize = 8
@@ -253,17 +254,16 @@ class TestUpload(FileTestCase):
         self.checkMock('PUT', 'https://pcloud.localhost/file_pwrite', params={'fd': 18}, data=b'ERROR123')
 
         if prog is not None:
-            self.checkCall(mock_open, 0, 'test.txt.prog', 'rt')
+            self.checkCall(mock_progopen, 0, 'test.txt.prog', 'rt')
             self.assertEqual([c[0] for c in progFile.read.call_args_list], [()])
 
-        self.checkCall(mock_open, int(prog is not None), 'test.txt', 'rb')
+        self.checkCall(mock_open, 0, 'test.txt', 'rb')
         self.checkCall(dataFile.seek, 0, prog or 0)
         self.assertEqual([c[0] for c in dataFile.read.call_args_list], [(PCloudFile.blockSize,) for c in range(0, len(data) + 1)])
 
 
-        for d in range(1, len(data) + 2):
-            self.checkCall(mock_open, int(prog is not None) + d, 'test.txt.prog', 'wt')
-        self.assertEqual([c[0] for c in progFile.write.call_args_list], [(str(min(maxProgress, (prog or 0) + c*PCloudFile.blockSize)),) for c in range(0, len(data) + 1)])
+        self.checkCall(mock_progopen, int(prog is not None), 'test.txt.prog', 'wt')
+        self.assertEqual([c[0] for c in progFile.write.call_args_list], [(f'#pcloud-progress fileid=1 size={maxProgress} mtime=1650000000000000000\n' + (f'+0 {prog}\n' if prog else ''),)] + ([(f'+{prog or 0} {maxProgress}\n',)] if data else []))
 
         self.assertEqual(len(mock_remove.call_args_list), 0)
 
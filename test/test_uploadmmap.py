@@ -0,0 +1,121 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import io
+import mmap
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+
+from pcloud import PCloud
+from pcloud.src.file import PCloudFile
+
+class TestUploadMmap(TestCase):
+    data = bytes(range(0, 100))
+
+    def setUp(self):
+        self.__blockSize = PCloudFile.blockSize
+        PCloudFile.blockSize = 8
+        self.__dir = tempfile.TemporaryDirectory()
+        self.srcPath = os.path.join(self.__dir.name, 'test.txt')
+        with open(self.srcPath, 'wb') as srcFile:
+            srcFile.write(self.data)
+
+    def tearDown(self):
+        PCloudFile.blockSize = self.__blockSize
+        self.__dir.cleanup()
+
+    def __run(self, server, fun):
+        mappings = []
+        mapFileOrig = mmap.mmap
+        def mapFile(*args, **kwArgs):
+            mappings.append(mapFileOrig(*args, **kwArgs))
+            return mappings[-1]
+
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with unittest.mock.patch('pcloud.src.file.mmap.mmap', side_effect=mapFile):
+                with PCloud('https://pcloud.localhost/') as pCloud:
+                    pCloud.username = 'username'
+                    pCloud.password = 'password'
+
+                    r = fun(pCloud)
+        return r, mappings
+
+    def testUpload(self):
+        server = PCloudFakeServer({1: b''})
+        progress, mappings = self.__run(server, lambda pCloud: list(pCloud.upload(self.srcPath, 1)))
+
+        self.assertEqual(server.files, {1: bytearray(self.data)})
+        self.assertEqual(progress, list(range(0, 100, 8)) + [100])
+        self.assertEqual([c[1]['offset'] for c in server.calls if c[0] == 'file_pwrite'], list(range(0, 100, 8)))
+        self.assertEqual(len(mappings), 1)
+        self.assertTrue(mappings[0].closed)
+
+    def testResume(self):
+        with open(self.srcPath + '.prog', 'wt') as progFile:
+            progFile.write('#pcloud-progress fileid=1\n+0 20\n')
+
+        server = PCloudFakeServer({1: self.data[:20]})
+        progress, mappings = self.__run(server, lambda pCloud: list(pCloud.upload(self.srcPath, 1)))
+
+        self.assertEqual(server.files, {1: bytearray(self.data)})
+        self.assertEqual(progress[0], 20)
+        self.assertEqual([c[1]['offset'] for c in server.calls if c[0] == 'file_pwrite'], list(range(20, 100, 8)))
+        self.assertTrue(mappings[0].closed)
+
+    def testInterrupted(self):
+        def fun(pCloud):
+            with pCloud.openFile(1) as pCloudFile, open(self.srcPath, 'rb') as srcFile:
+                transfer = pCloudFile.uploadFile(srcFile, 0)
+                progress = [next(transfer), next(transfer)]
+                transfer.close()
+            return progress
+
+        server = PCloudFakeServer({1: b''})
+        progress, mappings = self.__run(server, fun)
+
+        self.assertEqual(progress, [0, 8])
+        self.assertEqual(server.files, {1: bytearray(self.data[:8])})
+        self.assertTrue(mappings[0].closed)
+
+    def testEmpty(self):
+        with open(self.srcPath, 'wb'):
+            pass
+
+        server = PCloudFakeServer({1: b'Test'})
+        progress, mappings = self.__run(server, lambda pCloud: list(pCloud.upload(self.srcPath, 1)))
+
+        self.assertEqual(progress, [0])
+        self.assertEqual(mappings, [])
+        self.assertNotIn('file_pwrite', server.endPoints())
+
+    def testNotMappable(self):
+        def fun(pCloud):
+            with pCloud.openFile(1) as pCloudFile:
+                return list(pCloudFile.uploadFile(io.BytesIO(self.data), 10))
+
+        server = PCloudFakeServer({1: self.data[:10]})
+        progress, mappings = self.__run(server, fun)
+
+        self.assertEqual(server.files, {1: bytearray(self.data)})
+        self.assertEqual(progress, list(range(10, 100, 8)) + [100])
+        self.assertEqual(mappings, [])
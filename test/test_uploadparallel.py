@@ -0,0 +1,122 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+
+from pcloud import PCloud
+from pcloud.src.file import PCloudFile
+from pcloud.src.error import PCloudError
+
+class PCloudCorruptingServer(PCloudFakeServer):
+    def _file_pwrite(self, params, data):
+        return super()._file_pwrite(params, bytes([b ^ 1 for b in data]))
+
+class PCloudTruncatingServer(PCloudFakeServer):
+    def _file_size(self, params, data):
+        r = super()._file_size(params, data)
+        r['size'] -= 1
+        return r
+
+class TestUploadParallel(TestCase):
+    data = bytes(range(0, 100))
+
+    def setUp(self):
+        self.__blockSize = PCloudFile.blockSize
+        PCloudFile.blockSize = 8
+        self.__dir = tempfile.TemporaryDirectory()
+        self.srcPath = os.path.join(self.__dir.name, 'test.txt')
+        with open(self.srcPath, 'wb') as srcFile:
+            srcFile.write(self.data)
+
+    def tearDown(self):
+        PCloudFile.blockSize = self.__blockSize
+        self.__dir.cleanup()
+
+    def __upload(self, server, *args, **kwArgs):
+        progress = []
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                for p in pCloud.upload(self.srcPath, *args, **kwArgs):
+                    progress.append(p)
+        return progress
+
+    def testCreate(self):
+        server = PCloudFakeServer()
+        progress = self.__upload(server, 0, 'test.txt', workers=4, verify=True)
+
+        self.assertEqual(server.files, {1: bytearray(self.data)})
+        self.assertFalse(os.path.exists(self.srcPath + '.prog'))
+        self.assertEqual(progress[0], 0)
+        self.assertEqual(progress[-1], len(self.data))
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual(server.endPoints().count('file_open'), 4)
+        self.assertEqual(server.endPoints().count('file_close'), 4)
+        self.assertEqual(server.endPoints().count('checksumfile'), 1)
+        self.assertEqual(sorted([c[1]['offset'] for c in server.calls if c[0] == 'file_pwrite']), list(range(0, 100, 8)))
+
+    def testOverwrite(self):
+        server = PCloudFakeServer({1: bytes(200)})
+        self.__upload(server, 1, workers=2)
+
+        self.assertEqual(server.files, {1: bytearray(self.data)})
+
+    def testResume(self):
+        with open(self.srcPath + '.prog', 'wt') as progFile:
+            progFile.write('0 16\n32 40\n')
+
+        server = PCloudFakeServer({1: self.data[:16] + bytes(16) + self.data[32:40]})
+        progress = self.__upload(server, 1, workers=3)
+
+        self.assertEqual(server.files, {1: bytearray(self.data)})
+        self.assertEqual(progress[0], 24)
+        self.assertNotIn('file_truncate', server.endPoints())
+        self.assertEqual(sorted([c[1]['offset'] for c in server.calls if c[0] == 'file_pwrite']), [16, 24] + list(range(40, 100, 8)))
+
+    def testError(self):
+        server = PCloudFakeServer({1: b''})
+        server.failures['file_pwrite'] = [5003]
+
+        with self.assertRaises(PCloudError) as e:
+            self.__upload(server, 1, workers=2)
+        self.assertEqual(e.exception.code, 5003)
+
+        self.assertTrue(os.path.exists(self.srcPath + '.prog'))
+        self.assertEqual(server.endPoints().count('file_close'), 2)
+
+    def testSizeMismatch(self):
+        server = PCloudTruncatingServer({1: b''})
+
+        with self.assertRaises(IOError):
+            self.__upload(server, 1, workers=2)
+        self.assertTrue(os.path.exists(self.srcPath + '.prog'))
+
+    def testChecksumMismatch(self):
+        server = PCloudCorruptingServer({1: b''})
+
+        with self.assertRaises(IOError):
+            self.__upload(server, 1, workers=2, verify=True)
+        self.assertTrue(os.path.exists(self.srcPath + '.prog'))
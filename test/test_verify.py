@@ -0,0 +1,126 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import hashlib
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+from .test_uploadparallel import PCloudCorruptingServer
+
+from pcloud import PCloud
+from pcloud.src.file import PCloudFile
+
+class TestVerify(TestCase):
+    data = bytes(range(0, 100))
+
+    def setUp(self):
+        self.__blockSize = PCloudFile.blockSize
+        PCloudFile.blockSize = 8
+        self.__dir = tempfile.TemporaryDirectory()
+        self.srcPath = self.write('test.txt', self.data)
+
+    def tearDown(self):
+        PCloudFile.blockSize = self.__blockSize
+        self.__dir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.__dir.name, name)
+        with open(path, 'wb') as srcFile:
+            srcFile.write(data)
+        return path
+
+    def __run(self, server, fun):
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                return fun(pCloud)
+
+    def __upload(self, server, *args, **kwArgs):
+        return self.__run(server, lambda pCloud: list(pCloud.upload(self.srcPath, *args, **kwArgs)))
+
+    def testUploadFileHashes(self):
+        def run(pCloud):
+            with pCloud.openFile(1) as pCloudFile, open(self.srcPath, 'rb') as srcFile:
+                list(pCloudFile.uploadFile(srcFile, 16, hashes=hashes))
+        hashes = [hashlib.sha1(), hashlib.md5()]
+        server = PCloudFakeServer({1: b''})
+        self.__run(server, run)
+
+        self.assertEqual([h.hexdigest() for h in hashes], [hashlib.sha1(self.data[16:]).hexdigest(), hashlib.md5(self.data[16:]).hexdigest()])
+
+    def testUpload(self):
+        server = PCloudFakeServer()
+        self.__upload(server, 0, 'test.txt', verify=True)
+
+        self.assertEqual(server.files, {1: bytearray(self.data)})
+        self.assertEqual(server.endPoints().count('checksumfile'), 1)
+
+    def testUploadResume(self):
+        with open(self.srcPath + '.prog', 'wt') as progFile:
+            progFile.write('#pcloud-progress fileid=1\n+0 20\n')
+
+        server = PCloudFakeServer({1: self.data[:20]})
+        self.__upload(server, 1, verify=True)
+
+        self.assertEqual(server.files, {1: bytearray(self.data)})
+        self.assertEqual(sorted([c[1]['offset'] for c in server.calls if c[0] == 'file_pwrite']), list(range(20, 100, 8)))
+        self.assertFalse(os.path.exists(self.srcPath + '.prog'))
+
+    def testUploadSourceChanged(self):
+        with open(self.srcPath + '.prog', 'wt') as progFile:
+            progFile.write('#pcloud-progress fileid=1 size=100 mtime=1000\n+0 64\n')
+        self.write('test.txt', b'new' * 5)
+
+        server = PCloudFakeServer({1: self.data[:64] + b'X' * 36})
+        self.__upload(server, 1, verify=True)
+
+        self.assertEqual(server.files, {1: bytearray(b'new' * 5)})
+        self.assertFalse(os.path.exists(self.srcPath + '.prog'))
+
+    def testUploadMismatch(self):
+        server = PCloudCorruptingServer()
+
+        with self.assertRaises(IOError):
+            self.__upload(server, 0, 'test.txt', verify=True)
+        self.assertTrue(os.path.exists(self.srcPath + '.prog'))
+
+    def __checkFiles(self, hashWorkers):
+        files = [(self.srcPath, 1), (self.write('other.txt', b'Hello world!'), 2), (self.write('bad.txt', b'Hello World!'), 3)]
+        server = PCloudFakeServer({1: self.data, 2: b'Hello world!', 3: b'Hello world!'})
+        r = self.__run(server, lambda pCloud: pCloud.checkFiles(files, workers=2, hashWorkers=hashWorkers))
+
+        self.assertEqual(r, [True, True, False])
+        self.assertEqual(sorted([c[1]['fileid'] for c in server.calls if c[0] == 'checksumfile']), [1, 2, 3])
+
+    def testCheckFiles(self):
+        self.__checkFiles(0)
+
+    def testCheckFilesProcesses(self):
+        self.__checkFiles(2)
+
+    def testCheckFilesEmpty(self):
+        server = PCloudFakeServer()
+
+        self.assertEqual(self.__run(server, lambda pCloud: pCloud.checkFiles([])), [])
+        self.assertNotIn('checksumfile', server.endPoints())
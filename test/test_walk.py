@@ -0,0 +1,150 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import threading
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+
+from pcloud import PCloud
+from pcloud.src.error import PCloudError
+
+class PCloudTreeServer(PCloudFakeServer):
+    def __init__(self):
+        super().__init__()
+        self.folders = {
+            0: {'name': '/'},
+            1: {'name': 'a', 'parentfolderid': 0},
+            2: {'name': 'b', 'parentfolderid': 0},
+            3: {'name': 'c', 'parentfolderid': 2},
+            4: {'name': 'd', 'parentfolderid': 0},
+            5: {'name': 'e', 'parentfolderid': 3},
+        }
+        self.items = {
+            10: {'name': 'x', 'parentfolderid': 0},
+            11: {'name': 'y', 'parentfolderid': 1},
+            12: {'name': 'z', 'parentfolderid': 3},
+        }
+        self.barrier = None
+
+    def request(self, method, url, params=None, data=None, files=None, stream=False):
+        # Listings of sibling folders wait for each other (so that they succeed only when sent concurrently)
+        if (self.barrier is not None) and url.endswith('/listfolder') and (params.get('folderid') in (1, 2, 4)):
+            self.barrier.wait()
+        return super().request(method, url, params=params, data=data, files=files, stream=stream)
+
+    def _listfolder(self, params, data):
+        folderId = params.get('folderid', 0 if params.get('path') == '/' else None)
+        if folderId not in self.folders:
+            return {'result': 2005, 'error': "Directory does not exist."}
+        contents = [dict(m, folderid=f, isfolder=True) for f, m in self.folders.items() if m.get('parentfolderid') == folderId]
+        contents += [dict(m, fileid=f, isfolder=False) for f, m in self.items.items() if m['parentfolderid'] == folderId]
+        return {'metadata': dict(self.folders[folderId], folderid=folderId, isfolder=True, contents=contents)}
+
+    def listed(self):
+        return [c[1].get('folderid', c[1].get('path')) for c in self.calls if c[0] == 'listfolder']
+
+class TestWalk(TestCase):
+    def __walk(self, server, fun, *args, **kwArgs):
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                r = []
+                for folder, subfolders, files in pCloud.walk(*args, **kwArgs):
+                    r.append((folder.name, [f.name for f in subfolders], [f.name for f in files]))
+                    if fun is not None and fun(folder, subfolders, files):
+                        break
+                return r
+
+    expected = [
+        ('/', ['a', 'b', 'd'], ['x']),
+        ('a', [], ['y']),
+        ('b', ['c'], []),
+        ('c', ['e'], ['z']),
+        ('e', [], []),
+        ('d', [], []),
+    ]
+
+    def testWalk(self):
+        server = PCloudTreeServer()
+        r = self.__walk(server, None, 0)
+
+        self.assertEqual(r, self.expected)
+        self.assertEqual(server.listed(), [0, 1, 2, 3, 5, 4])
+        for c in server.calls:
+            if c[0] == 'listfolder':
+                self.assertFalse(c[1]['recursive'])
+
+    def testPath(self):
+        server = PCloudTreeServer()
+        r = self.__walk(server, None, '/')
+
+        self.assertEqual(r, self.expected)
+        self.assertEqual(server.listed(), ['/', 1, 2, 3, 5, 4])
+
+    def testPrune(self):
+        def prune(folder, subfolders, files):
+            subfolders[:] = [f for f in subfolders if f.name != 'b']
+        server = PCloudTreeServer()
+        r = self.__walk(server, prune, 0)
+
+        self.assertEqual([f[0] for f in r], ['/', 'a', 'd'])
+        self.assertEqual(server.listed(), [0, 1, 4])
+
+    def testOrder(self):
+        def reverse(folder, subfolders, files):
+            subfolders.reverse()
+        server = PCloudTreeServer()
+        r = self.__walk(server, reverse, 0)
+
+        self.assertEqual([f[0] for f in r], ['/', 'd', 'b', 'c', 'e', 'a'])
+
+    def testWorkers(self):
+        server = PCloudTreeServer()
+        server.barrier = threading.Barrier(3, timeout=10)
+        r = self.__walk(server, None, 0, workers=3)
+
+        self.assertEqual(r, self.expected)
+        self.assertEqual(sorted(server.listed()), [0, 1, 2, 3, 4, 5])
+
+    def testWorkersPrune(self):
+        def prune(folder, subfolders, files):
+            if folder.name == 'b':
+                subfolders.clear()
+        server = PCloudTreeServer()
+        r = self.__walk(server, prune, 0, workers=4)
+
+        self.assertEqual([f[0] for f in r], ['/', 'a', 'b', 'd'])
+        self.assertEqual(sorted(server.listed()), [0, 1, 2, 4])
+
+    def testStop(self):
+        server = PCloudTreeServer()
+        r = self.__walk(server, lambda folder, subfolders, files: folder.name == 'a', 0, workers=2)
+
+        self.assertEqual([f[0] for f in r], ['/', 'a'])
+        self.assertNotIn(3, server.listed())
+
+    def testError(self):
+        server = PCloudTreeServer()
+        with self.assertRaises(PCloudError) as e:
+            self.__walk(server, None, 6)
+        self.assertEqual(e.exception.code, 2005)
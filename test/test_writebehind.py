@@ -0,0 +1,140 @@
+# Copyright 2022 Pascal COMBES <pascom@orange.fr>
+#
+# This file is part of PCloud-python.
+#
+# PCloud-python is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PCloud-python is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
+
+import unittest
+import unittest.mock
+
+from .testcase import TestCase
+from .fakeserver import PCloudFakeServer
+
+from pcloud import PCloud
+from pcloud.src.error import PCloudError
+
+class PCloudShortWriteServer(PCloudFakeServer):
+    def _file_pwrite(self, params, data):
+        return super()._file_pwrite(params, data[:-1])
+
+class TestWriteBehind(TestCase):
+    def __run(self, server, fun, **kwArgs):
+        with unittest.mock.patch('pcloud.src.main.requests.request') as mock_request, unittest.mock.patch('pcloud.src.main.requests.Session') as mock_session:
+            server.setup(mock_session, mock_request)
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                with pCloud.openFile(1, **kwArgs) as pCloudFile:
+                    return fun(pCloudFile)
+
+    def __writes(self, server, endPoint):
+        return [c[2] for c in server.calls if c[0] == endPoint]
+
+    def testCoalesce(self):
+        server = PCloudFakeServer({1: b''})
+        written = self.__run(server, lambda f: [f.write(b'%03d' % i) for i in range(0, 10)], writeBuffer=8)
+
+        self.assertEqual(written, [3]*10)
+        self.assertEqual(server.files[1], b''.join([b'%03d' % i for i in range(0, 10)]))
+        self.assertEqual([len(d) for d in self.__writes(server, 'file_write')], [9, 9, 9, 3])
+
+    def testCoalesceOffsets(self):
+        server = PCloudFakeServer({1: bytes(20)})
+        def fun(f):
+            f.write(b'ab', 2)
+            f.write(b'cd', 4)
+            f.write(b'ef', 10)
+            f.write(b'gh')
+        self.__run(server, fun, writeBuffer=8)
+
+        self.assertEqual(self.__writes(server, 'file_pwrite'), [b'abcd', b'ef'])
+        self.assertEqual(self.__writes(server, 'file_write'), [b'gh'])
+        self.assertEqual(server.files[1], b'gh' + b'abcd' + bytes(4) + b'ef' + bytes(8))
+
+    def testFlush(self):
+        server = PCloudFakeServer({1: b''})
+        def fun(f):
+            f.write(b'Hello')
+            calls = len(self.__writes(server, 'file_write'))
+            f.flush()
+            return calls
+        calls = self.__run(server, fun, writeBuffer=8)
+
+        self.assertEqual(calls, 0)
+        self.assertEqual(self.__writes(server, 'file_write'), [b'Hello'])
+
+    def testRead(self):
+        server = PCloudFakeServer({1: b''})
+        def fun(f):
+            f.write(b'Hello world!', 0)
+            f.write(b'!', 12)
+            return f.read(13, 0)
+        self.assertEqual(self.__run(server, fun, writeBuffer=64), b'Hello world!!')
+
+    def testWriteBehind(self):
+        server = PCloudFakeServer({1: b''})
+        self.__run(server, lambda f: [f.write(b'%03d' % i) for i in range(0, 100)], writeBuffer=16, writeBehind=2)
+
+        self.assertEqual(server.files[1], b''.join([b'%03d' % i for i in range(0, 100)]))
+        self.assertTrue(all([len(d) >= 16 for d in self.__writes(server, 'file_write')[:-1]]))
+
+    def testWriteBehindErrorFlush(self):
+        server = PCloudFakeServer({1: b''})
+        server.failures['file_write'] = [5003]
+        def fun(f):
+            self.assertEqual(f.write(b'0123'), 4)
+            with self.assertRaises(PCloudError) as e:
+                f.flush()
+            self.assertEqual(e.exception.code, 5003)
+            f.write(b'4567')
+        self.__run(server, fun, writeBuffer=4, writeBehind=2)
+
+        self.assertEqual(server.files[1], b'4567')
+
+    def testWriteBehindErrorWrite(self):
+        server = PCloudFakeServer({1: b''})
+        server.failures['file_write'] = [5003]
+        def fun(f):
+            self.assertEqual(f.write(b'0123'), 4)
+            with self.assertRaises(PCloudError) as e:
+                f.write(b'4567')
+            self.assertEqual(e.exception.code, 5003)
+        self.__run(server, fun, writeBuffer=4, writeBehind=1)
+
+        self.assertEqual(server.files[1], b'')
+        self.assertEqual(len(self.__writes(server, 'file_write')), 1)
+
+    def testErrorExit(self):
+        server = PCloudFakeServer({1: b''})
+        server.failures['file_write'] = [5003]
+        with self.assertRaises(PCloudError) as e:
+            self.__run(server, lambda f: f.write(b'0123'), writeBuffer=8, writeBehind=1)
+
+        self.assertEqual(e.exception.code, 5003)
+        self.assertIn('file_close', server.endPoints())
+
+    def testShortWrite(self):
+        server = PCloudShortWriteServer({1: b''})
+        with self.assertRaises(IOError):
+            self.__run(server, lambda f: f.write(b'0123', 0), writeBuffer=8)
+
+        self.assertIn('file_close', server.endPoints())
+
+    def testDisabled(self):
+        server = PCloudFakeServer({1: b''})
+        written = self.__run(server, lambda f: [f.write(b'%03d' % i) for i in range(0, 3)])
+
+        self.assertEqual(written, [3]*3)
+        self.assertEqual(self.__writes(server, 'file_write'), [b'000', b'001', b'002'])
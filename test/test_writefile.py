@@ -15,6 +15,8 @@
 # You should have received a copy of the GNU General Public License
 # along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
 
+import array
+import mmap
 import requests
 import unittest
 
@@ -56,6 +58,60 @@ class TestWriteFile(FileTestCase):
         self.checkMock('PUT', 'https://pcloud.localhost/file_pwrite', params={'fd': 18, 'offset': 36}, data=b'Test')
         self.assertEqual(written, 4)
 
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testByteArray(self, mock_session, mock_request):
+        self.setupMock(mock_session, mock_request, 18, {'result': 0, 'bytes': 4})
+
+        data = bytearray(b'Test')
+        with PCloud('https://pcloud.localhost/') as pCloud:
+            pCloud.username = 'username'
+            pCloud.password = 'password'
+
+            with pCloud.openFile(1) as pCloudFile:
+                written = pCloudFile.write(data)
+
+        self.checkMock('PUT', 'https://pcloud.localhost/file_write', params={'fd': 18}, data=b'Test')
+        self.assertIs(mock_session.return_value.request.call_args_list[2][1]['data'].obj, data)
+        self.assertEqual(written, 4)
+
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testMemoryView(self, mock_session, mock_request):
+        self.setupMock(mock_session, mock_request, 18, {'result': 0, 'bytes': 4})
+
+        data = array.array('H', [0x6554, 0x7473, 0x2121])
+        with PCloud('https://pcloud.localhost/') as pCloud:
+            pCloud.username = 'username'
+            pCloud.password = 'password'
+
+            with pCloud.openFile(1) as pCloudFile:
+                written = pCloudFile.write(memoryview(data)[:2], offset=36)
+
+        self.checkMock('PUT', 'https://pcloud.localhost/file_pwrite', params={'fd': 18, 'offset': 36}, data=memoryview(data).cast('B')[:4])
+        self.assertEqual(len(mock_session.return_value.request.call_args_list[2][1]['data']), 4)
+        self.assertEqual(written, 4)
+
+    @unittest.mock.patch('pcloud.src.main.requests.request')
+    @unittest.mock.patch('pcloud.src.main.requests.Session')
+    def testMmap(self, mock_session, mock_request):
+        self.setupMock(mock_session, mock_request, 18, {'result': 0, 'bytes': 4})
+
+        with mmap.mmap(-1, 8) as data:
+            data[:] = b'TestTest'
+            with PCloud('https://pcloud.localhost/') as pCloud:
+                pCloud.username = 'username'
+                pCloud.password = 'password'
+
+                with pCloud.openFile(1) as pCloudFile:
+                    view = memoryview(data)[4:]
+                    written = pCloudFile.write(view, offset=4)
+                    view.release()
+
+            self.checkMock('PUT', 'https://pcloud.localhost/file_pwrite', params={'fd': 18, 'offset': 4}, data=b'Test')
+            mock_session.return_value.request.call_args_list[2][1]['data'].release()
+        self.assertEqual(written, 4)
+
     @testdata.TestData([
         {'result': 1000, 'error': "Log in required."                                                     },
         {'result': 1007, 'error': "Invalid or closed file descriptor."                                   },
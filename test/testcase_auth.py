@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
 
+import json
 import requests
 import unittest
 
@@ -26,6 +27,14 @@ class AuthTestCase(TestCase):
         self.__mock = None
         self.__nCalls = None
 
+    @staticmethod
+    def __streamJson(mock_response, chunkSize=16):
+        # Chunks of the JSON text, for the requests whose response is decoded while it is received
+        def chunks(size):
+            text = json.dumps(mock_response.json.return_value).encode()
+            return iter([text[i:i + chunkSize] for i in range(0, len(text), chunkSize)])
+        mock_response.iter_content.side_effect = chunks
+
     def setupMockNormal(self, mock_request, return_value):
         mock_requestdigest = unittest.mock.Mock(spec=requests.Response, status_code=200)
         mock_requestdigest.headers = {'Content-Type': 'application/json; charset=utf-8'}
@@ -39,6 +48,7 @@ class AuthTestCase(TestCase):
         mock_response.headers = {'Content-Type': 'application/json; charset=utf-8'}
         mock_response.json.return_value = return_value
         mock_response.json.return_value['auth'] = 'AuthAuthAuthAuthAuthAuthAuthAuthAuthAuth'
+        self.__streamJson(mock_response)
 
         mock_logout = unittest.mock.Mock(spec=requests.Response, status_code=200)
         mock_logout.headers = {'Content-Type': 'application/json; charset=utf-8'}
@@ -121,6 +131,7 @@ class AuthTestCase(TestCase):
             'error' : error,
             'auth'  : 'AuthAuthAuthAuthAuthAuthAuthAuthAuthAuth',
         }
+        self.__streamJson(mock_response)
         mock_logout = unittest.mock.Mock(spec=requests.Response, status_code=200)
         mock_logout.headers = {'Content-Type': 'application/json; charset=utf-8'}
         mock_logout.json.return_value = {
@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with PCloud-python. If not, see <http://www.gnu.org/licenses/>
 
+import io
 import requests
 import unittest
 
@@ -34,6 +35,7 @@ class FileTestCase(TestCase):
         elif type(return_value) is bytes:
             mr.headers = {'Content-Type': 'application/octet-stream'}
             mr.content = return_value
+            mr.raw = io.BytesIO(return_value)
         elif issubclass(return_value, BaseException):
             mr.raise_for_status.side_effect = return_value
         else: #pragma: no cover
@@ -73,7 +75,13 @@ class FileTestCase(TestCase):
             'result':    0,
             'auth_deleted': True,
         }
-        mock_request.return_value = mock_logout
+        mock_stat = unittest.mock.Mock(spec=requests.Response, status_code=200)
+        mock_stat.headers = {'Content-Type': 'application/json; charset=utf-8'}
+        mock_stat.json.return_value = {
+            'result':   0,
+            'metadata': {'fileid': 1},
+        }
+        mock_request.side_effect = lambda method, url, **kwArgs: mock_stat if url.endswith('/stat') else mock_logout
 
         self.__mock = mock_session_object.request
         if type(return_value) is list: